@@ -15,11 +15,17 @@ from app.models.usuario import Usuario
 from app.models.condominio import Condominio
 from app.models.residente import Residente
 from app.models.gasto_comun import GastoComun
+from app.models.gasto_comun_item import GastoComunItem
 from app.models.multa import Multa
 from app.models.espacio_comun import EspacioComun
 from app.models.reserva import Reserva
 from app.models.pago import Pago
 from app.models.anuncio import Anuncio
+from app.models.registro import RegistroModel
+from app.models.alerta import Alerta
+from app.models.correo import Correo
+from app.models.movimiento_cuenta import MovimientoCuenta
+from app.models.kpi import VISTAS_KPI  # vistas materializadas (create_all)
 
 config = context.config
 
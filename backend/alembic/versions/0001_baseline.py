@@ -0,0 +1,236 @@
+"""baseline: esquema anterior a las migraciones
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-17 12:00:00
+
+Las tablas que creaba SQLModel.metadata.create_all (scripts/init_db.py) antes
+de que existieran las migraciones, escritas tal cual: las revisiones
+siguientes parten de este esquema y no dependen de los modelos actuales.
+
+Una base creada con create_all antes de las migraciones ya tiene estas
+tablas: se marca una vez con `alembic stamp 0001_baseline` y después se
+migra con `alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLAS = [
+    "alerta", "condominios", "espacios_comunes", "usuarios", "anuncios", "registros",
+    "residentes", "gastos_comunes", "multas", "pagos", "reservas",
+]
+
+ENUMS = [
+    "tipoalerta", "estadoalerta", "tipoespaciocomun", "rolusuario", "tipoevento", "estadogastocomun",
+    "tipomulta", "estadomulta", "tipopago", "metodopago", "estadopago", "estadoreserva",
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existentes = [t for t in TABLAS if bind.execute(sa.text("SELECT to_regclass(:t)"), {"t": t}).scalar()]
+    if existentes:
+        raise RuntimeError(
+            "La base ya tiene tablas del esquema inicial (" + ", ".join(existentes) + "): si se creó "
+            "con create_all antes de las migraciones, marcarla con `alembic stamp 0001_baseline`"
+        )
+
+    op.create_table("alerta",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("titulo", sqlmodel.AutoString(), nullable=False),
+        sa.Column("descripcion", sqlmodel.AutoString(), nullable=False),
+        sa.Column("tipo", sa.Enum("MOROSIDAD", "MULTA", "EDICION_GASTO", "SISTEMA", name="tipoalerta"), nullable=False),
+        sa.Column("estado", sa.Enum("PENDIENTE", "RESUELTO", name="estadoalerta"), nullable=False),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.Column("comentario_resolucion", sqlmodel.AutoString(), nullable=True),
+        sa.Column("fecha_resolucion", sa.DateTime(), nullable=True),
+        sa.Column("resuelto_por", sa.Integer(), nullable=True),
+        sa.Column("condominio_id", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_table("condominios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nombre", sqlmodel.AutoString(), nullable=False),
+        sa.Column("direccion", sqlmodel.AutoString(), nullable=False),
+        sa.Column("total_viviendas", sa.Integer(), nullable=False),
+        sa.Column("ingresos", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("activo", sa.Boolean(), nullable=False),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_condominios_nombre", "condominios", ["nombre"], unique=False)
+    op.create_table("espacios_comunes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("condominio_id", sa.Integer(), nullable=False),
+        sa.Column("nombre", sqlmodel.AutoString(), nullable=False),
+        sa.Column("tipo", sa.Enum("ESTACIONAMIENTO", "QUINCHO", "MULTICANCHA", "SALA_EVENTOS", name="tipoespaciocomun"), nullable=False),
+        sa.Column("capacidad", sa.Integer(), nullable=True),
+        sa.Column("costo_por_hora", sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column("descripcion", sqlmodel.AutoString(), nullable=True),
+        sa.Column("activo", sa.Boolean(), nullable=False),
+        sa.Column("requiere_pago", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["condominio_id"], ["condominios.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_espacios_comunes_nombre", "espacios_comunes", ["nombre"], unique=False)
+    op.create_table("usuarios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sqlmodel.AutoString(), nullable=False),
+        sa.Column("nombre", sqlmodel.AutoString(), nullable=False),
+        sa.Column("apellido", sqlmodel.AutoString(), nullable=False),
+        sa.Column("password_hash", sqlmodel.AutoString(), nullable=False),
+        sa.Column("rol", sa.Enum("SUPER_ADMINISTRADOR", "ADMINISTRADOR", "CONSERJE", "DIRECTIVA", "RESIDENTE", name="rolusuario"), nullable=False),
+        sa.Column("condominio_id", sa.Integer(), nullable=True),
+        sa.Column("activo", sa.Boolean(), nullable=False),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.Column("ultimo_acceso", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["condominio_id"], ["condominios.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_usuarios_email", "usuarios", ["email"], unique=True)
+    op.create_table("anuncios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("condominio_id", sa.Integer(), nullable=False),
+        sa.Column("titulo", sqlmodel.AutoString(), nullable=False),
+        sa.Column("contenido", sqlmodel.AutoString(), nullable=False),
+        sa.Column("activo", sa.Boolean(), nullable=False),
+        sa.Column("fecha_publicacion", sa.DateTime(), nullable=False),
+        sa.Column("creado_por", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["condominio_id"], ["condominios.id"], ),
+        sa.ForeignKeyConstraint(["creado_por"], ["usuarios.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_anuncios_titulo", "anuncios", ["titulo"], unique=False)
+    op.create_table("registros",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("usuario_id", sa.Integer(), nullable=False),
+        sa.Column("tipo_evento", sa.Enum("RESERVA", "ANUNCIO", "MULTA", "PAGO", "EDICION", "ELIMINACION", "CREACION", "OTRO", name="tipoevento"), nullable=False),
+        sa.Column("detalle", sqlmodel.AutoString(), nullable=False),
+        sa.Column("monto", sa.Float(), nullable=True),
+        sa.Column("condominio_id", sa.Integer(), nullable=True),
+        sa.Column("datos_adicionales", sqlmodel.AutoString(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["condominio_id"], ["condominios.id"], ),
+        sa.ForeignKeyConstraint(["usuario_id"], ["usuarios.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_table("residentes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("usuario_id", sa.Integer(), nullable=True),
+        sa.Column("condominio_id", sa.Integer(), nullable=False),
+        sa.Column("vivienda_numero", sqlmodel.AutoString(), nullable=False),
+        sa.Column("nombre", sqlmodel.AutoString(), nullable=False),
+        sa.Column("apellido", sqlmodel.AutoString(), nullable=False),
+        sa.Column("rut", sqlmodel.AutoString(), nullable=False),
+        sa.Column("telefono", sqlmodel.AutoString(), nullable=True),
+        sa.Column("email", sqlmodel.AutoString(), nullable=False),
+        sa.Column("suscrito_notificaciones", sa.Boolean(), nullable=False),
+        sa.Column("ultimo_correo_enviado", sa.DateTime(), nullable=True),
+        sa.Column("es_propietario", sa.Boolean(), nullable=False),
+        sa.Column("fecha_ingreso", sa.Date(), nullable=False),
+        sa.Column("activo", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["condominio_id"], ["condominios.id"], ),
+        sa.ForeignKeyConstraint(["usuario_id"], ["usuarios.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_residentes_email", "residentes", ["email"], unique=False)
+    op.create_index("ix_residentes_rut", "residentes", ["rut"], unique=True)
+    op.create_index("ix_residentes_vivienda_numero", "residentes", ["vivienda_numero"], unique=False)
+    op.create_table("gastos_comunes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("residente_id", sa.Integer(), nullable=False),
+        sa.Column("condominio_id", sa.Integer(), nullable=False),
+        sa.Column("mes", sa.Integer(), nullable=False),
+        sa.Column("anio", sa.Integer(), nullable=False),
+        sa.Column("monto_base", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("cuota_mantencion", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("servicios", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("multas", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("monto_total", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("estado", sa.Enum("PENDIENTE", "PAGADO", "VENCIDO", "MOROSO", name="estadogastocomun"), nullable=False),
+        sa.Column("fecha_emision", sa.Date(), nullable=False),
+        sa.Column("fecha_vencimiento", sa.Date(), nullable=False),
+        sa.Column("fecha_pago", sa.DateTime(), nullable=True),
+        sa.Column("observaciones", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["condominio_id"], ["condominios.id"], ),
+        sa.ForeignKeyConstraint(["residente_id"], ["residentes.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_gastos_comunes_condominio_id", "gastos_comunes", ["condominio_id"], unique=False)
+    op.create_index("ix_gastos_comunes_residente_id", "gastos_comunes", ["residente_id"], unique=False)
+    op.create_table("multas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("residente_id", sa.Integer(), nullable=False),
+        sa.Column("condominio_id", sa.Integer(), nullable=False),
+        sa.Column("tipo", sa.Enum("RETRASO_PAGO", "INFRAESTRUCTURA", "RUIDO", "MASCOTA", "OTRO", name="tipomulta"), nullable=False),
+        sa.Column("descripcion", sqlmodel.AutoString(), nullable=False),
+        sa.Column("monto", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("estado", sa.Enum("PENDIENTE", "PAGADA", "CONDONADA", name="estadomulta"), nullable=False),
+        sa.Column("fecha_emision", sa.Date(), nullable=False),
+        sa.Column("fecha_pago", sa.DateTime(), nullable=True),
+        sa.Column("motivo_condonacion", sqlmodel.AutoString(), nullable=True),
+        sa.Column("creado_por", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["condominio_id"], ["condominios.id"], ),
+        sa.ForeignKeyConstraint(["creado_por"], ["usuarios.id"], ),
+        sa.ForeignKeyConstraint(["residente_id"], ["residentes.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_multas_condominio_id", "multas", ["condominio_id"], unique=False)
+    op.create_index("ix_multas_residente_id", "multas", ["residente_id"], unique=False)
+    op.create_table("pagos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("condominio_id", sa.Integer(), nullable=False),
+        sa.Column("residente_id", sa.Integer(), nullable=False),
+        sa.Column("tipo", sa.Enum("GASTO_COMUN", "MULTA", "RESERVA", name="tipopago"), nullable=False),
+        sa.Column("referencia_id", sa.Integer(), nullable=False),
+        sa.Column("monto", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("metodo_pago", sa.Enum("TRANSFERENCIA", "TARJETA", "EFECTIVO", "WEBPAY", "KHIPU", name="metodopago"), nullable=False),
+        sa.Column("estado_pago", sa.Enum("PENDIENTE", "APROBADO", "RECHAZADO", "REVERSADO", name="estadopago"), nullable=False),
+        sa.Column("numero_transaccion", sqlmodel.AutoString(), nullable=True),
+        sa.Column("fecha_pago", sa.DateTime(), nullable=False),
+        sa.Column("comprobante_url", sqlmodel.AutoString(), nullable=True),
+        sa.Column("registrado_por", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["condominio_id"], ["condominios.id"], ),
+        sa.ForeignKeyConstraint(["registrado_por"], ["usuarios.id"], ),
+        sa.ForeignKeyConstraint(["residente_id"], ["residentes.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_pagos_condominio_id", "pagos", ["condominio_id"], unique=False)
+    op.create_index("ix_pagos_residente_id", "pagos", ["residente_id"], unique=False)
+    op.create_table("reservas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("espacio_comun_id", sa.Integer(), nullable=False),
+        sa.Column("residente_id", sa.Integer(), nullable=False),
+        sa.Column("fecha_reserva", sa.Date(), nullable=False),
+        sa.Column("hora_inicio", sa.Time(), nullable=False),
+        sa.Column("hora_fin", sa.Time(), nullable=False),
+        sa.Column("estado", sa.Enum("PENDIENTE_PAGO", "CONFIRMADA", "CANCELADA", "COMPLETADA", name="estadoreserva"), nullable=False),
+        sa.Column("monto_pago", sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column("pago_id", sa.Integer(), nullable=True),
+        sa.Column("observaciones", sqlmodel.AutoString(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["espacio_comun_id"], ["espacios_comunes.id"], ),
+        sa.ForeignKeyConstraint(["pago_id"], ["pagos.id"], ),
+        sa.ForeignKeyConstraint(["residente_id"], ["residentes.id"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_reservas_espacio_comun_id", "reservas", ["espacio_comun_id"], unique=False)
+    op.create_index("ix_reservas_residente_id", "reservas", ["residente_id"], unique=False)
+
+
+def downgrade() -> None:
+    for tabla in reversed(TABLAS):
+        op.drop_table(tabla)
+    for nombre in ENUMS:
+        sa.Enum(name=nombre).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,79 @@
+"""cuenta corriente: residentes.saldo + movimientos_cuenta con saldo de apertura
+
+Revision ID: 0002_cuenta_corriente
+Revises: 0001_baseline
+Create Date: 2026-10-17 12:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_cuenta_corriente"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Saldo inicial = deuda actual (gastos impagos + multas pendientes) de los
+# residentes que aún no tienen movimientos
+SQL_ABRIR_CUENTAS = """
+WITH deuda AS (
+    SELECT r.id AS residente_id, SUM(c.monto) AS monto
+    FROM residentes r
+    JOIN (
+        SELECT residente_id, monto_total AS monto FROM gastos_comunes
+        WHERE estado IN ('PENDIENTE', 'VENCIDO', 'MOROSO')
+        UNION ALL
+        SELECT residente_id, monto FROM multas WHERE estado = 'PENDIENTE'
+    ) c ON c.residente_id = r.id
+    WHERE NOT EXISTS (SELECT 1 FROM movimientos_cuenta m WHERE m.residente_id = r.id)
+    GROUP BY r.id
+),
+apertura AS (
+    INSERT INTO movimientos_cuenta (residente_id, origen, monto, saldo_resultante, descripcion, fecha)
+    SELECT residente_id, 'APERTURA', monto, monto, 'Saldo inicial', now() AT TIME ZONE 'utc'
+    FROM deuda WHERE monto <> 0
+    RETURNING residente_id, monto
+)
+UPDATE residentes r SET saldo = apertura.monto
+FROM apertura WHERE r.id = apertura.residente_id
+"""
+
+
+def upgrade() -> None:
+    op.add_column(
+        "residentes",
+        sa.Column("saldo", sa.Numeric(12, 2), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "movimientos_cuenta",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("residente_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "origen",
+            sa.Enum("APERTURA", "GASTO_COMUN", "MULTA", "RESERVA", "PAGO", name="origenmovimiento"),
+            nullable=False,
+        ),
+        sa.Column("referencia_id", sa.Integer(), nullable=True),
+        sa.Column("monto", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("saldo_resultante", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("descripcion", sqlmodel.AutoString(), nullable=False),
+        sa.Column("fecha", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["residente_id"], ["residentes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_movimientos_cuenta_fecha", "movimientos_cuenta", ["fecha"])
+    op.create_index("ix_movimientos_cuenta_residente_id_id", "movimientos_cuenta", ["residente_id", "id"])
+
+    op.execute(SQL_ABRIR_CUENTAS)
+
+
+def downgrade() -> None:
+    op.drop_table("movimientos_cuenta")
+    op.drop_column("residentes", "saldo")
+    sa.Enum(name="origenmovimiento").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,58 @@
+"""reservas: restricción de exclusión contra traslapes
+
+Revision ID: 0003_reservas_sin_traslape
+Revises: 0002_cuenta_corriente
+Create Date: 2026-10-17 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_reservas_sin_traslape"
+down_revision: Union[str, None] = "0002_cuenta_corriente"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Intervalo [inicio, fin) de una reserva; si hora_fin <= hora_inicio termina al día siguiente
+RANGO_RESERVA = (
+    "tsrange(fecha_reserva + hora_inicio, fecha_reserva + hora_fin + "
+    "CASE WHEN hora_fin <= hora_inicio THEN interval '1 day' ELSE interval '0 days' END, '[)')"
+)
+# El espacio como rango de un elemento: "=" en GiST sin btree_gist
+ESPACIO_RESERVA = "int4range(espacio_comun_id, espacio_comun_id, '[]')"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # No se corrigen datos a ciegas: si ya hay reservas traslapadas hay que
+    # cancelarlas o moverlas a mano antes de migrar
+    traslapes = bind.execute(sa.text(f"""
+        WITH vigentes AS (
+            SELECT id, espacio_comun_id, {RANGO_RESERVA} AS rango
+            FROM reservas WHERE estado <> 'CANCELADA'
+        )
+        SELECT a.id, b.id FROM vigentes a
+        JOIN vigentes b ON a.espacio_comun_id = b.espacio_comun_id
+                       AND a.id < b.id AND a.rango && b.rango
+    """)).all()
+    if traslapes:
+        raise RuntimeError(
+            "Hay reservas traslapadas, resolverlas antes de migrar: "
+            + ", ".join(f"{a}/{b}" for a, b in traslapes)
+        )
+
+    op.execute(
+        "ALTER TABLE reservas ADD CONSTRAINT reservas_sin_traslape EXCLUDE USING gist ("
+        f"{ESPACIO_RESERVA} WITH =, {RANGO_RESERVA} WITH &&"
+        ") WHERE (estado <> 'CANCELADA')"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE reservas DROP CONSTRAINT reservas_sin_traslape")
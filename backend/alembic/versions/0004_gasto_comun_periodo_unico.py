@@ -0,0 +1,42 @@
+"""gastos_comunes: un gasto por residente y periodo (residente_id, mes, anio)
+
+Revision ID: 0004_gasto_comun_periodo_unico
+Revises: 0003_reservas_sin_traslape
+Create Date: 2026-10-17 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_gasto_comun_periodo_unico"
+down_revision: Union[str, None] = "0003_reservas_sin_traslape"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UQ_GASTO_PERIODO = "uq_gastos_comunes_residente_periodo"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Los duplicados se fusionan a mano (montos, pagos y movimientos apuntan a ellos)
+    duplicados = bind.execute(sa.text("""
+        SELECT residente_id, mes, anio, array_agg(id ORDER BY id)
+        FROM gastos_comunes GROUP BY residente_id, mes, anio HAVING count(*) > 1
+    """)).all()
+    if duplicados:
+        raise RuntimeError(
+            "Hay gastos comunes duplicados por residente/periodo, fusionarlos antes de migrar: "
+            + "; ".join(f"residente {r} {m}/{a}: ids {ids}" for r, m, a, ids in duplicados)
+        )
+
+    op.create_unique_constraint(UQ_GASTO_PERIODO, "gastos_comunes", ["residente_id", "mes", "anio"])
+
+
+def downgrade() -> None:
+    op.drop_constraint(UQ_GASTO_PERIODO, "gastos_comunes", type_="unique")
@@ -0,0 +1,93 @@
+"""gasto_comun_items: detalle de gastos comunes en filas (reemplaza gastos_comunes.observaciones)
+
+Revision ID: 0005_gasto_comun_items
+Revises: 0004_gasto_comun_periodo_unico
+Create Date: 2026-10-17 17:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_gasto_comun_items"
+down_revision: Union[str, None] = "0004_gasto_comun_periodo_unico"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Una fila por elemento de cada lista, en el mismo orden (los ids siguen el
+# orden de la lista). Las claves sin columna propia quedan en `datos`.
+SQL_BACKFILL = """
+INSERT INTO gasto_comun_items (gasto_comun_id, reserva_id, tipo, descripcion, monto, fecha, datos)
+SELECT g.id,
+       CASE WHEN o->>'reserva_id' ~ '^[0-9]+$' THEN CAST(o->>'reserva_id' AS integer) END,
+       coalesce(o->>'tipo', 'OTRO'),
+       coalesce(o->>'descripcion', ''),
+       CASE WHEN o->>'monto' ~ '^-?[0-9]+(\\.[0-9]+)?$' THEN CAST(o->>'monto' AS numeric(12, 2)) ELSE 0 END,
+       CASE WHEN o->>'fecha' ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}' THEN CAST(left(o->>'fecha', 10) AS date)
+            ELSE g.fecha_emision END,
+       CAST(nullif(o - 'fecha' - 'tipo' - 'descripcion' - 'monto' - 'reserva_id', '{}'::jsonb) AS json)
+FROM gastos_comunes g
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE WHEN jsonb_typeof(CAST(g.observaciones AS jsonb)) = 'array'
+         THEN CAST(g.observaciones AS jsonb) ELSE '[]'::jsonb END
+) WITH ORDINALITY AS e(o, n)
+WHERE jsonb_typeof(o) = 'object'
+ORDER BY g.id, e.n
+"""
+
+# Inverso: vuelve a armar la lista JSON desde las filas
+SQL_RECONSTRUIR = """
+UPDATE gastos_comunes g
+SET observaciones = x.observaciones
+FROM (
+    SELECT gasto_comun_id,
+           json_agg(
+               CAST(jsonb_strip_nulls(jsonb_build_object(
+                   'fecha', CAST(fecha AS text),
+                   'tipo', tipo,
+                   'descripcion', descripcion,
+                   'monto', monto,
+                   'reserva_id', reserva_id
+               )) || coalesce(CAST(datos AS jsonb), '{}'::jsonb) AS json)
+               ORDER BY id
+           ) AS observaciones
+    FROM gasto_comun_items
+    GROUP BY gasto_comun_id
+) x
+WHERE x.gasto_comun_id = g.id
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "gasto_comun_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("gasto_comun_id", sa.Integer(), nullable=False),
+        sa.Column("reserva_id", sa.Integer(), nullable=True),
+        sa.Column("tipo", sqlmodel.AutoString(), nullable=False),
+        sa.Column("descripcion", sqlmodel.AutoString(), nullable=False),
+        sa.Column("monto", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("fecha", sa.Date(), nullable=False),
+        sa.Column("datos", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["gasto_comun_id"], ["gastos_comunes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_gasto_comun_items_gasto_comun_id_id", "gasto_comun_items", ["gasto_comun_id", "id"])
+    op.create_index("ix_gasto_comun_items_reserva_id", "gasto_comun_items", ["reserva_id"])
+
+    op.execute(SQL_BACKFILL)
+    op.drop_column("gastos_comunes", "observaciones")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "gastos_comunes",
+        sa.Column("observaciones", sa.JSON(), nullable=True, server_default=sa.text("'[]'::json")),
+    )
+    op.execute(SQL_RECONSTRUIR)
+    op.drop_table("gasto_comun_items")
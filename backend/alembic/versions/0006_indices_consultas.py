@@ -0,0 +1,74 @@
+"""índices compuestos para las consultas frecuentes + un pago pendiente por concepto
+
+Revision ID: 0006_indices_consultas
+Revises: 0005_gasto_comun_items
+Create Date: 2026-10-17 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_indices_consultas"
+down_revision: Union[str, None] = "0005_gasto_comun_items"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UQ_PAGO_PENDIENTE = "uq_pagos_pendiente_tipo_referencia"
+
+# (nombre, tabla, columnas)
+INDICES = [
+    ("ix_pagos_numero_transaccion", "pagos", ["numero_transaccion"]),
+    ("ix_pagos_tipo_referencia_id", "pagos", ["tipo", "referencia_id"]),
+    ("ix_gastos_comunes_estado_fecha_vencimiento", "gastos_comunes", ["estado", "fecha_vencimiento"]),
+    ("ix_multas_residente_id_estado", "multas", ["residente_id", "estado"]),
+    ("ix_reservas_espacio_comun_id_fecha_reserva", "reservas", ["espacio_comun_id", "fecha_reserva"]),
+    ("ix_alerta_estado_fecha_creacion_id", "alerta", ["estado", "fecha_creacion", "id"]),
+    ("ix_registros_condominio_id_fecha_creacion_id", "registros", ["condominio_id", "fecha_creacion", "id"]),
+]
+
+# Índices de una columna que quedan cubiertos por la primera columna de uno compuesto
+REDUNDANTES = [
+    ("ix_gastos_comunes_residente_id", "gastos_comunes", ["residente_id"]),  # uq_gastos_comunes_residente_periodo
+    ("ix_multas_residente_id", "multas", ["residente_id"]),
+    ("ix_reservas_espacio_comun_id", "reservas", ["espacio_comun_id"]),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    duplicados = bind.execute(sa.text("""
+        SELECT tipo, referencia_id, array_agg(id ORDER BY id)
+        FROM pagos WHERE estado_pago = 'PENDIENTE'
+        GROUP BY tipo, referencia_id HAVING count(*) > 1
+    """)).all()
+    if duplicados:
+        raise RuntimeError(
+            "Hay pagos pendientes duplicados por concepto, anular los sobrantes antes de migrar: "
+            + "; ".join(f"{t} {r}: ids {ids}" for t, r, ids in duplicados)
+        )
+
+    # CONCURRENTLY no bloquea escrituras mientras se construye (no corre dentro de una transacción)
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas in INDICES:
+            op.create_index(nombre, tabla, columnas, postgresql_concurrently=True)
+        op.create_index(
+            UQ_PAGO_PENDIENTE, "pagos", ["tipo", "referencia_id"], unique=True,
+            postgresql_where=sa.text("estado_pago = 'PENDIENTE'"),
+            postgresql_concurrently=True,
+        )
+        for nombre, tabla, _ in REDUNDANTES:
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas in REDUNDANTES:
+            op.create_index(nombre, tabla, columnas, postgresql_concurrently=True)
+        op.drop_index(UQ_PAGO_PENDIENTE, table_name="pagos", postgresql_concurrently=True)
+        for nombre, tabla, _ in INDICES:
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+"""registros.datos_adicionales: texto JSON -> JSONB con índice GIN
+
+Revision ID: 0007_registros_datos_jsonb
+Revises: 0006_indices_consultas
+Create Date: 2026-10-17 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_registros_datos_jsonb"
+down_revision: Union[str, None] = "0006_indices_consultas"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICE = "ix_registros_datos_adicionales"
+
+
+def upgrade() -> None:
+    # Los textos que no son JSON válido se conservan como string JSON
+    op.execute("""
+        CREATE FUNCTION pg_temp.texto_a_jsonb(texto text) RETURNS jsonb
+        LANGUAGE plpgsql IMMUTABLE AS $$
+        BEGIN
+            RETURN texto::jsonb;
+        EXCEPTION WHEN others THEN
+            RETURN to_jsonb(texto);
+        END $$
+    """)
+    op.execute("""
+        ALTER TABLE registros ALTER COLUMN datos_adicionales TYPE jsonb
+        USING pg_temp.texto_a_jsonb(datos_adicionales)
+    """)
+    op.create_index(
+        INDICE, "registros", ["datos_adicionales"], postgresql_using="gin",
+        postgresql_ops={"datos_adicionales": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(INDICE, table_name="registros")
+    op.execute("""
+        ALTER TABLE registros ALTER COLUMN datos_adicionales TYPE varchar
+        USING CASE WHEN jsonb_typeof(datos_adicionales) = 'string'
+                   THEN datos_adicionales #>> '{}'
+                   ELSE datos_adicionales::text END
+    """)
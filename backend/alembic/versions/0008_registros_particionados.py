@@ -0,0 +1,122 @@
+"""registros particionada por mes (RANGE sobre fecha_creacion)
+
+Revision ID: 0008_registros_particionados
+Revises: 0007_registros_datos_jsonb
+Create Date: 2026-10-17 20:00:00
+
+Una tabla no se puede convertir en particionada en el lugar: se renombra la
+actual, se crea la particionada (con su partición DEFAULT), se crean las particiones
+de todos los meses con datos más las siguientes y se copian las filas
+conservando los ids. Después las particiones futuras las crea la mantención
+de services/particiones.py.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_registros_particionados"
+down_revision: Union[str, None] = "0007_registros_datos_jsonb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNAS = "id, usuario_id, tipo_evento, detalle, monto, condominio_id, datos_adicionales, fecha_creacion"
+# Meses siguientes al actual que se dejan particionados (REGISTROS_MESES_ADELANTE por defecto)
+MESES_ADELANTE = 3
+
+
+def _sumar_meses(mes: date, meses: int) -> date:
+    total = mes.year * 12 + (mes.month - 1) + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _apartar(bind, tabla: str, nuevo: str) -> None:
+    """Renombra la tabla, su clave primaria, sus llaves foráneas y su secuencia, y
+    borra sus índices para liberar los nombres que usa la tabla nueva"""
+    op.execute(f"ALTER TABLE {tabla} RENAME TO {nuevo}")
+    op.execute(f"ALTER TABLE {nuevo} RENAME CONSTRAINT {tabla}_pkey TO {nuevo}_pkey")
+    op.execute(f"ALTER SEQUENCE {tabla}_id_seq RENAME TO {nuevo}_id_seq")
+    for fk in sa.inspect(bind).get_foreign_keys(nuevo):
+        op.execute(f"ALTER TABLE {nuevo} RENAME CONSTRAINT {fk['name']} TO {fk['name'].replace(tabla, nuevo, 1)}")
+    for indice in sa.inspect(bind).get_indexes(nuevo):
+        op.execute(f"DROP INDEX {indice['name']}")
+
+
+def _copiar(desde: str) -> None:
+    op.execute(f"INSERT INTO registros ({COLUMNAS}) SELECT {COLUMNAS} FROM {desde}")
+    op.execute("SELECT setval('registros_id_seq', coalesce((SELECT max(id) FROM registros), 0) + 1, false)")
+    op.execute(f"DROP TABLE {desde}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    _apartar(bind, "registros", "registros_sin_particionar")
+    # Todo índice único de una tabla particionada incluye la columna de partición
+    op.execute("""
+        CREATE TABLE registros (
+            id SERIAL NOT NULL,
+            usuario_id INTEGER NOT NULL REFERENCES usuarios (id),
+            tipo_evento tipoevento NOT NULL,
+            detalle VARCHAR NOT NULL,
+            monto FLOAT,
+            condominio_id INTEGER REFERENCES condominios (id),
+            datos_adicionales JSONB,
+            fecha_creacion TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, fecha_creacion)
+        ) PARTITION BY RANGE (fecha_creacion)
+    """)
+    op.create_index("ix_registros_fecha_creacion_id", "registros", ["fecha_creacion", "id"])
+    op.create_index(
+        "ix_registros_condominio_id_fecha_creacion_id", "registros",
+        ["condominio_id", "fecha_creacion", "id"],
+    )
+    op.create_index(
+        "ix_registros_datos_adicionales", "registros", ["datos_adicionales"], postgresql_using="gin",
+        postgresql_ops={"datos_adicionales": "jsonb_path_ops"},
+    )
+    # Recibe las filas fuera de las particiones mensuales
+    op.execute("CREATE TABLE registros_default PARTITION OF registros DEFAULT")
+
+    mes_actual = date.today().replace(day=1)
+    primero = bind.execute(sa.text("SELECT min(fecha_creacion) FROM registros_sin_particionar")).scalar()
+    mes = min(primero.date().replace(day=1), mes_actual) if primero else mes_actual
+    while mes <= _sumar_meses(mes_actual, MESES_ADELANTE):
+        siguiente = _sumar_meses(mes, 1)
+        op.execute(
+            f"CREATE TABLE registros_{mes:%Y_%m} PARTITION OF registros "
+            f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{siguiente.isoformat()}')"
+        )
+        mes = siguiente
+    _copiar("registros_sin_particionar")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    # Las particiones desacopladas por la retención quedan como tablas archivadas
+    _apartar(bind, "registros", "registros_particionada")
+    op.execute("""
+        CREATE TABLE registros (
+            id SERIAL PRIMARY KEY,
+            usuario_id INTEGER NOT NULL REFERENCES usuarios (id),
+            tipo_evento tipoevento NOT NULL,
+            detalle VARCHAR NOT NULL,
+            monto FLOAT,
+            condominio_id INTEGER REFERENCES condominios (id),
+            datos_adicionales JSONB,
+            fecha_creacion TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+    """)
+    op.create_index("ix_registros_fecha_creacion", "registros", ["fecha_creacion"])
+    op.create_index(
+        "ix_registros_condominio_id_fecha_creacion_id", "registros",
+        ["condominio_id", "fecha_creacion", "id"],
+    )
+    op.create_index(
+        "ix_registros_datos_adicionales", "registros", ["datos_adicionales"], postgresql_using="gin",
+        postgresql_ops={"datos_adicionales": "jsonb_path_ops"},
+    )
+    _copiar("registros_particionada")
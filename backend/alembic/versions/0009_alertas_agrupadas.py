@@ -0,0 +1,102 @@
+"""alertas agrupadas: entidad, ventana y contador de ocurrencias + una pendiente por clave
+
+Revision ID: 0009_alertas_agrupadas
+Revises: 0008_registros_particionados
+Create Date: 2026-10-17 21:00:00
+
+Las alertas existentes toman su entidad desde la descripción (los textos que
+generan multa.py y gasto_comun.py) y su ventana desde fecha_creacion; las
+PENDIENTES con la misma clave se juntan en la más antigua antes de crear el
+índice único. El downgrade no vuelve a separar las alertas juntadas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_alertas_agrupadas"
+down_revision: Union[str, None] = "0008_registros_particionados"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UQ_ALERTA_PENDIENTE = "uq_alerta_pendiente_clave"
+# Ventana de agrupación de las alertas existentes (ALERTAS_VENTANA_MIN por defecto)
+VENTANA_MIN = 1440
+
+
+def _columnas():
+    return [
+        sa.Column("entidad_tipo", sqlmodel.AutoString(), nullable=True),
+        sa.Column("entidad_id", sa.Integer(), nullable=True),
+        sa.Column("ventana", sa.DateTime(), nullable=True),
+        sa.Column("ocurrencias", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("fecha_ultima_ocurrencia", sa.DateTime(), nullable=True),
+    ]
+
+
+SQL_BACKFILL = """
+UPDATE alerta SET
+    entidad_tipo = CASE
+        WHEN tipo = 'EDICION_GASTO' THEN 'GASTO_COMUN'
+        WHEN tipo IN ('MOROSIDAD', 'MULTA') THEN 'RESIDENTE'
+    END,
+    entidad_id = CAST(CASE
+        WHEN tipo = 'EDICION_GASTO' THEN substring(descripcion FROM 'Gasto Comun ID ([0-9]+)')
+        WHEN tipo IN ('MOROSIDAD', 'MULTA') THEN substring(descripcion FROM 'residente ID ([0-9]+)')
+    END AS integer),
+    ventana = timestamp '2000-01-01'
+        + floor(extract(epoch FROM fecha_creacion - timestamp '2000-01-01') / :segundos)
+        * make_interval(secs => :segundos),
+    fecha_ultima_ocurrencia = fecha_creacion
+WHERE ventana IS NULL
+"""
+
+# Junta las PENDIENTES repetidas en la más antigua (con la descripción más reciente)
+SQL_JUNTAR = """
+WITH grupos AS (
+    SELECT min(id) AS conservar,
+           array_agg(id) AS ids,
+           sum(ocurrencias) AS ocurrencias,
+           max(fecha_ultima_ocurrencia) AS ultima,
+           (array_agg(descripcion ORDER BY fecha_creacion DESC, id DESC))[1] AS descripcion
+    FROM alerta
+    WHERE estado = 'PENDIENTE'
+    GROUP BY tipo, condominio_id, entidad_tipo, entidad_id, ventana
+    HAVING count(*) > 1
+), conservadas AS (
+    UPDATE alerta a
+    SET ocurrencias = g.ocurrencias, fecha_ultima_ocurrencia = g.ultima, descripcion = g.descripcion
+    FROM grupos g
+    WHERE a.id = g.conservar
+)
+DELETE FROM alerta a USING grupos g
+WHERE a.id = ANY(g.ids) AND a.id <> g.conservar
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for columna in _columnas():
+        op.add_column("alerta", columna)
+    op.alter_column("alerta", "ocurrencias", server_default=None)
+
+    op.execute(sa.text(SQL_BACKFILL).bindparams(segundos=VENTANA_MIN * 60))
+    juntadas = bind.execute(sa.text(SQL_JUNTAR)).rowcount
+    if juntadas:
+        print(f"  {juntadas} alertas pendientes repetidas juntadas")
+
+    op.create_index(
+        UQ_ALERTA_PENDIENTE, "alerta",
+        ["tipo", "condominio_id", "entidad_tipo", "entidad_id", "ventana"],
+        unique=True, postgresql_where=sa.text("estado = 'PENDIENTE'"),
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(UQ_ALERTA_PENDIENTE, table_name="alerta")
+    for columna in _columnas():
+        op.drop_column("alerta", columna.name)
@@ -0,0 +1,36 @@
+"""índice parcial para el resumen de alertas pendientes por condominio y tipo
+
+Revision ID: 0010_alertas_resumen
+Revises: 0009_alertas_agrupadas
+Create Date: 2026-10-17 22:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_alertas_resumen"
+down_revision: Union[str, None] = "0009_alertas_agrupadas"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICE = "ix_alerta_pendiente_condominio_id_tipo"
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no bloquea la creación de alertas mientras se construye
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDICE, "alerta", ["condominio_id", "tipo"],
+            postgresql_include=["ocurrencias"], postgresql_where=sa.text("estado = 'PENDIENTE'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(INDICE, table_name="alerta", postgresql_concurrently=True)
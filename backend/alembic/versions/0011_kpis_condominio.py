@@ -0,0 +1,93 @@
+"""vistas materializadas de KPIs por condominio y mes
+
+Revision ID: 0011_kpis_condominio
+Revises: 0010_alertas_resumen
+Create Date: 2026-10-17 23:00:00
+
+Crea las vistas (ya pobladas) con su índice único, que necesita REFRESH
+MATERIALIZED VIEW CONCURRENTLY. El downgrade las borra.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_kpis_condominio"
+down_revision: Union[str, None] = "0010_alertas_resumen"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Intervalo [inicio, fin) de una reserva; si hora_fin <= hora_inicio termina al día siguiente
+RANGO_RESERVA = (
+    "tsrange(fecha_reserva + hora_inicio, fecha_reserva + hora_fin + "
+    "CASE WHEN hora_fin <= hora_inicio THEN interval '1 day' ELSE interval '0 days' END, '[)')"
+)
+
+# (nombre, consulta, columnas del índice único)
+VISTAS = [
+    # Gastos comunes por periodo: facturado y morosidad
+    ("kpi_gastos_mensual", """
+        SELECT condominio_id,
+               make_date(anio, mes, 1) AS mes,
+               count(*) AS emitidos,
+               sum(monto_total) AS facturado,
+               count(*) FILTER (WHERE estado = 'PAGADO') AS pagados,
+               count(*) FILTER (WHERE estado IN ('VENCIDO', 'MOROSO')) AS morosos,
+               coalesce(sum(monto_total) FILTER (WHERE estado IN ('VENCIDO', 'MOROSO')), 0) AS monto_moroso
+        FROM gastos_comunes
+        GROUP BY condominio_id, anio, mes
+    """, ["condominio_id", "mes"]),
+    # Pagos aprobados por mes de pago y concepto
+    ("kpi_pagos_mensual", """
+        SELECT condominio_id,
+               CAST(date_trunc('month', fecha_pago) AS date) AS mes,
+               tipo,
+               count(*) AS pagos,
+               sum(monto) AS recaudado
+        FROM pagos
+        WHERE estado_pago = 'APROBADO'
+        GROUP BY 1, 2, 3
+    """, ["condominio_id", "mes", "tipo"]),
+    # Multas por mes de emisión y tipo
+    ("kpi_multas_mensual", """
+        SELECT condominio_id,
+               CAST(date_trunc('month', fecha_emision) AS date) AS mes,
+               tipo,
+               count(*) AS cantidad,
+               sum(monto) AS monto,
+               coalesce(sum(monto) FILTER (WHERE estado = 'PENDIENTE'), 0) AS monto_pendiente
+        FROM multas
+        GROUP BY 1, 2, 3
+    """, ["condominio_id", "mes", "tipo"]),
+    # Horas reservadas por espacio común y mes (reservas no canceladas)
+    ("kpi_reservas_mensual", f"""
+        SELECT e.condominio_id,
+               CAST(date_trunc('month', r.fecha_reserva) AS date) AS mes,
+               r.espacio_comun_id,
+               count(*) AS reservas,
+               sum(extract(epoch FROM upper({RANGO_RESERVA}) - lower({RANGO_RESERVA})) / 3600) AS horas
+        FROM reservas r
+        JOIN espacios_comunes e ON e.id = r.espacio_comun_id
+        WHERE r.estado <> 'CANCELADA'
+        GROUP BY 1, 2, 3
+    """, ["condominio_id", "mes", "espacio_comun_id"]),
+    # Una fila con la hora del último refresco
+    ("kpi_actualizacion", """
+        SELECT 1 AS id, CAST(now() AT TIME ZONE 'UTC' AS timestamp) AS fecha
+    """, ["id"]),
+]
+
+
+def upgrade() -> None:
+    for nombre, consulta, clave in VISTAS:
+        op.execute(f"CREATE MATERIALIZED VIEW {nombre} AS {consulta}")
+        op.execute(f"CREATE UNIQUE INDEX uq_{nombre} ON {nombre} ({', '.join(clave)})")
+
+
+def downgrade() -> None:
+    for nombre, _, _ in reversed(VISTAS):
+        op.execute(f"DROP MATERIALIZED VIEW {nombre}")
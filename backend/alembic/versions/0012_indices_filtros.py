@@ -0,0 +1,52 @@
+"""índices de una columna de los filtros de listados y de residentes.usuario_id
+
+Revision ID: 0012_indices_filtros
+Revises: 0011_kpis_condominio
+Create Date: 2026-10-18 10:00:00
+
+Estos índices se declararon con index=True en los modelos (filtros de los
+listados paginados y el residente de un usuario).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_indices_filtros"
+down_revision: Union[str, None] = "0011_kpis_condominio"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nombre, tabla, columnas); los nombres son los que genera index=True
+INDICES = [
+    ("ix_residentes_usuario_id", "residentes", ["usuario_id"]),
+    ("ix_residentes_condominio_id", "residentes", ["condominio_id"]),
+    ("ix_alerta_condominio_id", "alerta", ["condominio_id"]),
+    ("ix_alerta_fecha_creacion", "alerta", ["fecha_creacion"]),
+    ("ix_anuncios_condominio_id", "anuncios", ["condominio_id"]),
+    ("ix_anuncios_fecha_publicacion", "anuncios", ["fecha_publicacion"]),
+    ("ix_gastos_comunes_fecha_emision", "gastos_comunes", ["fecha_emision"]),
+    ("ix_multas_estado", "multas", ["estado"]),
+    ("ix_multas_fecha_emision", "multas", ["fecha_emision"]),
+    ("ix_pagos_estado_pago", "pagos", ["estado_pago"]),
+    ("ix_pagos_fecha_pago", "pagos", ["fecha_pago"]),
+    ("ix_reservas_fecha_reserva", "reservas", ["fecha_reserva"]),
+    ("ix_reservas_estado", "reservas", ["estado"]),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no bloquea escrituras mientras se construye
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas in INDICES:
+            op.create_index(nombre, tabla, columnas, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nombre, tabla, _ in INDICES:
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True)
@@ -0,0 +1,67 @@
+"""multas FACTURADA: las multas incluidas en un gasto común dejan de ser deuda aparte
+
+Revision ID: 0013_multas_facturadas
+Revises: 0012_indices_filtros
+Create Date: 2026-10-18 12:00:00
+
+generar-periodo suma las multas pendientes del mes al gasto común, pero las
+dejaba PENDIENTE: el saldo las contaba dos veces (al cursarlas y dentro del
+gasto) y pagos-pendientes les creaba además un Pago MULTA. Ahora quedan
+FACTURADA. El upgrade agrega el valor al enum y corrige las multas que ya se
+incluyeron en un gasto (detalle MULTA con multa_id), descontándolas del saldo
+con un movimiento por multa.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013_multas_facturadas"
+down_revision: Union[str, None] = "0012_indices_filtros"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def sql_cambiar_estado(desde: str, hacia: str, signo: int, descripcion: str) -> str:
+    """
+    Pasa de `desde` a `hacia` las multas incluidas en un gasto común y aplica
+    signo * monto al saldo, con un movimiento MULTA por multa.
+    """
+    return f"""
+    WITH multas_gasto AS (
+        UPDATE multas m SET estado = '{hacia}'
+        FROM gasto_comun_items i
+        WHERE i.tipo = 'MULTA'
+          AND i.datos->>'multa_id' ~ '^[0-9]+$'
+          AND m.id = CAST(i.datos->>'multa_id' AS integer)
+          AND m.estado = '{desde}'
+        RETURNING m.id, m.residente_id, {signo} * m.monto AS monto
+    ),
+    saldos AS (
+        UPDATE residentes r SET saldo = r.saldo + d.total
+        FROM (SELECT residente_id, sum(monto) AS total FROM multas_gasto GROUP BY residente_id) d
+        WHERE r.id = d.residente_id
+        RETURNING r.id, r.saldo, d.total
+    )
+    INSERT INTO movimientos_cuenta (residente_id, origen, referencia_id, monto, saldo_resultante, descripcion, fecha)
+    SELECT m.residente_id, 'MULTA', m.id, m.monto,
+           s.saldo - s.total + sum(m.monto) OVER (PARTITION BY m.residente_id ORDER BY m.id),
+           '{descripcion}', now() AT TIME ZONE 'utc'
+    FROM multas_gasto m
+    JOIN saldos s ON s.id = m.residente_id
+    """
+
+
+def upgrade() -> None:
+    # Un valor nuevo del enum solo se puede usar después de confirmarlo
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE estadomulta ADD VALUE 'FACTURADA'")
+    op.execute(sql_cambiar_estado("PENDIENTE", "FACTURADA", -1, "Multa incluida en gasto común"))
+
+
+def downgrade() -> None:
+    # Postgres no permite quitar valores de un enum: solo se vuelven a PENDIENTE
+    op.execute(sql_cambiar_estado("FACTURADA", "PENDIENTE", 1, "Multa separada del gasto común"))
@@ -0,0 +1,47 @@
+"""correos: bandeja de salida de las notificaciones por correo
+
+Revision ID: 0014_correos
+Revises: 0013_multas_facturadas
+Create Date: 2026-10-18 14:00:00
+
+Los endpoints encolan los correos en esta tabla y el despachador los envía
+con reintentos (estado, intentos, proximo_intento).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014_correos"
+down_revision: Union[str, None] = "0013_multas_facturadas"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "correos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("destinatario", sqlmodel.AutoString(), nullable=False),
+        sa.Column("asunto", sqlmodel.AutoString(), nullable=False),
+        sa.Column("cuerpo", sqlmodel.AutoString(), nullable=False),
+        sa.Column("residente_id", sa.Integer(), nullable=True),
+        sa.Column("estado", sa.Enum("PENDIENTE", "ENVIADO", "FALLIDO", name="estadocorreo"), nullable=False),
+        sa.Column("intentos", sa.Integer(), nullable=False),
+        sa.Column("proximo_intento", sa.DateTime(), nullable=False),
+        sa.Column("ultimo_error", sqlmodel.AutoString(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.Column("fecha_envio", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["residente_id"], ["residentes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_correos_estado", "correos", ["estado"])
+    op.create_index("ix_correos_proximo_intento", "correos", ["proximo_intento"])
+
+
+def downgrade() -> None:
+    op.drop_table("correos")
+    sa.Enum(name="estadocorreo").drop(op.get_bind(), checkfirst=True)
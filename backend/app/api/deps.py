@@ -1,7 +1,8 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from fastapi import Depends, HTTPException, status
 from sqlmodel import Session
-from app.core.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_session, get_async_session
 from app.core.security import get_current_user
 from app.models.usuario import Usuario, RolUsuario
 
@@ -17,6 +18,15 @@ def get_db() -> Generator:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependencia para obtener sesión async de base de datos (asyncpg).
+    Usar en endpoints async def para no bloquear el event loop.
+    """
+    async for db in get_async_session():
+        yield db
+
+
 def get_current_active_user(
     current_user: Usuario = Depends(get_current_user)
 ) -> Usuario:
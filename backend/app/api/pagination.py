@@ -0,0 +1,118 @@
+"""
+Paginacion por cursor (keyset) para los endpoints de listado.
+
+El cursor es opaco para el cliente: codifica los valores de las columnas de
+orden del ultimo elemento de la pagina. La siguiente pagina se obtiene con
+WHERE (col1, col2) > (v1, v2), que usa el indice en vez de recorrer y
+descartar filas como hace OFFSET.
+
+El cuerpo de la respuesta sigue siendo una lista; el cursor de la siguiente
+pagina viaja en el header X-Next-Cursor (ausente en la ultima pagina).
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Iterable, List, Optional
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import literal, tuple_
+
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, Enum):
+        return valor.value
+    return valor
+
+
+def _deserializar(valor: Any, columna) -> Any:
+    if valor is None:
+        return None
+    tipo = columna.type.python_type
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is date:
+        return date.fromisoformat(valor)
+    if tipo is Decimal:
+        return Decimal(valor)
+    return tipo(valor)
+
+
+def codificar_cursor(valores: List[Any]) -> str:
+    crudo = json.dumps([_serializar(v) for v in valores]).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, columnas) -> List[Any]:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(columnas):
+            raise ValueError("cantidad de valores")
+        return [_deserializar(v, c) for v, c in zip(valores, columnas)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor invalido"
+        )
+
+
+class Paginacion:
+    """
+    Dependencia con los parametros de paginacion (cursor y limit).
+    Uso:
+        query = pagina.aplicar(query, Modelo.id)
+        items = (await db.exec(query)).all()
+        return pagina.cerrar(items, response, Modelo.id)
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(
+            None, description="Cursor devuelto en el header X-Next-Cursor"
+        ),
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+    def aplicar(self, query, *columnas, descendente: bool = False):
+        """Agrega el filtro del cursor, el orden y el limite a la query"""
+        if self.cursor:
+            valores = decodificar_cursor(self.cursor, columnas)
+            clave = tuple_(*columnas)
+            limite = tuple_(*[literal(v, c.type) for v, c in zip(valores, columnas)])
+            query = query.where(clave < limite if descendente else clave > limite)
+            # Redundante con la comparación de tuplas, pero PostgreSQL solo poda
+            # particiones (p. ej. registros por mes) con la primera columna sola
+            primera = literal(valores[0], columnas[0].type)
+            query = query.where(columnas[0] <= primera if descendente else columnas[0] >= primera)
+        orden = [c.desc() if descendente else c.asc() for c in columnas]
+        # Se pide un elemento extra para saber si existe una pagina siguiente
+        return query.order_by(*orden).limit(self.limit + 1)
+
+    def cerrar(
+        self,
+        items: Iterable,
+        response: Response,
+        *columnas,
+        objeto: Callable[[Any], Any] = lambda item: item,
+    ) -> list:
+        """Recorta el elemento extra y publica el cursor de la siguiente pagina"""
+        items = list(items)
+        if len(items) > self.limit:
+            items = items[:self.limit]
+            ultimo = objeto(items[-1])
+            response.headers[NEXT_CURSOR_HEADER] = codificar_cursor(
+                [getattr(ultimo, c.key) for c in columnas]
+            )
+        return items
@@ -1,28 +1,121 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy import Integer, any_, bindparam, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
-from datetime import datetime
-from app.api.deps import get_db
-from app.models.alerta import Alerta, EstadoAlerta
+from datetime import date, datetime, time
+from app.api.deps import get_async_db, get_db
+from app.api.pagination import Paginacion
+from app.models.alerta import Alerta, EstadoAlerta, TipoAlerta
+from app.services.alertas import cache_resumen_alertas, notificaciones_alertas
 
 router = APIRouter(prefix="/alertas", tags=["Alertas"])
 
+
+class ResolucionMasiva(BaseModel):
+    """Alertas PENDIENTES a resolver: por ids y/o por filtros (se combinan con AND)"""
+    comentario: str
+    ids: Optional[List[int]] = None
+    tipo: Optional[TipoAlerta] = None
+    condominio_id: Optional[int] = None
+    entidad_tipo: Optional[str] = None
+    entidad_id: Optional[int] = None
+    hasta: Optional[datetime] = None  # solo las creadas hasta este momento
+    resuelto_por: Optional[int] = None
+
 @router.get("", response_model=List[Alerta])
 async def listar_alertas(
+    response: Response,
     estado: Optional[EstadoAlerta] = None,
+    condominio_id: Optional[int] = None,
+    tipo: Optional[TipoAlerta] = None,
+    entidad_tipo: Optional[str] = None,
+    entidad_id: Optional[int] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    pagina: Paginacion = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Lista las alertas, ordenadas por fecha de creación descendente.
+    Los eventos repetidos vienen agrupados en una alerta (ver `ocurrencias`).
     """
     query = select(Alerta)
     if estado:
         query = query.where(Alerta.estado == estado)
+    if condominio_id:
+        query = query.where(Alerta.condominio_id == condominio_id)
+    if tipo:
+        query = query.where(Alerta.tipo == tipo)
+    if entidad_tipo:
+        query = query.where(Alerta.entidad_tipo == entidad_tipo)
+    if entidad_id is not None:
+        query = query.where(Alerta.entidad_id == entidad_id)
+    if desde:
+        query = query.where(Alerta.fecha_creacion >= datetime.combine(desde, time.min))
+    if hasta:
+        query = query.where(Alerta.fecha_creacion <= datetime.combine(hasta, time.max))
     
-    # Ordenar: Más recientes primero
-    query = query.order_by(Alerta.fecha_creacion.desc())
+    # Ordenar: Más recientes primero (id desempata fechas iguales)
+    query = pagina.aplicar(query, Alerta.fecha_creacion, Alerta.id, descendente=True)
     
-    return db.exec(query).all()
+    return pagina.cerrar(
+        db.exec(query).all(), response, Alerta.fecha_creacion, Alerta.id
+    )
+
+@router.get("/resumen")
+async def resumen_alertas(
+    condominio_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Cantidad de alertas PENDIENTES por tipo (badge del panel), sin descargar la lista.
+    Cacheado por condominio; se invalida al registrar o resolver alertas.
+    """
+    return await cache_resumen_alertas.resumen(db, condominio_id)
+
+@router.put("/resolver")
+async def resolver_alertas(data: ResolucionMasiva, db: Session = Depends(get_db)):
+    """
+    Resuelve muchas alertas PENDIENTES con un solo UPDATE.
+    Exige al menos un criterio para no resolver todo por accidente.
+    """
+    filtros = []
+    if data.ids is not None:
+        filtros.append(Alerta.id == any_(bindparam("ids", data.ids, type_=ARRAY(Integer))))
+    if data.tipo:
+        filtros.append(Alerta.tipo == data.tipo)
+    if data.condominio_id:
+        filtros.append(Alerta.condominio_id == data.condominio_id)
+    if data.entidad_tipo:
+        filtros.append(Alerta.entidad_tipo == data.entidad_tipo)
+    if data.entidad_id is not None:
+        filtros.append(Alerta.entidad_id == data.entidad_id)
+    if data.hasta:
+        filtros.append(Alerta.fecha_creacion <= data.hasta)
+    if not filtros:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Indique ids o algún filtro de las alertas a resolver"
+        )
+
+    resueltas = db.execute(
+        update(Alerta)
+        .where(Alerta.estado == EstadoAlerta.PENDIENTE, *filtros)
+        .values(
+            estado=EstadoAlerta.RESUELTO,
+            comentario_resolucion=data.comentario,
+            fecha_resolucion=datetime.now(),
+            resuelto_por=data.resuelto_por,
+        )
+        .returning(Alerta.id, Alerta.condominio_id)
+    ).all()
+    for notificacion in notificaciones_alertas("resuelta", resueltas):
+        db.execute(notificacion)
+    db.commit()
+    return {"resueltas": len(resueltas), "ids": [id for id, _ in resueltas]}
 
 @router.put("/{alerta_id}/resolver", response_model=Alerta)
 async def resolver_alerta(
@@ -43,6 +136,8 @@ async def resolver_alerta(
     # alerta.resuelto_por = current_user.id # Si tuvieras el usuario en sesión
     
     db.add(alerta)
+    for notificacion in notificaciones_alertas("resuelta", [(alerta.id, alerta.condominio_id)]):
+        db.execute(notificacion)
     db.commit()
     db.refresh(alerta)
     return alerta
\ No newline at end of file
@@ -1,22 +1,43 @@
-﻿from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+﻿from datetime import date, datetime, time
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional
 
 from app.api.deps import get_db
+from app.api.pagination import Paginacion
 from app.models.anuncio import Anuncio
 from app.schemas.anuncio import AnuncioInput
 from app.models.residente import Residente
-from app.utils.email_service import send_email
+from app.services.email_dispatcher import despachador, encolar_difusion
 
 router = APIRouter(prefix="/anuncios", tags=["Anuncios"])
 
 
 # GET /anuncios - Listar todos
 @router.get("", response_model=List[Anuncio])
-async def listar(db: Session = Depends(get_db)):
-    anuncios = db.exec(select(Anuncio)).all()
-    return anuncios
+async def listar(
+    response: Response,
+    condominio_id: Optional[int] = None,
+    activo: Optional[bool] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    pagina: Paginacion = Depends(),
+    db: Session = Depends(get_db)
+):
+    query = select(Anuncio)
+    if condominio_id:
+        query = query.where(Anuncio.condominio_id == condominio_id)
+    if activo is not None:
+        query = query.where(Anuncio.activo == activo)
+    if desde:
+        query = query.where(Anuncio.fecha_publicacion >= datetime.combine(desde, time.min))
+    if hasta:
+        query = query.where(Anuncio.fecha_publicacion <= datetime.combine(hasta, time.max))
+
+    # Más recientes primero (id desempata fechas iguales)
+    query = pagina.aplicar(query, Anuncio.fecha_publicacion, Anuncio.id, descendente=True)
+    anuncios = db.exec(query).all()
+    return pagina.cerrar(anuncios, response, Anuncio.fecha_publicacion, Anuncio.id)
 
 
 # GET /anuncios/{id} - Obtener uno
@@ -33,39 +54,30 @@ async def obtener(anuncio_id: int, db: Session = Depends(get_db)):
 async def crear(data: AnuncioInput, db: Session = Depends(get_db)):
     anuncio = Anuncio(**data.dict())
     db.add(anuncio)
-    db.commit()
-    db.refresh(anuncio)
 
-    # Notificar por correo a residentes suscritos del condominio
-    residentes = db.exec(
-        select(Residente).where(
+    # Un correo personalizado por residente suscrito (sin exponer las demás direcciones)
+    encolados = encolar_difusion(
+        db,
+        select(Residente.id, Residente.email, Residente.nombre).where(
             Residente.condominio_id == anuncio.condominio_id,
             Residente.suscrito_notificaciones == True,
             Residente.activo == True
-        )
-    ).all()
-
-    if residentes:
-        destinatarios = [res.email for res in residentes if res.email]
-        if destinatarios:
-            enviado = send_email(
-                destinatarios,
-                f"[Casitas Teto] Nuevo anuncio: {anuncio.titulo}",
-                (
-                    "Hola,\n\n"
-                    "Se ha publicado un nuevo anuncio en tu condominio:\n\n"
-                    f"Titulo: {anuncio.titulo}\n\n"
-                    f"{anuncio.contenido}\n\n"
-                    f"Publicado: {anuncio.fecha_publicacion}\n\n"
-                    "Si no deseas recibir estas notificaciones, desactiva las notificaciones de correo en tu perfil.\n"
-                )
-            )
-            if enviado:
-                ahora = datetime.utcnow()
-                for residente in residentes:
-                    residente.ultimo_correo_enviado = ahora
-                    db.add(residente)
-                db.commit()
+        ).order_by(Residente.id),
+        f"[Casitas Teto] Nuevo anuncio: {anuncio.titulo}",
+        (
+            "Hola {nombre},\n\n"
+            "Se ha publicado un nuevo anuncio en tu condominio:\n\n"
+            f"Titulo: {anuncio.titulo}\n\n"
+            f"{anuncio.contenido}\n\n"
+            f"Publicado: {anuncio.fecha_publicacion}\n\n"
+            "Si no deseas recibir estas notificaciones, desactiva las notificaciones de correo en tu perfil.\n"
+        ),
+    )
+
+    db.commit()
+    db.refresh(anuncio)
+    if encolados:
+        despachador.despertar()
 
     return anuncio
 
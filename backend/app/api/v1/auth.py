@@ -1,15 +1,17 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import BaseModel, EmailStr
 import uuid # <--- Importar uuid
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
 from app.core.security import (
-    verify_password,
+    verificar_password,
     create_access_token,
     create_refresh_token,
-    decode_token
+    decode_token,
+    cache_usuarios
 )
 from app.models.usuario import Usuario
 from app.models.residente import Residente
@@ -32,13 +34,13 @@ class LoginResponse(BaseModel):
 @router.post("/login", response_model=LoginResponse)
 async def login(
     credentials: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Inicia sesión y devuelve tokens JWT.
     """
     statement = select(Usuario).where(Usuario.email == credentials.email)
-    usuario = db.exec(statement).first()
+    usuario = (await db.exec(statement)).first()
     
     if not usuario:
         raise HTTPException(
@@ -52,7 +54,9 @@ async def login(
             detail="Usuario inactivo"
         )
     
-    if not verify_password(credentials.password, usuario.password_hash):
+    # bcrypt corre en el pool de hash, no en el event loop
+    valida, hash_nuevo = await verificar_password(credentials.password, usuario.password_hash)
+    if not valida:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas"
@@ -62,7 +66,7 @@ async def login(
     if usuario.rol == "RESIDENTE":
         try:
             stmt_res = select(Residente).where(Residente.usuario_id == usuario.id)
-            residente_existente = db.exec(stmt_res).first()
+            residente_existente = (await db.exec(stmt_res)).first()
             
             if not residente_existente:
                 print(f"Auto-creando perfil de Residente para usuario {usuario.id}")
@@ -80,17 +84,23 @@ async def login(
                     es_propietario=False
                 )
                 db.add(nuevo_residente)
-                db.commit()
-                db.refresh(usuario)
+                await db.commit()
+                await db.refresh(usuario)
         except Exception as e:
             print(f"Error en autocuración de residente: {e}")
+            await db.rollback()
+            await db.refresh(usuario)
             # Continuamos el login aunque falle la creación del perfil
     # ------------------------------
 
+    # Hash con un factor de costo distinto a BCRYPT_ROUNDS: se reemplaza ahora que tenemos la clave
+    if hash_nuevo:
+        usuario.password_hash = hash_nuevo
     usuario.ultimo_acceso = datetime.utcnow()
     db.add(usuario)
-    db.commit()
-    db.refresh(usuario)
+    await db.commit()
+    # El login es un buen momento para refrescar la copia cacheada (ultimo_acceso, rol)
+    cache_usuarios.invalidar(usuario.id)
     
     access_token = create_access_token(data={"sub": str(usuario.id)})
     refresh_token = create_refresh_token(data={"sub": str(usuario.id)})
@@ -122,7 +132,7 @@ async def logout():
 @router.post("/refresh")
 async def refresh_token(
     refresh_token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         payload = decode_token(refresh_token)
@@ -135,7 +145,7 @@ async def refresh_token(
         
         user_id = int(payload.get("sub"))
         statement = select(Usuario).where(Usuario.id == user_id)
-        usuario = db.exec(statement).first()
+        usuario = (await db.exec(statement)).first()
         
         if not usuario or not usuario.activo:
             raise HTTPException(
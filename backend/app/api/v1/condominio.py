@@ -1,23 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session, select
-from typing import List
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
 
 # Dependencias
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_db
+from app.api.pagination import Paginacion
 
 
 from app.models.condominio import Condominio
+from app.services.kpis import kpis_condominio
+from app.services.particiones import inicio_mes, sumar_meses
 
 router = APIRouter(prefix="/condominios", tags=["Condominios"])
 
 # GET /condominios - Listar todos
 @router.get("", response_model=List[Condominio])
-async def listar_condominios(db: Session = Depends(get_db)):
+async def listar_condominios(
+    response: Response,
+    activo: Optional[bool] = None,
+    pagina: Paginacion = Depends(),
+    db: Session = Depends(get_db)
+):
     """
     Obtiene una lista de todos los condominios.
     """
-    items = db.exec(select(Condominio)).all()
-    return items
+    query = select(Condominio)
+    if activo is not None:
+        query = query.where(Condominio.activo == activo)
+
+    query = pagina.aplicar(query, Condominio.id)
+    items = db.exec(query).all()
+    return pagina.cerrar(items, response, Condominio.id)
 
 # POST /condominios - Crear
 @router.post("", response_model=Condominio, status_code=status.HTTP_201_CREATED)
@@ -49,6 +64,30 @@ async def obtener_condominio(item_id: int, db: Session = Depends(get_db)):
     
     return item
 
+# GET /condominios/{item_id}/kpis - Indicadores
+@router.get("/{item_id}/kpis")
+async def obtener_kpis(
+    item_id: int,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Recaudación vs facturación mensual, morosidad, multas por tipo y horas
+    reservadas por espacio común. Se lee de vistas materializadas que se
+    refrescan en segundo plano ("actualizado" indica cuándo).
+    Por defecto, los últimos 12 meses.
+    """
+    if not await db.get(Condominio, item_id):
+        raise HTTPException(status_code=404, detail="Condominio no encontrado")
+
+    hasta = hasta or date.today()
+    desde = desde or sumar_meses(inicio_mes(hasta), -11)
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha desde debe ser anterior a hasta")
+
+    return await kpis_condominio(db, item_id, desde, hasta)
+
 # PUT /condominios/{item_id} - Actualizar
 @router.put("/{item_id}", response_model=Condominio)
 async def actualizar_condominio(item_id: int, data: Condominio, db: Session = Depends(get_db)):
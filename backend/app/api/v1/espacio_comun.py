@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
+from datetime import date, time, timedelta
 
 # Dependencias
-from app.api.deps import get_db
+from app.api.deps import get_db, get_async_db
 
 # Importar el modelo
 from app.models.espacio_comun import EspacioComun
+from app.schemas.reserva import HorarioLibre, OcupacionDia
+from app.services.disponibilidad import (
+    SLOT_MINUTOS, SLOTS_POR_DIA, cache_ocupacion, horarios_libres
+)
+
+MAX_DIAS_DISPONIBILIDAD = 62
 
 router = APIRouter(prefix="/espacios-comunes", tags=["Espacios Comunes"])
 
@@ -60,6 +68,74 @@ async def obtener_espacio_comun(item_id: int, db: Session = Depends(get_db)):
     
     return item
 
+def _validar_rango(desde: date, hasta: date):
+    if hasta < desde:
+        raise HTTPException(status_code=400, detail="'hasta' debe ser igual o posterior a 'desde'")
+    if (hasta - desde).days >= MAX_DIAS_DISPONIBILIDAD:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El rango no puede superar {MAX_DIAS_DISPONIBILIDAD} días"
+        )
+
+# GET /espacios-comunes/{item_id}/disponibilidad - Calendario de ocupación
+@router.get("/{item_id}/disponibilidad", response_model=List[OcupacionDia])
+async def obtener_disponibilidad(
+    item_id: int,
+    desde: date,
+    hasta: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Ocupación por día de un espacio común en bloques de SLOT_MINUTOS, para el
+    calendario. Sale de un cache en memoria que se actualiza con cada reserva,
+    sin recorrer la tabla de reservas en cada consulta.
+    """
+    hasta = hasta or desde
+    _validar_rango(desde, hasta)
+    if not await db.get(EspacioComun, item_id):
+        raise HTTPException(status_code=404, detail="Espacio Común no encontrado")
+
+    ocupacion = await cache_ocupacion.ocupacion(db, item_id, desde, hasta)
+    dias = []
+    for dia in sorted(ocupacion):
+        mascara = ocupacion[dia]
+        ocupados = bin(mascara).count("1")
+        dias.append(OcupacionDia(
+            fecha=dia,
+            slot_minutos=SLOT_MINUTOS,
+            mapa=format(mascara, f"0{SLOTS_POR_DIA}b")[::-1],
+            slots_ocupados=ocupados,
+            porcentaje_ocupado=round(100 * ocupados / SLOTS_POR_DIA, 1),
+        ))
+    return dias
+
+# GET /espacios-comunes/{item_id}/horarios-libres - Bloques disponibles
+@router.get("/{item_id}/horarios-libres", response_model=List[HorarioLibre])
+async def obtener_horarios_libres(
+    item_id: int,
+    desde: date,
+    hasta: Optional[date] = None,
+    hora_apertura: time = Query(time(8, 0), description="Inicio de la ventana reservable de cada día"),
+    hora_cierre: time = Query(time(22, 0), description="Fin de la ventana reservable de cada día"),
+    duracion_minima: int = Query(60, ge=1, description="Minutos mínimos de un bloque libre"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Bloques libres de un espacio común entre 'desde' y 'hasta' (inclusive),
+    calculados en la base de datos a partir de las reservas no canceladas.
+    """
+    hasta = hasta or desde
+    _validar_rango(desde, hasta)
+    if hora_cierre <= hora_apertura:
+        raise HTTPException(status_code=400, detail="La hora de cierre debe ser posterior a la de apertura")
+
+    if not await db.get(EspacioComun, item_id):
+        raise HTTPException(status_code=404, detail="Espacio Común no encontrado")
+
+    return await horarios_libres(
+        db, item_id, desde, hasta, hora_apertura, hora_cierre, timedelta(minutes=duracion_minima)
+    )
+
 # PUT /espacios-comunes/{item_id} - Actualizar
 @router.put("/{item_id}", response_model=EspacioComun)
 async def actualizar_espacio_comun(item_id: int, data: EspacioComun, db: Session = Depends(get_db)):
@@ -0,0 +1,55 @@
+"""
+Streams SSE (Server-Sent Events) de alertas y estado de pagos.
+
+En el navegador:
+    const fuente = new EventSource(`${API}/eventos/condominios/${id}`);
+    fuente.addEventListener("alerta", (e) => { ...JSON.parse(e.data) });
+
+Eventos:
+- alerta (condominio): accion "registrada" o "resuelta", con ids
+- pago (condominio y residente): numero_transaccion y estado tras confirmar-pago
+"""
+import asyncio
+import json
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.services.eventos import central_eventos
+
+router = APIRouter(prefix="/eventos", tags=["Eventos"])
+
+
+async def _flujo(request: Request, tipo: str, id: int):
+    async with central_eventos.suscribir(tipo, id) as cola:
+        # El navegador reintenta solo si se corta la conexión
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            try:
+                datos = await asyncio.wait_for(cola.get(), timeout=settings.EVENTOS_PING_SEG)
+            except asyncio.TimeoutError:
+                # Mantiene viva la conexión a través de proxies
+                yield ": ping\n\n"
+                continue
+            yield f"event: {datos['evento']}\ndata: {json.dumps(datos)}\n\n"
+
+
+def _respuesta(request: Request, tipo: str, id: int) -> StreamingResponse:
+    return StreamingResponse(
+        _flujo(request, tipo, id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/condominios/{condominio_id}")
+async def eventos_condominio(condominio_id: int, request: Request):
+    """Alertas y pagos del condominio (panel de administración)"""
+    return _respuesta(request, "condominio", condominio_id)
+
+
+@router.get("/residentes/{residente_id}")
+async def eventos_residente(residente_id: int, request: Request):
+    """Estado de los pagos del residente (checkout)"""
+    return _respuesta(request, "residente", residente_id)
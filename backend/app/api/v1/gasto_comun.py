@@ -1,19 +1,32 @@
-import json
-from datetime import datetime
+import time
+from datetime import date, datetime
 from decimal import Decimal
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
-from sqlmodel import Session, select
-
-from app.api.deps import get_db
-from app.models.alerta import Alerta, TipoAlerta
-from app.models.gasto_comun import GastoComun
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import BaseModel, Field
+from sqlalchemy import insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_async_db
+from app.api.pagination import Paginacion
+from app.models.alerta import ENTIDAD_GASTO_COMUN, TipoAlerta
+from app.models.condominio import Condominio
+from app.models.correo import Correo, EstadoCorreo
+from app.models.gasto_comun import GastoComun, EstadoGastoComun, UQ_GASTO_PERIODO
+from app.models.gasto_comun_item import GastoComunItem
+from app.models.movimiento_cuenta import OrigenMovimiento
+from app.models.multa import Multa, EstadoMulta
 from app.models.registro import RegistroModel, TipoEvento
 from app.models.residente import Residente
-from app.schemas.gasto_comun import GastoComunInput
-from app.utils.email_service import send_email
+from app.schemas.gasto_comun import GastoComunInput, GastoComunLeer
+from app.services.alertas import alerta, registrar_alertas
+from app.services.cuenta import aporte_gasto, aporte_multa, registrar_edicion, registrar_movimiento, registrar_movimientos
+from app.services.email_dispatcher import despachador, encolar_correo
+from app.services.items_gasto import con_observaciones, reemplazar_items, un_gasto_con_observaciones
+from app.services.kpis import refresco_kpis
 
 router = APIRouter(prefix="/gastos-comunes", tags=["Gastos Comunes"])
 
@@ -31,31 +44,159 @@ class ReversionAjuste(BaseModel):
     usuario_id: int
 
 
-@router.get("", response_model=List[GastoComun])
-async def listar(db: Session = Depends(get_db)):
-    gastos = db.exec(select(GastoComun)).all()
-    return gastos
-
-
-@router.get("/{gasto_id}", response_model=GastoComun)
-async def obtener(gasto_id: int, db: Session = Depends(get_db)):
-    gasto = db.get(GastoComun, gasto_id)
+class GeneracionPeriodo(BaseModel):
+    condominio_id: int
+    mes: int = Field(ge=1, le=12)
+    anio: int
+    monto_base: Decimal = Field(ge=0)
+    cuota_mantencion: Decimal = Field(default=0, ge=0)
+    servicios: Decimal = Field(default=0, ge=0)
+    fecha_vencimiento: Optional[date] = None  # por defecto, el día 5 del mes siguiente
+
+
+# Un gasto por residente activo del condominio en un solo INSERT ... SELECT.
+# Si el residente ya tiene gasto en el periodo porque se le cargaron reservas
+# (monto_base y cuota_mantencion en 0), se completa sumando lo configurado a lo
+# que ya tiene; un gasto ya emitido o pagado no se toca, así que repetir el
+# proceso no duplica cobros. Todas las multas pendientes del residente emitidas
+# hasta el fin del mes (también las de meses anteriores cursadas después del
+# cobro de ese mes) se suman a `multas`, quedan como líneas de detalle (gasto_comun_items) y pasan a
+# FACTURADA: su deuda se cobra con el gasto, no como multa aparte (aporte_multa,
+# sincronización de pagos pendientes).
+SQL_GENERAR_PERIODO = text(f"""
+WITH multas_pendientes AS (
+    SELECT residente_id, sum(monto) AS total
+    FROM multas
+    WHERE condominio_id = :condominio_id
+      AND estado = 'PENDIENTE'
+      AND fecha_emision < CAST(:fin AS date)
+    GROUP BY residente_id
+),
+cargos AS (
+    SELECT r.id AS residente_id,
+           coalesce(m.total, 0) AS multas,
+           CAST(:monto_base AS numeric) + CAST(:cuota_mantencion AS numeric)
+               + CAST(:servicios AS numeric) + coalesce(m.total, 0) AS monto
+    FROM residentes r
+    LEFT JOIN multas_pendientes m ON m.residente_id = r.id
+    WHERE r.condominio_id = :condominio_id AND r.activo
+),
+gastos AS (
+    INSERT INTO gastos_comunes (
+        residente_id, condominio_id, mes, anio, monto_base, cuota_mantencion, servicios,
+        multas, monto_total, estado, fecha_emision, fecha_vencimiento
+    )
+    SELECT residente_id, :condominio_id, :mes, :anio, :monto_base, :cuota_mantencion, :servicios,
+           multas, monto, 'PENDIENTE', CAST(:emision AS date), CAST(:vencimiento AS date)
+    FROM cargos
+    ORDER BY residente_id
+    ON CONFLICT ON CONSTRAINT {UQ_GASTO_PERIODO} DO UPDATE SET
+        monto_base = EXCLUDED.monto_base,
+        cuota_mantencion = EXCLUDED.cuota_mantencion,
+        servicios = gastos_comunes.servicios + EXCLUDED.servicios,
+        multas = gastos_comunes.multas + EXCLUDED.multas,
+        monto_total = gastos_comunes.monto_total + EXCLUDED.monto_total,
+        fecha_emision = EXCLUDED.fecha_emision,
+        fecha_vencimiento = EXCLUDED.fecha_vencimiento
+    WHERE gastos_comunes.monto_base = 0
+      AND gastos_comunes.cuota_mantencion = 0
+      AND gastos_comunes.estado = 'PENDIENTE'
+    RETURNING id, residente_id, monto_total, (xmax = 0) AS creado
+),
+facturadas AS (
+    UPDATE multas m SET estado = 'FACTURADA'
+    FROM gastos g
+    WHERE m.residente_id = g.residente_id
+      AND m.condominio_id = :condominio_id
+      AND m.estado = 'PENDIENTE'
+      AND m.fecha_emision < CAST(:fin AS date)
+    RETURNING m.id, g.id AS gasto_comun_id, m.descripcion, m.monto, m.fecha_emision
+),
+items AS (
+    INSERT INTO gasto_comun_items (gasto_comun_id, tipo, descripcion, monto, fecha, datos)
+    SELECT gasto_comun_id, 'MULTA', descripcion, monto, fecha_emision, json_build_object('multa_id', id)
+    FROM facturadas
+),
+multas_gasto AS (
+    SELECT gasto_comun_id, sum(monto) AS total FROM facturadas GROUP BY gasto_comun_id
+)
+SELECT g.id, g.residente_id, g.monto_total, g.creado, c.monto AS cargo, c.multas,
+       coalesce(f.total, 0) AS multas_facturadas,
+       (SELECT count(*) FROM facturadas) AS multas_incluidas,
+       r.nombre, r.email, (r.suscrito_notificaciones AND r.email <> '') AS notificar
+FROM gastos g
+JOIN cargos c ON c.residente_id = g.residente_id
+JOIN residentes r ON r.id = g.residente_id
+LEFT JOIN multas_gasto f ON f.gasto_comun_id = g.id
+""")
+
+
+async def _guardar_periodo(db: AsyncSession, mes: int, anio: int):
+    """flush que responde 409 si el residente ya tiene un gasto común en ese periodo"""
+    try:
+        await db.flush()
+    except IntegrityError as e:
+        await db.rollback()
+        if UQ_GASTO_PERIODO in str(e.orig):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"El residente ya tiene un gasto común para {mes}/{anio}"
+            )
+        raise
+
+
+@router.get("", response_model=List[GastoComunLeer])
+async def listar(
+    response: Response,
+    condominio_id: Optional[int] = None,
+    residente_id: Optional[int] = None,
+    estado: Optional[EstadoGastoComun] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    pagina: Paginacion = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    query = select(GastoComun)
+    if condominio_id:
+        query = query.where(GastoComun.condominio_id == condominio_id)
+    if residente_id:
+        query = query.where(GastoComun.residente_id == residente_id)
+    if estado:
+        query = query.where(GastoComun.estado == estado)
+    if desde:
+        query = query.where(GastoComun.fecha_emision >= desde)
+    if hasta:
+        query = query.where(GastoComun.fecha_emision <= hasta)
+
+    query = pagina.aplicar(query, GastoComun.id)
+    gastos = (await db.exec(query)).all()
+    return await con_observaciones(db, pagina.cerrar(gastos, response, GastoComun.id))
+
+
+@router.get("/{gasto_id}", response_model=GastoComunLeer)
+async def obtener(gasto_id: int, db: AsyncSession = Depends(get_async_db)):
+    gasto = await db.get(GastoComun, gasto_id)
     if not gasto:
         raise HTTPException(status_code=404, detail="Gasto comun no encontrado")
-    return gasto
+    return await un_gasto_con_observaciones(db, gasto)
 
 
-@router.post("", response_model=GastoComun, status_code=status.HTTP_201_CREATED)
-async def crear(data: GastoComunInput, db: Session = Depends(get_db)):
-    gasto = GastoComun(**data.dict())
+@router.post("", response_model=GastoComunLeer, status_code=status.HTTP_201_CREATED)
+async def crear(data: GastoComunInput, db: AsyncSession = Depends(get_async_db)):
+    gasto = GastoComun(**data.dict(exclude={"observaciones"}))
     db.add(gasto)
-    db.commit()
-    db.refresh(gasto)
+    await _guardar_periodo(db, data.mes, data.anio)
+    await reemplazar_items(db, gasto.id, data.observaciones)
+    await registrar_movimiento(
+        db, gasto.residente_id, aporte_gasto(gasto), OrigenMovimiento.GASTO_COMUN,
+        gasto.id, f"Gasto común {gasto.mes}/{gasto.anio}"
+    )
 
-    residente = db.get(Residente, gasto.residente_id)
+    residente = await db.get(Residente, gasto.residente_id)
     if residente and residente.suscrito_notificaciones and residente.activo and residente.email:
-        enviado = send_email(
-            [residente.email],
+        encolar_correo(
+            db,
+            residente.email,
             f"[Casitas Teto] Gasto comun {gasto.mes}/{gasto.anio}",
             (
                 f"Hola {residente.nombre},\n\n"
@@ -64,52 +205,173 @@ async def crear(data: GastoComunInput, db: Session = Depends(get_db)):
                 f"Fecha de vencimiento: {gasto.fecha_vencimiento}\n\n"
                 f"Detalle: cuota mantencion {gasto.cuota_mantencion}, servicios {gasto.servicios}, multas {gasto.multas}.\n\n"
                 "Si no deseas recibir estas notificaciones, desactiva las notificaciones de correo en tu perfil.\n"
-            )
+            ),
+            residente_id=residente.id,
         )
-        if enviado:
-            residente.ultimo_correo_enviado = datetime.utcnow()
-            db.add(residente)
-            db.commit()
-            db.refresh(residente)
-
-    return gasto
 
-
-@router.put("/{gasto_id}", response_model=GastoComun)
-async def actualizar(gasto_id: int, data: GastoComunInput, db: Session = Depends(get_db)):
-    gasto = db.get(GastoComun, gasto_id)
+    await db.commit()
+    await db.refresh(gasto)
+
+    return await un_gasto_con_observaciones(db, gasto)
+
+
+@router.post("/generar-periodo", status_code=status.HTTP_200_OK)
+async def generar_periodo(data: GeneracionPeriodo, db: AsyncSession = Depends(get_async_db)):
+    """
+    Genera los gastos comunes de un periodo para todo un condominio con una
+    cantidad fija de statements: el upsert masivo (con las multas del mes como
+    detalle, marcadas FACTURADA), un UPDATE de saldos + INSERT de movimientos
+    y un INSERT de correos en la bandeja de salida. Es idempotente por (residente, mes, año).
+    """
+    if data.monto_base + data.cuota_mantencion <= 0:
+        # Con ambos en 0 un gasto completado seguiría pareciendo "solo reservas"
+        raise HTTPException(status_code=400, detail="El monto base o la cuota de mantención debe ser mayor a 0")
+    if not await db.get(Condominio, data.condominio_id):
+        raise HTTPException(status_code=404, detail="Condominio no encontrado")
+
+    fin_periodo = date(data.anio + 1, 1, 1) if data.mes == 12 else date(data.anio, data.mes + 1, 1)
+    fecha_vencimiento = data.fecha_vencimiento or fin_periodo.replace(day=5)
+    hoy = date.today()
+    tiempos = {}
+    t0 = inicio = time.perf_counter()
+
+    def marcar(fase: str):
+        nonlocal inicio
+        ahora = time.perf_counter()
+        tiempos[fase] = round((ahora - inicio) * 1000, 2)
+        inicio = ahora
+
+    # 1. Upsert de gastos + detalle de multas en un solo statement
+    filas = (await db.execute(SQL_GENERAR_PERIODO, {
+        "condominio_id": data.condominio_id,
+        "mes": data.mes,
+        "anio": data.anio,
+        "monto_base": data.monto_base,
+        "cuota_mantencion": data.cuota_mantencion,
+        "servicios": data.servicios,
+        "fin": fin_periodo,
+        "emision": hoy,
+        "vencimiento": fecha_vencimiento,
+    })).all()
+    marcar("generar_gastos")
+
+    # 2. Cuenta corriente: lo agregado a cada gasto (todos quedan PENDIENTE)
+    # menos las multas facturadas, que ya estaban en el saldo desde que se cursaron
+    descripcion = f"Gasto común {data.mes}/{data.anio}"
+    await registrar_movimientos(db, [
+        {
+            "residente_id": fila.residente_id,
+            "monto": fila.cargo - fila.multas_facturadas,
+            "origen": OrigenMovimiento.GASTO_COMUN,
+            "referencia_id": fila.id,
+            "descripcion": descripcion,
+        }
+        for fila in filas
+    ])
+    marcar("actualizar_saldos")
+
+    # 3. Correos: un INSERT masivo en la bandeja de salida
+    ahora = datetime.utcnow()
+    correos = [
+        {
+            "estado": EstadoCorreo.PENDIENTE,
+            "intentos": 0,
+            "proximo_intento": ahora,
+            "fecha_creacion": ahora,
+            "residente_id": fila.residente_id,
+            "destinatario": fila.email,
+            "asunto": f"[Casitas Teto] Gasto comun {data.mes}/{data.anio}",
+            "cuerpo": (
+                f"Hola {fila.nombre},\n\n"
+                f"Se ha generado tu gasto comun del mes {data.mes}/{data.anio}.\n"
+                f"Monto total: {fila.monto_total}\n"
+                f"Fecha de vencimiento: {fecha_vencimiento}\n\n"
+                f"Detalle: cuota mantencion {data.cuota_mantencion}, servicios {data.servicios}, multas {fila.multas}.\n\n"
+                "Si no deseas recibir estas notificaciones, desactiva las notificaciones de correo en tu perfil.\n"
+            ),
+        }
+        for fila in filas
+        if fila.notificar
+    ]
+    if correos:
+        await db.execute(insert(Correo), correos)
+    marcar("encolar_correos")
+
+    await db.commit()
+    marcar("commit")
+    if correos:
+        despachador.despertar()
+    if filas:
+        refresco_kpis.solicitar()
+
+    duracion = time.perf_counter() - t0
+    return {
+        "message": "Periodo generado",
+        "periodo": f"{data.mes}/{data.anio}",
+        "gastos_creados": sum(1 for fila in filas if fila.creado),
+        "gastos_completados": sum(1 for fila in filas if not fila.creado),
+        "multas_incluidas": filas[0].multas_incluidas if filas else 0,
+        "correos_encolados": len(correos),
+        "duracion_ms": round(duracion * 1000, 2),
+        "filas_por_segundo": round(len(filas) / duracion, 1) if filas else 0,
+        "tiempos_ms": tiempos,
+    }
+
+
+@router.put("/{gasto_id}", response_model=GastoComunLeer)
+async def actualizar(gasto_id: int, data: GastoComunInput, db: AsyncSession = Depends(get_async_db)):
+    gasto = await db.get(GastoComun, gasto_id)
     if not gasto:
         raise HTTPException(status_code=404, detail="Gasto comun no encontrado")
 
-    for key, value in data.dict(exclude_unset=True).items():
+    aporte_anterior = aporte_gasto(gasto)
+    residente_anterior = gasto.residente_id
+    cambios = data.dict(exclude_unset=True)
+    observaciones = cambios.pop("observaciones", None)
+    for key, value in cambios.items():
         setattr(gasto, key, value)
 
     db.add(gasto)
+    await _guardar_periodo(db, gasto.mes, gasto.anio)
+    if observaciones is not None:
+        await reemplazar_items(db, gasto.id, observaciones)
+    await registrar_edicion(
+        db, residente_anterior, gasto.residente_id, aporte_anterior, aporte_gasto(gasto),
+        OrigenMovimiento.GASTO_COMUN, gasto.id,
+        f"Edición gasto común {gasto.mes}/{gasto.anio}"
+    )
 
-    alerta_edicion = Alerta(
-        titulo="Edicion de Gasto Comun",
-        descripcion=f"El Gasto Comun ID {gasto_id} ({gasto.mes}/{gasto.anio}) ha sido modificado.",
-        tipo=TipoAlerta.EDICION_GASTO,
+    await registrar_alertas(db, [alerta(
+        "Edicion de Gasto Comun",
+        f"El Gasto Comun ID {gasto_id} ({gasto.mes}/{gasto.anio}) ha sido modificado.",
+        TipoAlerta.EDICION_GASTO,
         condominio_id=gasto.condominio_id,
-    )
-    db.add(alerta_edicion)
+        entidad_tipo=ENTIDAD_GASTO_COMUN,
+        entidad_id=gasto_id,
+    )])
 
-    db.commit()
-    db.refresh(gasto)
-    return gasto
+    await db.commit()
+    await db.refresh(gasto)
+    return await un_gasto_con_observaciones(db, gasto)
 
 
-@router.post("/{gasto_id}/ajustar", response_model=GastoComun)
-async def ajustar_monto(gasto_id: int, data: AjusteMonto, db: Session = Depends(get_db)):
-    gasto = db.get(GastoComun, gasto_id)
+@router.post("/{gasto_id}/ajustar", response_model=GastoComunLeer)
+async def ajustar_monto(gasto_id: int, data: AjusteMonto, db: AsyncSession = Depends(get_async_db)):
+    gasto = await db.get(GastoComun, gasto_id)
     if not gasto:
         raise HTTPException(status_code=404, detail="Gasto comun no encontrado")
 
     monto_original = float(gasto.monto_total)
+    aporte_anterior = aporte_gasto(gasto)
     gasto.monto_total = data.nuevo_monto
     db.add(gasto)
-    db.commit()
-    db.refresh(gasto)
+    await registrar_movimiento(
+        db, gasto.residente_id, aporte_gasto(gasto) - aporte_anterior,
+        OrigenMovimiento.GASTO_COMUN, gasto.id,
+        f"{'Condonación' if data.es_condonacion else 'Ajuste'} gasto común {gasto.mes}/{gasto.anio}"
+    )
+    await db.commit()
+    await db.refresh(gasto)
 
     registro = RegistroModel(
         usuario_id=data.usuario_id,
@@ -117,39 +379,37 @@ async def ajustar_monto(gasto_id: int, data: AjusteMonto, db: Session = Depends(
         detalle=f"Ajuste gasto comun ID {gasto_id}: {monto_original} -> {float(data.nuevo_monto)}",
         monto=float(data.nuevo_monto),
         condominio_id=gasto.condominio_id,
-        datos_adicionales=json.dumps(
-            {
-                "tipo_objeto": "GASTO",
-                "gasto_id": gasto_id,
-                "monto_original": monto_original,
-                "monto_editado": float(data.nuevo_monto),
-                "accion": "CONDONACION" if data.es_condonacion else "EDICION",
-                "motivo": data.motivo,
-                "revertible": True,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        ),
+        datos_adicionales={
+            "tipo_objeto": "GASTO",
+            "gasto_id": gasto_id,
+            "monto_original": monto_original,
+            "monto_editado": float(data.nuevo_monto),
+            "accion": "CONDONACION" if data.es_condonacion else "EDICION",
+            "motivo": data.motivo,
+            "revertible": True,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
     )
     db.add(registro)
-    db.commit()
+    await db.commit()
 
-    return gasto
+    return await un_gasto_con_observaciones(db, gasto)
 
 
-@router.post("/{gasto_id}/revertir", response_model=GastoComun)
-async def revertir_ajuste(gasto_id: int, data: ReversionAjuste, db: Session = Depends(get_db)):
-    gasto = db.get(GastoComun, gasto_id)
+@router.post("/{gasto_id}/revertir", response_model=GastoComunLeer)
+async def revertir_ajuste(gasto_id: int, data: ReversionAjuste, db: AsyncSession = Depends(get_async_db)):
+    gasto = await db.get(GastoComun, gasto_id)
     if not gasto:
         raise HTTPException(status_code=404, detail="Gasto comun no encontrado")
 
-    registro = db.get(RegistroModel, data.registro_id)
+    # La clave primaria es (id, fecha_creacion) por el particionado: se busca por id
+    registro = (await db.exec(
+        select(RegistroModel).where(RegistroModel.id == data.registro_id)
+    )).first()
     if not registro:
         raise HTTPException(status_code=404, detail="Registro no encontrado")
 
-    try:
-        meta = json.loads(registro.datos_adicionales or "{}")
-    except json.JSONDecodeError:
-        meta = {}
+    meta = registro.datos_adicionales if isinstance(registro.datos_adicionales, dict) else {}
 
     if meta.get("tipo_objeto") != "GASTO" or meta.get("gasto_id") != gasto_id:
         raise HTTPException(status_code=400, detail="El registro no corresponde a este gasto")
@@ -158,10 +418,16 @@ async def revertir_ajuste(gasto_id: int, data: ReversionAjuste, db: Session = De
     if monto_original is None:
         raise HTTPException(status_code=400, detail="El registro no contiene monto original para revertir")
 
+    aporte_anterior = aporte_gasto(gasto)
     gasto.monto_total = Decimal(str(monto_original))
     db.add(gasto)
-    db.commit()
-    db.refresh(gasto)
+    await registrar_movimiento(
+        db, gasto.residente_id, aporte_gasto(gasto) - aporte_anterior,
+        OrigenMovimiento.GASTO_COMUN, gasto.id,
+        f"Reversión ajuste gasto común {gasto.mes}/{gasto.anio}"
+    )
+    await db.commit()
+    await db.refresh(gasto)
 
     registro_reversion = RegistroModel(
         usuario_id=data.usuario_id,
@@ -169,30 +435,51 @@ async def revertir_ajuste(gasto_id: int, data: ReversionAjuste, db: Session = De
         detalle=f"Reversion ajuste gasto comun ID {gasto_id}: restaura a {monto_original}",
         monto=float(gasto.monto_total),
         condominio_id=gasto.condominio_id,
-        datos_adicionales=json.dumps(
-            {
-                "tipo_objeto": "GASTO",
-                "gasto_id": gasto_id,
-                "accion": "REVERSION",
-                "registro_revertido": data.registro_id,
-                "monto_restaurado": monto_original,
-                "motivo": data.motivo,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        ),
+        datos_adicionales={
+            "tipo_objeto": "GASTO",
+            "gasto_id": gasto_id,
+            "accion": "REVERSION",
+            "registro_revertido": data.registro_id,
+            "monto_restaurado": monto_original,
+            "motivo": data.motivo,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
     )
     db.add(registro_reversion)
-    db.commit()
+    await db.commit()
 
-    return gasto
+    return await un_gasto_con_observaciones(db, gasto)
 
 
 @router.delete("/{gasto_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def eliminar(gasto_id: int, db: Session = Depends(get_db)):
-    gasto = db.get(GastoComun, gasto_id)
+async def eliminar(gasto_id: int, db: AsyncSession = Depends(get_async_db)):
+    gasto = await db.get(GastoComun, gasto_id)
     if not gasto:
         raise HTTPException(status_code=404, detail="Gasto comun no encontrado")
 
-    db.delete(gasto)
-    db.commit()
+    await registrar_movimiento(
+        db, gasto.residente_id, -aporte_gasto(gasto), OrigenMovimiento.GASTO_COMUN,
+        gasto.id, f"Eliminación gasto común {gasto.mes}/{gasto.anio}"
+    )
+    # Las multas facturadas en el gasto vuelven a ser deuda aparte: su detalle
+    # se borra con el gasto y sin esto su monto saldría del saldo y del pago
+    multas_facturadas = (await db.exec(
+        select(Multa).where(
+            Multa.estado == EstadoMulta.FACTURADA,
+            Multa.id.in_(
+                select(GastoComunItem.datos["multa_id"].as_integer())
+                .where(GastoComunItem.gasto_comun_id == gasto.id, GastoComunItem.tipo == "MULTA")
+            ),
+        )
+    )).all()
+    for multa in multas_facturadas:
+        aporte_anterior = aporte_multa(multa)
+        multa.estado = EstadoMulta.PENDIENTE
+        db.add(multa)
+        await registrar_movimiento(
+            db, multa.residente_id, aporte_multa(multa) - aporte_anterior, OrigenMovimiento.MULTA,
+            multa.id, f"Multa separada del gasto común {gasto.mes}/{gasto.anio} eliminado"
+        )
+    await db.delete(gasto)
+    await db.commit()
     return None
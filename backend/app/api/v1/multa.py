@@ -1,20 +1,29 @@
-import json
+import time
 from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel
-from sqlmodel import Session, select
-
-from app.api.deps import get_db
-from app.models.alerta import Alerta, TipoAlerta
+from sqlalchemy import Integer, any_, bindparam, func, insert, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_async_db
+from app.api.pagination import Paginacion
+from app.models.alerta import ENTIDAD_RESIDENTE, TipoAlerta
+from app.models.correo import Correo, EstadoCorreo
 from app.models.gasto_comun import GastoComun, EstadoGastoComun
+from app.models.movimiento_cuenta import OrigenMovimiento
 from app.models.multa import Multa, TipoMulta, EstadoMulta
 from app.models.registro import RegistroModel, TipoEvento
 from app.models.residente import Residente
 from app.models.usuario import Usuario
-from app.utils.email_service import send_email
+from app.services.alertas import alerta, registrar_alertas
+from app.services.cuenta import aporte_multa, registrar_edicion, registrar_movimiento, registrar_movimientos
+from app.services.email_dispatcher import despachador, encolar_correo
+from app.services.kpis import refresco_kpis
 
 router = APIRouter(prefix="/multas", tags=["Multas"])
 
@@ -34,40 +43,64 @@ class ReversionMulta(BaseModel):
 
 @router.get("", response_model=List[Multa])
 async def listar_multas(
+    response: Response,
     residente_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    condominio_id: Optional[int] = None,
+    estado: Optional[EstadoMulta] = None,
+    tipo: Optional[TipoMulta] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    pagina: Paginacion = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
     query = select(Multa)
     if residente_id:
         query = query.where(Multa.residente_id == residente_id)
-    return db.exec(query).all()
+    if condominio_id:
+        query = query.where(Multa.condominio_id == condominio_id)
+    if estado:
+        query = query.where(Multa.estado == estado)
+    if tipo:
+        query = query.where(Multa.tipo == tipo)
+    if desde:
+        query = query.where(Multa.fecha_emision >= desde)
+    if hasta:
+        query = query.where(Multa.fecha_emision <= hasta)
+
+    # Más recientes primero
+    query = pagina.aplicar(query, Multa.id, descendente=True)
+    return pagina.cerrar((await db.exec(query)).all(), response, Multa.id)
 
 
 @router.post("", response_model=Multa, status_code=status.HTTP_201_CREATED)
-async def crear_multa(data: Multa, db: Session = Depends(get_db)):
+async def crear_multa(data: Multa, db: AsyncSession = Depends(get_async_db)):
     if not data.estado:
         data.estado = EstadoMulta.PENDIENTE
 
     db.add(data)
+    await db.flush()
+    await registrar_movimiento(
+        db, data.residente_id, aporte_multa(data), OrigenMovimiento.MULTA,
+        data.id, f"Multa: {data.descripcion}"
+    )
 
-    alerta = Alerta(
-        titulo="Nueva Multa Cursada (Manual)",
-        descripcion=(
+    await registrar_alertas(db, [alerta(
+        "Nueva Multa Cursada (Manual)",
+        (
             f"Se ha cursado una multa manual de ${data.monto} al residente ID "
             f"{data.residente_id}. Motivo: {data.descripcion}"
         ),
-        tipo=TipoAlerta.MULTA,
+        TipoAlerta.MULTA,
         condominio_id=data.condominio_id,
-    )
-    db.add(alerta)
+        entidad_tipo=ENTIDAD_RESIDENTE,
+        entidad_id=data.residente_id,
+    )])
 
-    db.commit()
-    db.refresh(data)
-
-    residente = db.get(Residente, data.residente_id)
+    residente = await db.get(Residente, data.residente_id)
     if residente and residente.suscrito_notificaciones and residente.activo and residente.email:
-        enviado = send_email(
-            [residente.email],
+        encolar_correo(
+            db,
+            residente.email,
             f"[Casitas Teto] Nueva multa: {data.tipo}",
             (
                 f"Hola {residente.nombre},\n\n"
@@ -78,112 +111,206 @@ async def crear_multa(data: Multa, db: Session = Depends(get_db)):
                 f"Fecha de emisión: {data.fecha_emision}\n\n"
                 "Si no deseas recibir estas notificaciones, desactiva las notificaciones de correo en tu perfil.\n"
             ),
+            residente_id=residente.id,
         )
-        if enviado:
-            residente.ultimo_correo_enviado = datetime.utcnow()
-            db.add(residente)
-            db.commit()
-            db.refresh(residente)
+
+    await db.commit()
+    await db.refresh(data)
 
     return data
 
 
+MONTO_MULTA_ATRASO = Decimal("5000.00")
+
+
 @router.post("/procesar-atrasos", status_code=status.HTTP_200_OK)
 async def procesar_atrasos(
     admin_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    """
+    Marca como VENCIDO los gastos comunes pendientes con fecha de vencimiento
+    pasada y genera una multa RETRASO_PAGO (más su alerta) por cada uno.
+    Todo se hace por conjuntos (UPDATE, anti-join e INSERT masivos), con una
+    cantidad fija de statements sin importar la cantidad de gastos. Los saldos
+    de las cuentas corrientes y la bandeja de correos se actualizan en la misma
+    transacción; los correos los envía el despachador.
+    """
     today = date.today()
-
-    gastos_vencidos = db.exec(
-        select(GastoComun).where(
+    tiempos = {}
+    inicio = time.perf_counter()
+
+    def marcar(fase: str):
+        nonlocal inicio
+        ahora = time.perf_counter()
+        tiempos[fase] = round((ahora - inicio) * 1000, 2)
+        inicio = ahora
+
+    # 1. Marcar vencidos en un solo UPDATE
+    gastos_vencidos = (await db.execute(
+        update(GastoComun)
+        .where(
             GastoComun.fecha_vencimiento < today,
             GastoComun.estado == EstadoGastoComun.PENDIENTE,
         )
-    ).all()
-
-    multas_creadas = 0
-
-    for gc in gastos_vencidos:
-        gc.estado = EstadoGastoComun.VENCIDO
-        db.add(gc)
-
-        descripcion_multa = f"Multa automática por atraso Gasto Común {gc.mes}/{gc.anio}"
-
-        existe_multa = db.exec(
-            select(Multa).where(
-                Multa.residente_id == gc.residente_id,
-                Multa.descripcion == descripcion_multa,
-                Multa.tipo == TipoMulta.RETRASO_PAGO,
-            )
-        ).first()
-
-        if existe_multa:
-            continue
-
-        monto_multa = Decimal("5000.00")
-        nueva_multa = Multa(
-            residente_id=gc.residente_id,
-            condominio_id=gc.condominio_id,
-            tipo=TipoMulta.RETRASO_PAGO,
-            descripcion=descripcion_multa,
-            monto=monto_multa,
-            estado=EstadoMulta.PENDIENTE,
-            fecha_emision=today,
-            creado_por=admin_id,
+        .values(estado=EstadoGastoComun.VENCIDO)
+        .returning(GastoComun.id)
+    )).scalars().all()
+    marcar("marcar_vencidos")
+
+    # 2. Anti-join: gastos vencidos que aún no tienen su multa RETRASO_PAGO
+    descripcion_multa = func.concat(
+        "Multa automática por atraso Gasto Común ",
+        GastoComun.mes, "/", GastoComun.anio,
+    )
+    multa_existente = (
+        select(Multa.id)
+        .where(
+            Multa.residente_id == GastoComun.residente_id,
+            Multa.tipo == TipoMulta.RETRASO_PAGO,
+            Multa.descripcion == descripcion_multa,
         )
-        db.add(nueva_multa)
+        .exists()
+    )
+    pendientes = []
+    if gastos_vencidos:
+        pendientes = (await db.execute(
+            select(
+                GastoComun.residente_id,
+                GastoComun.condominio_id,
+                GastoComun.mes,
+                GastoComun.anio,
+                descripcion_multa.label("descripcion"),
+            )
+            .where(
+                GastoComun.id == any_(bindparam("ids", gastos_vencidos, type_=ARRAY(Integer))),
+                ~multa_existente,
+            )
+        )).all()
+    marcar("detectar_multas_existentes")
 
-        alerta_morosidad = Alerta(
-            titulo="Morosidad Detectada",
-            descripcion=(
+    # 3. Inserción masiva de multas y alertas
+    multas_creadas = []
+    if pendientes:
+        multas_creadas = (await db.execute(insert(Multa).returning(Multa.id, Multa.residente_id, Multa.descripcion), [
+            {
+                "residente_id": gc.residente_id,
+                "condominio_id": gc.condominio_id,
+                "tipo": TipoMulta.RETRASO_PAGO,
+                "descripcion": gc.descripcion,
+                "monto": MONTO_MULTA_ATRASO,
+                "estado": EstadoMulta.PENDIENTE,
+                "fecha_emision": today,
+                "creado_por": admin_id,
+            }
+            for gc in pendientes
+        ])).all()
+    marcar("insertar_multas")
+
+    await registrar_movimientos(db, [
+        {
+            "residente_id": multa.residente_id,
+            "monto": MONTO_MULTA_ATRASO,
+            "origen": OrigenMovimiento.MULTA,
+            "referencia_id": multa.id,
+            "descripcion": multa.descripcion,
+        }
+        for multa in multas_creadas
+    ])
+    marcar("actualizar_saldos")
+
+    # Una alerta por residente (varios gastos vencidos del mismo residente se agrupan)
+    alertas = await registrar_alertas(db, [
+        alerta(
+            "Morosidad Detectada",
+            (
                 f"El residente ID {gc.residente_id} ha pasado a morosidad por "
                 f"Gasto Común {gc.mes}/{gc.anio}. Se generó multa automática."
             ),
-            tipo=TipoAlerta.MOROSIDAD,
+            TipoAlerta.MOROSIDAD,
             condominio_id=gc.condominio_id,
+            entidad_tipo=ENTIDAD_RESIDENTE,
+            entidad_id=gc.residente_id,
         )
-        db.add(alerta_morosidad)
-
-        residente = db.get(Residente, gc.residente_id)
-        if residente and residente.suscrito_notificaciones and residente.activo and residente.email:
-            enviado = send_email(
-                [residente.email],
-                f"[Casitas Teto] Multa automática: {nueva_multa.descripcion}",
-                (
+        for gc in pendientes
+    ])
+    marcar("insertar_alertas")
+
+    # 4. Correos: una sola consulta de residentes y un INSERT masivo en la bandeja
+    correos = []
+    if pendientes:
+        ahora = datetime.utcnow()
+        residentes = {
+            r.id: r for r in (await db.exec(
+                select(Residente).where(
+                    Residente.id == any_(bindparam(
+                        "residentes",
+                        list({gc.residente_id for gc in pendientes}),
+                        type_=ARRAY(Integer),
+                    )),
+                    Residente.suscrito_notificaciones == True,
+                    Residente.activo == True,
+                )
+            )).all()
+        }
+        for gc in pendientes:
+            residente = residentes.get(gc.residente_id)
+            if not residente or not residente.email:
+                continue
+            correos.append({
+                "estado": EstadoCorreo.PENDIENTE,
+                "intentos": 0,
+                "proximo_intento": ahora,
+                "fecha_creacion": ahora,
+                "residente_id": residente.id,
+                "destinatario": residente.email,
+                "asunto": f"[Casitas Teto] Multa automática: {gc.descripcion}",
+                "cuerpo": (
                     f"Hola {residente.nombre},\n\n"
                     f"Se ha generado una multa automática por morosidad del gasto común {gc.mes}/{gc.anio}.\n"
-                    f"Monto: {nueva_multa.monto}\n"
-                    f"Fecha de emisión: {nueva_multa.fecha_emision}\n\n"
+                    f"Monto: {MONTO_MULTA_ATRASO}\n"
+                    f"Fecha de emisión: {today}\n\n"
                     "Si no deseas recibir estas notificaciones, desactiva las notificaciones de correo en tu perfil.\n"
                 ),
-            )
-            if enviado:
-                residente.ultimo_correo_enviado = datetime.utcnow()
-                db.add(residente)
-
-        multas_creadas += 1
-
-    db.commit()
+            })
+        if correos:
+            await db.execute(insert(Correo), correos)
+    marcar("encolar_correos")
+
+    await db.commit()
+    marcar("commit")
+    if correos:
+        despachador.despertar()
+    if gastos_vencidos:
+        refresco_kpis.solicitar()
 
     return {
         "message": "Proceso completado",
         "gastos_vencidos_detectados": len(gastos_vencidos),
-        "multas_creadas": multas_creadas,
+        "multas_creadas": len(pendientes),
+        "alertas_registradas": alertas,
+        "correos_encolados": len(correos),
+        "tiempos_ms": tiempos,
     }
 
 
 @router.post("/{multa_id}/ajustar", response_model=Multa)
-async def ajustar_multa(multa_id: int, data: AjusteMulta, db: Session = Depends(get_db)):
-    multa = db.get(Multa, multa_id)
+async def ajustar_multa(multa_id: int, data: AjusteMulta, db: AsyncSession = Depends(get_async_db)):
+    multa = await db.get(Multa, multa_id)
     if not multa:
         raise HTTPException(status_code=404, detail="Multa no encontrada")
 
     monto_original = float(multa.monto)
+    aporte_anterior = aporte_multa(multa)
     multa.monto = data.nuevo_monto
     db.add(multa)
-    db.commit()
-    db.refresh(multa)
+    await registrar_movimiento(
+        db, multa.residente_id, aporte_multa(multa) - aporte_anterior,
+        OrigenMovimiento.MULTA, multa.id,
+        f"{'Condonación' if data.es_condonacion else 'Ajuste'} multa ID {multa_id}"
+    )
+    await db.commit()
+    await db.refresh(multa)
 
     registro = RegistroModel(
         usuario_id=data.usuario_id,
@@ -191,39 +318,37 @@ async def ajustar_multa(multa_id: int, data: AjusteMulta, db: Session = Depends(
         detalle=f"Ajuste multa ID {multa_id}: {monto_original} -> {float(data.nuevo_monto)}",
         monto=float(data.nuevo_monto),
         condominio_id=multa.condominio_id,
-        datos_adicionales=json.dumps(
-            {
-                "tipo_objeto": "MULTA",
-                "multa_id": multa_id,
-                "monto_original": monto_original,
-                "monto_editado": float(data.nuevo_monto),
-                "accion": "CONDONACION" if data.es_condonacion else "EDICION",
-                "motivo": data.motivo,
-                "revertible": True,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        ),
+        datos_adicionales={
+            "tipo_objeto": "MULTA",
+            "multa_id": multa_id,
+            "monto_original": monto_original,
+            "monto_editado": float(data.nuevo_monto),
+            "accion": "CONDONACION" if data.es_condonacion else "EDICION",
+            "motivo": data.motivo,
+            "revertible": True,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
     )
     db.add(registro)
-    db.commit()
+    await db.commit()
 
     return multa
 
 
 @router.post("/{multa_id}/revertir", response_model=Multa)
-async def revertir_multa(multa_id: int, data: ReversionMulta, db: Session = Depends(get_db)):
-    multa = db.get(Multa, multa_id)
+async def revertir_multa(multa_id: int, data: ReversionMulta, db: AsyncSession = Depends(get_async_db)):
+    multa = await db.get(Multa, multa_id)
     if not multa:
         raise HTTPException(status_code=404, detail="Multa no encontrada")
 
-    registro = db.get(RegistroModel, data.registro_id)
+    # La clave primaria es (id, fecha_creacion) por el particionado: se busca por id
+    registro = (await db.exec(
+        select(RegistroModel).where(RegistroModel.id == data.registro_id)
+    )).first()
     if not registro:
         raise HTTPException(status_code=404, detail="Registro no encontrado")
 
-    try:
-        meta = json.loads(registro.datos_adicionales or "{}")
-    except json.JSONDecodeError:
-        meta = {}
+    meta = registro.datos_adicionales if isinstance(registro.datos_adicionales, dict) else {}
 
     if meta.get("tipo_objeto") != "MULTA" or meta.get("multa_id") != multa_id:
         raise HTTPException(status_code=400, detail="El registro no corresponde a esta multa")
@@ -232,10 +357,15 @@ async def revertir_multa(multa_id: int, data: ReversionMulta, db: Session = Depe
     if monto_original is None:
         raise HTTPException(status_code=400, detail="El registro no contiene monto original para revertir")
 
+    aporte_anterior = aporte_multa(multa)
     multa.monto = Decimal(str(monto_original))
     db.add(multa)
-    db.commit()
-    db.refresh(multa)
+    await registrar_movimiento(
+        db, multa.residente_id, aporte_multa(multa) - aporte_anterior,
+        OrigenMovimiento.MULTA, multa.id, f"Reversión ajuste multa ID {multa_id}"
+    )
+    await db.commit()
+    await db.refresh(multa)
 
     registro_reversion = RegistroModel(
         usuario_id=data.usuario_id,
@@ -243,54 +373,62 @@ async def revertir_multa(multa_id: int, data: ReversionMulta, db: Session = Depe
         detalle=f"Reversion ajuste multa ID {multa_id}: restaura a {monto_original}",
         monto=float(multa.monto),
         condominio_id=multa.condominio_id,
-        datos_adicionales=json.dumps(
-            {
-                "tipo_objeto": "MULTA",
-                "multa_id": multa_id,
-                "accion": "REVERSION",
-                "registro_revertido": data.registro_id,
-                "monto_restaurado": monto_original,
-                "motivo": data.motivo,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        ),
+        datos_adicionales={
+            "tipo_objeto": "MULTA",
+            "multa_id": multa_id,
+            "accion": "REVERSION",
+            "registro_revertido": data.registro_id,
+            "monto_restaurado": monto_original,
+            "motivo": data.motivo,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
     )
     db.add(registro_reversion)
-    db.commit()
+    await db.commit()
 
     return multa
 
 
 @router.get("/{item_id}", response_model=Multa)
-async def obtener_multa(item_id: int, db: Session = Depends(get_db)):
-    item = db.get(Multa, item_id)
+async def obtener_multa(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(Multa, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Multa no encontrada")
     return item
 
 
 @router.put("/{item_id}", response_model=Multa)
-async def actualizar_multa(item_id: int, data: Multa, db: Session = Depends(get_db)):
-    item = db.get(Multa, item_id)
+async def actualizar_multa(item_id: int, data: Multa, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(Multa, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Multa no encontrada")
 
+    aporte_anterior = aporte_multa(item)
+    residente_anterior = item.residente_id
     update_data = data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(item, key, value)
 
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    await registrar_edicion(
+        db, residente_anterior, item.residente_id, aporte_anterior, aporte_multa(item),
+        OrigenMovimiento.MULTA, item.id, f"Edición multa ID {item_id}"
+    )
+    await db.commit()
+    await db.refresh(item)
     return item
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def eliminar_multa(item_id: int, db: Session = Depends(get_db)):
-    item = db.get(Multa, item_id)
+async def eliminar_multa(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(Multa, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Multa no encontrada")
 
-    db.delete(item)
-    db.commit()
+    await registrar_movimiento(
+        db, item.residente_id, -aporte_multa(item), OrigenMovimiento.MULTA,
+        item.id, f"Eliminación multa ID {item_id}"
+    )
+    await db.delete(item)
+    await db.commit()
     return None
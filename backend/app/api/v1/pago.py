@@ -1,14 +1,18 @@
 # backend/app/api/v1/pagos.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime, time
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_async_db, get_current_user
+from app.api.pagination import Paginacion
 from app.models.pago import (
     Pago,
     PagoCreate, # Importamos el nuevo esquema
-    EstadoPago
+    EstadoPago,
+    UQ_PAGO_PENDIENTE
 )
 from app.models.residente import Residente # Necesitamos esto para buscar al residente
 
@@ -17,11 +21,15 @@ router = APIRouter(prefix="/pagos", tags=["Pagos"])
 # GET /pagos - Listar todos
 @router.get("", response_model=List[Pago])
 async def listar_pagos(
+    response: Response,
     condominio_id: Optional[int] = None,
     residente_id: Optional[int] = None,
     tipo: Optional[str] = None,
     estado_pago: Optional[str] = None,
-    db: Session = Depends(get_db)
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    pagina: Paginacion = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     query = select(Pago)
     
@@ -33,15 +41,21 @@ async def listar_pagos(
         query = query.where(Pago.tipo == tipo)
     if estado_pago:
         query = query.where(Pago.estado_pago == estado_pago)
+    if desde:
+        query = query.where(Pago.fecha_pago >= datetime.combine(desde, time.min))
+    if hasta:
+        query = query.where(Pago.fecha_pago <= datetime.combine(hasta, time.max))
     
-    items = db.exec(query).all()
-    return items
+    # Más recientes primero
+    query = pagina.aplicar(query, Pago.id, descendente=True)
+    items = (await db.exec(query)).all()
+    return pagina.cerrar(items, response, Pago.id)
 
 # POST /pagos - Crear (ACTUALIZADO)
 @router.post("", response_model=Pago, status_code=status.HTTP_201_CREATED)
 async def crear_pago(
     pago_in: PagoCreate, # Usamos el esquema de entrada
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     # 1. Determinar el residente_id real
@@ -50,7 +64,7 @@ async def crear_pago(
     # Si el usuario es un RESIDENTE, ignoramos el ID que mande y buscamos su propio registro de residente
     if current_user.rol == "RESIDENTE":
         statement = select(Residente).where(Residente.usuario_id == current_user.id)
-        residente_db = db.exec(statement).first()
+        residente_db = (await db.exec(statement)).first()
         
         if not residente_db:
             raise HTTPException(
@@ -78,14 +92,23 @@ async def crear_pago(
     )
     
     db.add(pago)
-    db.commit()
-    db.refresh(pago)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if UQ_PAGO_PENDIENTE in str(e.orig):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Ya existe un pago pendiente para ese concepto"
+            )
+        raise
+    await db.refresh(pago)
     return pago
 
 # GET /pagos/{id} - Obtener uno
 @router.get("/{pago_id}", response_model=Pago)
-async def obtener_pago(pago_id: int, db: Session = Depends(get_db)):
-    item = db.get(Pago, pago_id)
+async def obtener_pago(pago_id: int, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(Pago, pago_id)
     if not item:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
     return item
@@ -95,9 +118,9 @@ async def obtener_pago(pago_id: int, db: Session = Depends(get_db)):
 async def actualizar_pago(
     pago_id: int, 
     pago_data: PagoCreate, # Podrías crear un PagoUpdate opcional si prefieres
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    item = db.get(Pago, pago_id)
+    item = await db.get(Pago, pago_id)
     if not item:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
     
@@ -114,14 +137,14 @@ async def actualizar_pago(
             setattr(item, key, value)
     
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
     return item
 
 # DELETE /pagos/{id} - Eliminar
 @router.delete("/{pago_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def eliminar_pago(pago_id: int, db: Session = Depends(get_db)):
-    item = db.get(Pago, pago_id)
+async def eliminar_pago(pago_id: int, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(Pago, pago_id)
     if not item:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
     
@@ -131,6 +154,6 @@ async def eliminar_pago(pago_id: int, db: Session = Depends(get_db)):
             detail="No se pueden eliminar pagos aprobados"
         )
     
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
     return None
\ No newline at end of file
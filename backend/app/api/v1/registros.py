@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session, select
 from typing import List, Optional
+from datetime import date, datetime, time
+from app.api.pagination import Paginacion
 from app.core.database import get_session
-from app.models.registro import RegistroModel, Registro, RegistroCreate, TipoEvento
+from app.models.registro import (
+    RegistroModel, Registro, RegistroCreate, TipoEvento, CLAVE_OBJETO, datos_desde_texto
+)
 from app.models.usuario import Usuario as UsuarioModel
 
 router = APIRouter(prefix="/registros", tags=["registros"])
@@ -10,13 +14,22 @@ router = APIRouter(prefix="/registros", tags=["registros"])
 
 @router.get("/", response_model=List[Registro])
 async def get_registros(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
     tipo_evento: Optional[TipoEvento] = None,
     condominio_id: Optional[int] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    tipo_objeto: Optional[str] = None,
+    objeto_id: Optional[int] = None,
+    accion: Optional[str] = None,
+    pagina: Paginacion = Depends(),
     session: Session = Depends(get_session)
 ):
-    """Obtener todos los registros con filtros opcionales"""
+    """
+    Obtener todos los registros con filtros opcionales.
+    tipo_objeto (MULTA/GASTO), objeto_id y accion filtran por datos_adicionales
+    (p. ej. los ajustes de una multa) con el índice GIN de la columna.
+    """
     statement = select(RegistroModel, UsuarioModel).join(
         UsuarioModel, RegistroModel.usuario_id == UsuarioModel.id
     )
@@ -26,11 +39,41 @@ async def get_registros(
     
     if condominio_id:
         statement = statement.where(RegistroModel.condominio_id == condominio_id)
+
+    if desde:
+        statement = statement.where(RegistroModel.fecha_creacion >= datetime.combine(desde, time.min))
+
+    if hasta:
+        statement = statement.where(RegistroModel.fecha_creacion <= datetime.combine(hasta, time.max))
+
+    contenido = {}
+    if tipo_objeto:
+        contenido["tipo_objeto"] = tipo_objeto
+    if objeto_id is not None:
+        if tipo_objeto not in CLAVE_OBJETO:
+            raise HTTPException(
+                status_code=400,
+                detail=f"objeto_id requiere tipo_objeto ({', '.join(CLAVE_OBJETO)})"
+            )
+        contenido[CLAVE_OBJETO[tipo_objeto]] = objeto_id
+    if accion:
+        contenido["accion"] = accion
+    if contenido:
+        statement = statement.where(RegistroModel.datos_adicionales.contains(contenido))
     
-    # Ordenar por fecha de creación descendente (lo más nuevo primero)
-    statement = statement.offset(skip).limit(limit).order_by(RegistroModel.fecha_creacion.desc())
+    # Ordenar por fecha de creación descendente (lo más nuevo primero).
+    # Keyset sobre (fecha_creacion, id): las páginas profundas cuestan lo mismo que la primera
+    statement = pagina.aplicar(
+        statement, RegistroModel.fecha_creacion, RegistroModel.id, descendente=True
+    )
     
-    results = session.exec(statement).all()
+    results = pagina.cerrar(
+        session.exec(statement).all(),
+        response,
+        RegistroModel.fecha_creacion,
+        RegistroModel.id,
+        objeto=lambda fila: fila[0],
+    )
     
     # Combinar datos de registro y usuario
     registros = []
@@ -78,7 +121,8 @@ async def create_registro(
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
     # Crear el registro
-    registro = RegistroModel(**registro_data.model_dump())
+    registro = RegistroModel(**registro_data.model_dump(exclude={"datos_adicionales"}))
+    registro.datos_adicionales = datos_desde_texto(registro_data.datos_adicionales)
     session.add(registro)
     session.commit()
     session.refresh(registro)
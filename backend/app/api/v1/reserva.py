@@ -1,23 +1,31 @@
-﻿from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, text
+﻿from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlmodel import select, text
+from sqlalchemy import case, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from typing import List, Optional, Tuple
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
+from app.api.pagination import Paginacion
 from app.models.reserva import Reserva, EstadoReserva
 from app.models.espacio_comun import EspacioComun
-from app.models.gasto_comun import GastoComun, EstadoGastoComun
+from app.models.gasto_comun import GastoComun, EstadoGastoComun, UQ_GASTO_PERIODO
+from app.models.gasto_comun_item import GastoComunItem
+from app.models.movimiento_cuenta import OrigenMovimiento
 from app.models.usuario import Usuario, RolUsuario
 from app.models.residente import Residente
 from app.schemas.reserva import ReservaCreate
 from app.core.security import get_current_user
-from app.utils.email_service import send_email
+from app.services.cuenta import aporte_gasto, registrar_movimiento
+from app.services.disponibilidad import bloquear_espacios, cache_ocupacion, es_traslape
+from app.services.email_dispatcher import encolar_correo
 
 router = APIRouter(prefix="/reservas", tags=["Reservas"])
 
-def get_or_create_admin_residente(db: Session, user: Usuario) -> Residente:
+async def get_or_create_admin_residente(db: AsyncSession, user: Usuario) -> Residente:
     """
     Busca si el usuario admin ya tiene un perfil de residente asociado.
     Si no, crea uno 'dummy' para permitirle hacer reservas.
@@ -27,7 +35,7 @@ def get_or_create_admin_residente(db: Session, user: Usuario) -> Residente:
         raise HTTPException(status_code=400, detail="El administrador no tiene condominio asignado")
 
     query = select(Residente).where(Residente.usuario_id == user.id)
-    residente = db.exec(query).first()
+    residente = (await db.exec(query)).first()
     
     if residente:
         return residente
@@ -49,49 +57,52 @@ def get_or_create_admin_residente(db: Session, user: Usuario) -> Residente:
     
     try:
         db.add(nuevo_residente)
-        db.commit()
-        db.refresh(nuevo_residente)
+        await db.commit()
+        await db.refresh(nuevo_residente)
         return nuevo_residente
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         if "residentes_pkey" in str(e):
             try:
                 sync_sql = text("SELECT setval(pg_get_serial_sequence('residentes', 'id'), coalesce(max(id), 0) + 1, false) FROM residentes")
-                db.exec(sync_sql)
-                db.commit()
+                await db.execute(sync_sql)
+                await db.commit()
                 db.add(nuevo_residente)
-                db.commit()
-                db.refresh(nuevo_residente)
+                await db.commit()
+                await db.refresh(nuevo_residente)
                 return nuevo_residente
             except Exception as retry_error:
                 print(f"Fallo en auto-reparación: {retry_error}")
-        existing = db.exec(select(Residente).where(Residente.rut == rut_ficticio)).first()
+        existing = (await db.exec(select(Residente).where(Residente.rut == rut_ficticio))).first()
         if existing:
             return existing
         raise HTTPException(status_code=500, detail=f"Error de integridad al crear perfil admin: {str(e)}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error inesperado creando perfil admin: {str(e)}")
 
-def get_or_create_gasto_comun(db: Session, residente_id: int, fecha: date, condominio_id: int) -> GastoComun:
-    mes = fecha.month
-    anio = fecha.year
-    query = select(GastoComun).where(
-        GastoComun.residente_id == residente_id,
-        GastoComun.mes == mes,
-        GastoComun.anio == anio
-    )
-    gasto = db.exec(query).first()
-    
-    if not gasto:
-        if mes == 12:
-            next_mes = 1
-            next_anio = anio + 1
-        else:
-            next_mes = mes + 1
-            next_anio = anio
-        fecha_vencimiento = date(next_anio, next_mes, 5)
-        gasto = GastoComun(
+async def cargar_reserva_a_gasto_comun(
+    db: AsyncSession,
+    residente_id: int,
+    fecha: date,
+    condominio_id: int,
+    monto: Decimal,
+    reserva_id: int,
+    descripcion: str,
+) -> Tuple[int, Decimal]:
+    """
+    Suma el costo de una reserva al gasto común del mes, dentro de la
+    transacción del llamador (sin commit). Crea el gasto si no existe
+    (ON CONFLICT sobre residente/mes/año), lo bloquea con FOR UPDATE y lo
+    incrementa en SQL: reservas en paralelo del mismo residente no pierden
+    montos. El cargo queda como una fila de gasto_comun_items.
+    Retorna (gasto_id, cambio en la deuda del residente).
+    """
+    mes, anio = fecha.month, fecha.year
+    fecha_vencimiento = date(anio + 1, 1, 5) if mes == 12 else date(anio, mes + 1, 5)
+    await db.execute(
+        pg_insert(GastoComun)
+        .values(
             residente_id=residente_id,
             condominio_id=condominio_id,
             mes=mes,
@@ -104,12 +115,42 @@ def get_or_create_gasto_comun(db: Session, residente_id: int, fecha: date, condo
             estado=EstadoGastoComun.PENDIENTE,
             fecha_emision=date.today(),
             fecha_vencimiento=fecha_vencimiento,
-            observaciones=[]
         )
-        db.add(gasto)
-        db.commit()
-        db.refresh(gasto)
-    return gasto
+        .on_conflict_do_nothing(constraint=UQ_GASTO_PERIODO)
+    )
+
+    previo = (await db.execute(
+        select(GastoComun.id, GastoComun.estado, GastoComun.monto_total)
+        .where(
+            GastoComun.residente_id == residente_id,
+            GastoComun.mes == mes,
+            GastoComun.anio == anio,
+        )
+        .with_for_update()
+    )).one()
+
+    nuevo = (await db.execute(
+        update(GastoComun)
+        .where(GastoComun.id == previo.id)
+        .values(
+            servicios=GastoComun.servicios + monto,
+            monto_total=GastoComun.monto_total + monto,
+            estado=case(
+                (GastoComun.estado == EstadoGastoComun.PAGADO, EstadoGastoComun.PENDIENTE),
+                else_=GastoComun.estado,
+            ),
+        )
+        .returning(GastoComun.estado, GastoComun.monto_total)
+    )).one()
+    db.add(GastoComunItem(
+        gasto_comun_id=previo.id,
+        reserva_id=reserva_id,
+        tipo="RESERVA",
+        descripcion=descripcion,
+        monto=monto,
+    ))
+
+    return previo.id, aporte_gasto(nuevo) - aporte_gasto(previo)
 
 def calcular_costo_reserva(hora_inicio, hora_fin, costo_por_hora: Decimal) -> Decimal:
     if not costo_por_hora or costo_por_hora == 0:
@@ -124,17 +165,44 @@ def calcular_costo_reserva(hora_inicio, hora_fin, costo_por_hora: Decimal) -> De
     return round(total, 2)
 
 @router.get("", response_model=List[Reserva])
-async def listar_reservas(db: Session = Depends(get_db)):
-    items = db.exec(select(Reserva)).all()
-    return items
+async def listar_reservas(
+    response: Response,
+    condominio_id: Optional[int] = None,
+    espacio_comun_id: Optional[int] = None,
+    residente_id: Optional[int] = None,
+    estado: Optional[EstadoReserva] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    pagina: Paginacion = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    query = select(Reserva)
+    if condominio_id:
+        query = query.join(EspacioComun, Reserva.espacio_comun_id == EspacioComun.id).where(
+            EspacioComun.condominio_id == condominio_id
+        )
+    if espacio_comun_id:
+        query = query.where(Reserva.espacio_comun_id == espacio_comun_id)
+    if residente_id:
+        query = query.where(Reserva.residente_id == residente_id)
+    if estado:
+        query = query.where(Reserva.estado == estado)
+    if desde:
+        query = query.where(Reserva.fecha_reserva >= desde)
+    if hasta:
+        query = query.where(Reserva.fecha_reserva <= hasta)
+
+    query = pagina.aplicar(query, Reserva.id)
+    items = (await db.exec(query)).all()
+    return pagina.cerrar(items, response, Reserva.id)
 
 @router.post("", response_model=Reserva, status_code=status.HTTP_201_CREATED)
 async def crear_reserva(
     data: ReservaCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    espacio = db.get(EspacioComun, data.espacio_comun_id)
+    espacio = await db.get(EspacioComun, data.espacio_comun_id)
     if not espacio:
         raise HTTPException(status_code=404, detail="Espacio común no encontrado")
 
@@ -143,11 +211,14 @@ async def crear_reserva(
 
     if not residente_id:
         if es_admin:
-            residente_admin = get_or_create_admin_residente(db, current_user)
+            residente_admin = await get_or_create_admin_residente(db, current_user)
             residente_id = residente_admin.id
         else:
             raise HTTPException(status_code=400, detail="Debe especificar un residente_id")
 
+    if data.fecha_fin <= data.fecha_inicio:
+        raise HTTPException(status_code=400, detail="La hora de término debe ser posterior a la de inicio")
+
     fecha_reserva = data.fecha_inicio.date()
     hora_inicio = data.fecha_inicio.time()
     hora_fin = data.fecha_fin.time()
@@ -182,15 +253,29 @@ async def crear_reserva(
         estado=estado_inicial
     )
     
+    # La restricción reservas_sin_traslape rechaza el horario si otra reserva
+    # (aunque sea de un request en paralelo) ya lo ocupa. El lock va antes del
+    # add: cualquier execute hace autoflush de lo pendiente
+    await bloquear_espacios(db, data.espacio_comun_id)
     db.add(nueva_reserva)
-    db.commit()
-    db.refresh(nueva_reserva)
+    nombre_espacio = espacio.nombre  # el rollback expira los objetos de la sesión
+    try:
+        await db.flush()
+    except IntegrityError as e:
+        await db.rollback()
+        if es_traslape(e):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{nombre_espacio} ya está reservado en ese horario"
+            )
+        raise
 
-    # Notificar al residente si está suscrito y activo
-    residente = db.get(Residente, residente_id)
+    # Notificar al residente si está suscrito y activo (se encola en la misma transacción)
+    residente = await db.get(Residente, residente_id)
     if residente and residente.suscrito_notificaciones and residente.activo and residente.email:
-        enviado = send_email(
-            [residente.email],
+        encolar_correo(
+            db,
+            residente.email,
             f"[Casitas Teto] Reserva {'confirmada' if estado_inicial == EstadoReserva.CONFIRMADA else 'creada'}: {espacio.nombre}",
             (
                 f"Hola {residente.nombre},\n\n"
@@ -200,69 +285,73 @@ async def crear_reserva(
                 f"Estado: {estado_inicial}\n"
                 f"Monto a pagar: {costo_total}\n\n"
                 "Si no deseas recibir estas notificaciones, desactiva las notificaciones de correo en tu perfil.\n"
-            )
+            ),
+            residente_id=residente.id,
         )
-        if enviado:
-            residente.ultimo_correo_enviado = datetime.utcnow()
-            db.add(residente)
-            db.commit()
-            db.refresh(residente)
 
-    # Gasto Común (Solo si NO es evento comunidad y hay costo)
+    # Gasto Común (Solo si NO es evento comunidad y hay costo), en la misma transacción
     if costo_total > 0 and not (data.es_evento_comunidad and es_admin):
-        gasto = get_or_create_gasto_comun(
-            db, 
-            residente_id, 
-            fecha_reserva, 
-            espacio.condominio_id
+        descripcion = f"Reserva {espacio.nombre} ({fecha_reserva})"
+        _, cambio_deuda = await cargar_reserva_a_gasto_comun(
+            db,
+            residente_id,
+            fecha_reserva,
+            espacio.condominio_id,
+            costo_total,
+            nueva_reserva.id,
+            descripcion,
         )
-        
-        if gasto.estado == EstadoGastoComun.PAGADO:
-            gasto.estado = EstadoGastoComun.PENDIENTE
-        
-        gasto.servicios += costo_total
-        gasto.monto_total += costo_total
-        
-        nuevas_obs = list(gasto.observaciones) if gasto.observaciones else []
-        nuevas_obs.append({
-            "fecha": str(date.today()),
-            "tipo": "RESERVA",
-            "descripcion": f"Reserva {espacio.nombre} ({fecha_reserva})",
-            "monto": float(costo_total),
-            "reserva_id": nueva_reserva.id
-        })
-        gasto.observaciones = nuevas_obs
-        
-        db.add(gasto)
-        db.commit()
-    
+        await registrar_movimiento(
+            db, residente_id, cambio_deuda, OrigenMovimiento.RESERVA, nueva_reserva.id, descripcion
+        )
+
+    # Un solo commit: reserva, gasto común, movimiento de cuenta y correo
+    await db.commit()
+    await db.refresh(nueva_reserva)
+    cache_ocupacion.agregar(nueva_reserva)
+
     return nueva_reserva
 
 @router.get("/{item_id}", response_model=Reserva)
-async def obtener_reserva(item_id: int, db: Session = Depends(get_db)):
-    item = db.get(Reserva, item_id)
+async def obtener_reserva(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(Reserva, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Reserva no encontrada")
     return item
 
 @router.put("/{item_id}", response_model=Reserva)
-async def actualizar_reserva(item_id: int, data: Reserva, db: Session = Depends(get_db)):
-    item = db.get(Reserva, item_id)
+async def actualizar_reserva(item_id: int, data: Reserva, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(Reserva, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Reserva no encontrada")
     
     update_data = data.model_dump(exclude_unset=True)
+    antes = (item.espacio_comun_id, item.fecha_reserva)
+    await bloquear_espacios(
+        db, item.espacio_comun_id, update_data.get("espacio_comun_id", item.espacio_comun_id)
+    )
     for key, value in update_data.items():
         setattr(item, key, value)
     
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if es_traslape(e):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El espacio ya está reservado en ese horario"
+            )
+        raise
+    await db.refresh(item)
+    cache_ocupacion.invalidar(antes[0], antes[1])
+    cache_ocupacion.invalidar(item.espacio_comun_id, item.fecha_reserva)
     return item
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def eliminar_reserva(item_id: int, db: Session = Depends(get_db)):
-    item = db.get(Reserva, item_id)
+async def eliminar_reserva(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(Reserva, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Reserva no encontrada")
     
@@ -274,8 +363,8 @@ async def eliminar_reserva(item_id: int, db: Session = Depends(get_db)):
             GastoComun.residente_id == item.residente_id,
             GastoComun.mes == mes,
             GastoComun.anio == anio
-        )
-        gasto = db.exec(query).first()
+        ).with_for_update()
+        gasto = (await db.exec(query)).first()
         
         if gasto:
             if gasto.estado == EstadoGastoComun.PAGADO:
@@ -284,23 +373,28 @@ async def eliminar_reserva(item_id: int, db: Session = Depends(get_db)):
                     detail="No se puede eliminar una reserva pagada."
                 )
             
+            aporte_anterior = aporte_gasto(gasto)
             gasto.servicios -= item.monto_pago
             gasto.monto_total -= item.monto_pago
             
             if gasto.servicios < 0: gasto.servicios = Decimal(0)
             if gasto.monto_total < 0: gasto.monto_total = Decimal(0)
             
-            nuevas_obs = list(gasto.observaciones) if gasto.observaciones else []
-            nuevas_obs.append({
-                "fecha": str(date.today()),
-                "tipo": "ANULACION_RESERVA",
-                "descripcion": f"Cancelación Reserva ID {item.id}",
-                "monto": -float(item.monto_pago)
-            })
-            gasto.observaciones = nuevas_obs
-            
             db.add(gasto)
+            db.add(GastoComunItem(
+                gasto_comun_id=gasto.id,
+                reserva_id=item.id,
+                tipo="ANULACION_RESERVA",
+                descripcion=f"Cancelación Reserva ID {item.id}",
+                monto=-item.monto_pago,
+            ))
+            await registrar_movimiento(
+                db, item.residente_id, aporte_gasto(gasto) - aporte_anterior,
+                OrigenMovimiento.RESERVA, item.id, f"Cancelación reserva ID {item.id}"
+            )
 
-    db.delete(item)
-    db.commit()
+    espacio_id, fecha = item.espacio_comun_id, item.fecha_reserva
+    await db.delete(item)
+    await db.commit()
+    cache_ocupacion.invalidar(espacio_id, fecha)
     return None
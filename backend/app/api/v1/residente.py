@@ -1,18 +1,38 @@
 # backend/app/api/v1/residentes.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional
+from datetime import date, datetime, time
 
 from app.api.deps import get_db
+from app.api.pagination import Paginacion
 from app.models.residente import Residente
+from app.models.movimiento_cuenta import MovimientoCuenta
 
 router = APIRouter(prefix="/residentes", tags=["Residentes"])
 
 # GET /residentes - Listar todos
 @router.get("", response_model=List[Residente])
-async def listar_residentes(db: Session = Depends(get_db)):
-    items = db.exec(select(Residente)).all()
-    return items
+async def listar_residentes(
+    response: Response,
+    condominio_id: Optional[int] = None,
+    usuario_id: Optional[int] = None,
+    activo: Optional[bool] = None,
+    pagina: Paginacion = Depends(),
+    db: Session = Depends(get_db)
+):
+    query = select(Residente)
+    if condominio_id:
+        query = query.where(Residente.condominio_id == condominio_id)
+    if usuario_id is not None:
+        # Perfil de residente del usuario logueado (ix_residentes_usuario_id)
+        query = query.where(Residente.usuario_id == usuario_id)
+    if activo is not None:
+        query = query.where(Residente.activo == activo)
+
+    query = pagina.aplicar(query, Residente.id)
+    items = db.exec(query).all()
+    return pagina.cerrar(items, response, Residente.id)
 
 # POST /residentes - Crear
 @router.post("", response_model=Residente, status_code=status.HTTP_201_CREATED)
@@ -59,6 +79,8 @@ async def crear_residente(data: Residente, db: Session = Depends(get_db)):
             detail=f"Ya existe un residente con el email {data.email} en este condominio"
         )
     
+    # El saldo parte en 0 y solo lo mueve el libro de cuenta corriente
+    data.saldo = 0
     db.add(data)
     db.commit()
     db.refresh(data)
@@ -74,6 +96,30 @@ async def obtener_residente(item_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Residente no encontrado")
     return item
 
+# GET /residentes/{item_id}/movimientos - Cartola de la cuenta corriente
+@router.get("/{item_id}/movimientos", response_model=List[MovimientoCuenta])
+async def listar_movimientos(
+    item_id: int,
+    response: Response,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    pagina: Paginacion = Depends(),
+    db: Session = Depends(get_db)
+):
+    """Movimientos del más reciente al más antiguo; cada uno trae el saldo resultante"""
+    if not db.get(Residente, item_id):
+        raise HTTPException(status_code=404, detail="Residente no encontrado")
+
+    query = select(MovimientoCuenta).where(MovimientoCuenta.residente_id == item_id)
+    if desde:
+        query = query.where(MovimientoCuenta.fecha >= datetime.combine(desde, time.min))
+    if hasta:
+        query = query.where(MovimientoCuenta.fecha <= datetime.combine(hasta, time.max))
+
+    query = pagina.aplicar(query, MovimientoCuenta.id, descendente=True)
+    items = db.exec(query).all()
+    return pagina.cerrar(items, response, MovimientoCuenta.id)
+
 # PUT /residentes/{item_id} - Actualizar
 @router.put("/{item_id}", response_model=Residente)
 async def actualizar_residente(item_id: int, data: Residente, db: Session = Depends(get_db)):
@@ -116,6 +162,7 @@ async def actualizar_residente(item_id: int, data: Residente, db: Session = Depe
             )
     
     update_data = data.model_dump(exclude_unset=True)
+    update_data.pop("saldo", None)  # solo se modifica vía movimientos_cuenta
     
     for key, value in update_data.items():
         setattr(item, key, value)
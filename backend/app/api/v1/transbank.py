@@ -3,33 +3,31 @@
 Endpoints específicos para integración con Transbank Webpay Plus
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, and_
-from transbank.webpay.webpay_plus.transaction import Transaction
-from transbank.common.integration_type import IntegrationType
-from transbank.common.options import WebpayOptions
+from sqlalchemy import literal, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 from datetime import datetime
 from pydantic import BaseModel
 from decimal import Decimal
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
 from app.models.pago import Pago, EstadoPago, MetodoPago, TipoPago
 from app.models.residente import Residente
-from app.models.gasto_comun import GastoComun
+from app.models.gasto_comun import GastoComun, EstadoGastoComun
+from app.models.movimiento_cuenta import OrigenMovimiento
 from app.models.multa import Multa, EstadoMulta
 from app.models.reserva import Reserva, EstadoReserva
+from app.services.conceptos_pago import resolver_conceptos
+from app.services.cuenta import aporte_gasto, aporte_multa, registrar_movimiento
+from app.services.eventos import sentencia_notificar
+from app.services.webpay import webpay, WebpayNoDisponible
 
 router = APIRouter(prefix="/transbank", tags=["Transbank"])
 
-# Configuración Transbank - Ambiente de Integración (Sandbox)
-TRANSBANK_COMMERCE_CODE = "597055555532"
-TRANSBANK_API_KEY = "579B532A7440BB0C9079DED94D31EA1615BACEB56610332264630D42D0A36B1C"
-
-webpay_options = WebpayOptions(
-    TRANSBANK_COMMERCE_CODE, 
-    TRANSBANK_API_KEY, 
-    IntegrationType.TEST
-)
+# La configuración de Webpay (URL, código de comercio, timeouts) está en
+# app.core.config y el cliente HTTP en app.services.webpay
 
 # ============================================================================
 # SCHEMAS / MODELS PARA REQUEST/RESPONSE
@@ -84,14 +82,14 @@ class ConfirmarPagoResponse(BaseModel):
 @router.get("/pagos-pendientes/{residente_id}", response_model=PagosPendientesResponse)
 async def obtener_pagos_pendientes(
     residente_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtiene todos los pagos pendientes de un residente.
     Sincroniza Multas y Reservas pendientes generando sus registros de Pago si no existen.
     """
     # Verificar que el residente existe
-    residente = db.get(Residente, residente_id)
+    residente = await db.get(Residente, residente_id)
     if not residente:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -103,108 +101,70 @@ async def obtener_pagos_pendientes(
     id_registrador = residente.usuario_id if residente.usuario_id else 1
 
     # -------------------------------------------------------------------------
-    # 1. SINCRONIZACIÓN: Generar Pagos para Multas Pendientes
+    # 1. SINCRONIZACIÓN: un solo INSERT ... SELECT que genera los Pagos de las
+    #    Multas y Reservas pendientes que aún no tienen su registro de Pago.
+    #    ON CONFLICT: dos sincronizaciones en paralelo no duplican el pago pendiente
     # -------------------------------------------------------------------------
     try:
-        multas_pendientes = db.exec(
-            select(Multa).where(
-                and_(
-                    Multa.residente_id == residente_id,
-                    Multa.estado == EstadoMulta.PENDIENTE
-                )
-            )
-        ).all()
-
-        for multa in multas_pendientes:
-            # Verificar si ya existe el registro en la tabla pagos
-            existe_pago = db.exec(
-                select(Pago).where(
-                    and_(
-                        Pago.tipo == TipoPago.MULTA,
-                        Pago.referencia_id == multa.id
-                    )
-                )
-            ).first()
-
-            if not existe_pago:
-                nuevo_pago = Pago(
-                    residente_id=residente_id,
-                    condominio_id=multa.condominio_id,
-                    tipo=TipoPago.MULTA,
-                    referencia_id=multa.id,
-                    monto=multa.monto,
-                    metodo_pago=MetodoPago.WEBPAY, 
-                    estado_pago=EstadoPago.PENDIENTE,
-                    registrado_por=id_registrador # <--- FIX: Campo obligatorio añadido
-                )
-                db.add(nuevo_pago)
-
-        # -------------------------------------------------------------------------
-        # 2. SINCRONIZACIÓN: Generar Pagos para Reservas Pendientes
-        # -------------------------------------------------------------------------
-        reservas_pendientes = db.exec(
-            select(Reserva).where(
-                and_(
-                    Reserva.residente_id == residente_id,
-                    Reserva.estado == EstadoReserva.PENDIENTE_PAGO
-                )
+        await db.execute(
+            pg_insert(Pago).from_select(
+                [
+                    "residente_id", "condominio_id", "tipo", "referencia_id", "monto",
+                    "metodo_pago", "estado_pago", "fecha_pago", "registrado_por",
+                ],
+                union_all(
+                    _select_sync_pagos(
+                        TipoPago.MULTA, Multa, Multa.monto, Multa.condominio_id,
+                        id_registrador,
+                        Multa.residente_id == residente_id,
+                        Multa.estado == EstadoMulta.PENDIENTE,
+                    ),
+                    _select_sync_pagos(
+                        TipoPago.RESERVA, Reserva, Reserva.monto_pago,
+                        literal(residente.condominio_id), id_registrador,
+                        Reserva.residente_id == residente_id,
+                        Reserva.estado == EstadoReserva.PENDIENTE_PAGO,
+                        Reserva.monto_pago > 0,
+                    ),
+                ),
+            ).on_conflict_do_nothing(
+                index_elements=[Pago.tipo, Pago.referencia_id],
+                # Literal (no parámetro): debe calzar con el predicado del índice parcial
+                index_where=text("estado_pago = 'PENDIENTE'"),
             )
-        ).all()
-
-        for reserva in reservas_pendientes:
-            if reserva.monto_pago and reserva.monto_pago > 0:
-                existe_pago = db.exec(
-                    select(Pago).where(
-                        and_(
-                            Pago.tipo == TipoPago.RESERVA,
-                            Pago.referencia_id == reserva.id
-                        )
-                    )
-                ).first()
-
-                if not existe_pago:
-                    nuevo_pago = Pago(
-                        residente_id=residente_id,
-                        condominio_id=residente.condominio_id,
-                        tipo=TipoPago.RESERVA,
-                        referencia_id=reserva.id,
-                        monto=reserva.monto_pago,
-                        metodo_pago=MetodoPago.WEBPAY,
-                        estado_pago=EstadoPago.PENDIENTE,
-                        registrado_por=id_registrador # <--- FIX: Campo obligatorio añadido
-                    )
-                    db.add(nuevo_pago)
+        )
 
         # Guardar cambios de sincronización
-        db.commit()
+        await db.commit()
         
     except Exception as e:
         print(f"Error en sincronización automática de pagos: {e}")
-        db.rollback()
+        await db.rollback()
+        # El rollback expira las instancias; en async hay que recargarlas explícitamente
+        await db.refresh(residente)
         # No lanzamos error para permitir que se muestren los pagos que ya existían
         # aunque falle la sincronización de nuevos.
 
     # -------------------------------------------------------------------------
-    # 3. OBTENCIÓN: Recuperar lista completa de pagos pendientes
+    # 2. OBTENCIÓN: Recuperar lista completa de pagos pendientes
     # -------------------------------------------------------------------------
     query = select(Pago).where(
         and_(
             Pago.residente_id == residente_id,
             Pago.estado_pago == EstadoPago.PENDIENTE
         )
-    )
-    pagos_pendientes = db.exec(query).all()
+    ).order_by(Pago.id)
+    pagos_pendientes = (await db.exec(query)).all()
+    conceptos = await resolver_conceptos(db, pagos_pendientes)
     
     # Formatear pagos con información adicional
     pagos_formateados = []
     total = Decimal(0)
     
     for pago in pagos_pendientes:
-        concepto = _obtener_concepto_pago(pago, db)
-        
         pagos_formateados.append(PagoDetalle(
             id=pago.id,
-            concepto=concepto,
+            concepto=conceptos[pago.id],
             monto=float(pago.monto),
             tipo=pago.tipo.value,
             fecha=pago.fecha_pago.isoformat()
@@ -226,7 +186,7 @@ async def obtener_pagos_pendientes(
 @router.post("/iniciar-pago", response_model=IniciarPagoResponse)
 async def iniciar_pago_transbank(
     datos: IniciarPagoRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         # Verificar que existan los pagos y estén pendientes
@@ -237,7 +197,7 @@ async def iniciar_pago_transbank(
                 Pago.estado_pago == EstadoPago.PENDIENTE
             )
         )
-        pagos = db.exec(query).all()
+        pagos = (await db.exec(query)).all()
         
         if len(pagos) != len(datos.pagos_ids):
             raise HTTPException(
@@ -253,9 +213,8 @@ async def iniciar_pago_transbank(
         buy_order = f"ORD{datos.residente_id}{timestamp}"
         session_id = f"SES{datos.residente_id}{timestamp}"
         
-        # Crear transacción en Transbank
-        tx = Transaction(webpay_options)
-        response = tx.create(
+        # Crear transacción en Transbank (sin bloquear el event loop)
+        response = await webpay.crear(
             buy_order=buy_order,
             session_id=session_id,
             amount=int(monto_total),
@@ -267,7 +226,7 @@ async def iniciar_pago_transbank(
             pago.numero_transaccion = buy_order
             pago.metodo_pago = MetodoPago.WEBPAY
         
-        db.commit()
+        await db.commit()
         
         return IniciarPagoResponse(
             token=response['token'],
@@ -278,8 +237,14 @@ async def iniciar_pago_transbank(
         
     except HTTPException:
         raise
+    except WebpayNoDisponible:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Webpay no está disponible en este momento, intenta nuevamente en unos minutos"
+        )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error al iniciar pago con Transbank: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -287,15 +252,26 @@ async def iniciar_pago_transbank(
         )
 
 
+async def _notificar_pagos(db: AsyncSession, buy_order: str, estado: EstadoPago, pagos: List[Pago]) -> None:
+    """Avisa el nuevo estado a los streams SSE del residente y del condominio (al hacer commit)"""
+    por_destino = {}
+    for pago in pagos:
+        por_destino.setdefault((pago.condominio_id, pago.residente_id), []).append(pago.id)
+    for (condominio_id, residente_id), ids in por_destino.items():
+        await db.execute(sentencia_notificar(
+            "pago", numero_transaccion=buy_order, estado=estado.value,
+            condominio_id=condominio_id, residente_id=residente_id, ids=ids,
+        ))
+
+
 @router.post("/confirmar-pago", response_model=ConfirmarPagoResponse)
 async def confirmar_pago_transbank(
     token_ws: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         # Confirmar transacción con Transbank
-        tx = Transaction(webpay_options)
-        response = tx.commit(token=token_ws)
+        response = await webpay.confirmar(token_ws)
         
         # Verificar el estado de la transacción
         if response['status'] == 'AUTHORIZED' and response['response_code'] == 0:
@@ -304,7 +280,7 @@ async def confirmar_pago_transbank(
             
             # Buscar pagos por número de orden
             query = select(Pago).where(Pago.numero_transaccion == buy_order)
-            pagos = db.exec(query).all()
+            pagos = (await db.exec(query)).all()
             
             if not pagos:
                 raise HTTPException(
@@ -318,20 +294,39 @@ async def confirmar_pago_transbank(
                 pago.fecha_pago = datetime.now()
                 
                 # --- ACTUALIZAR ESTADO DE LA ENTIDAD RELACIONADA ---
+                # (y abonar a la cuenta corriente lo que deja de ser deuda)
                 if pago.tipo == TipoPago.MULTA:
-                    multa = db.get(Multa, pago.referencia_id)
+                    multa = await db.get(Multa, pago.referencia_id)
                     if multa:
+                        aporte_anterior = aporte_multa(multa)
                         multa.estado = EstadoMulta.PAGADA
                         multa.fecha_pago = datetime.now()
                         db.add(multa)
+                        await registrar_movimiento(
+                            db, multa.residente_id, aporte_multa(multa) - aporte_anterior,
+                            OrigenMovimiento.PAGO, pago.id, f"Pago Webpay {buy_order}"
+                        )
+                
+                elif pago.tipo == TipoPago.GASTO_COMUN:
+                    gasto = await db.get(GastoComun, pago.referencia_id)
+                    if gasto:
+                        aporte_anterior = aporte_gasto(gasto)
+                        gasto.estado = EstadoGastoComun.PAGADO
+                        gasto.fecha_pago = datetime.now()
+                        db.add(gasto)
+                        await registrar_movimiento(
+                            db, gasto.residente_id, aporte_gasto(gasto) - aporte_anterior,
+                            OrigenMovimiento.PAGO, pago.id, f"Pago Webpay {buy_order}"
+                        )
                 
                 elif pago.tipo == TipoPago.RESERVA:
-                    reserva = db.get(Reserva, pago.referencia_id)
+                    reserva = await db.get(Reserva, pago.referencia_id)
                     if reserva:
                         reserva.estado = EstadoReserva.CONFIRMADA
                         db.add(reserva)
             
-            db.commit()
+            await _notificar_pagos(db, buy_order, EstadoPago.APROBADO, pagos)
+            await db.commit()
             
             return ConfirmarPagoResponse(
                 success=True,
@@ -349,12 +344,13 @@ async def confirmar_pago_transbank(
             
             if buy_order:
                 query = select(Pago).where(Pago.numero_transaccion == buy_order)
-                pagos = db.exec(query).all()
+                pagos = (await db.exec(query)).all()
                 
                 for pago in pagos:
                     pago.estado_pago = EstadoPago.RECHAZADO
                 
-                db.commit()
+                await _notificar_pagos(db, buy_order, EstadoPago.RECHAZADO, pagos)
+                await db.commit()
             
             return ConfirmarPagoResponse(
                 success=False,
@@ -368,8 +364,14 @@ async def confirmar_pago_transbank(
             
     except HTTPException:
         raise
+    except WebpayNoDisponible:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Webpay no está disponible en este momento, intenta nuevamente en unos minutos"
+        )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error al confirmar pago con Transbank: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -380,10 +382,10 @@ async def confirmar_pago_transbank(
 @router.get("/estado-transaccion/{numero_transaccion}")
 async def obtener_estado_transaccion(
     numero_transaccion: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     query = select(Pago).where(Pago.numero_transaccion == numero_transaccion)
-    pagos = db.exec(query).all()
+    pagos = (await db.exec(query)).all()
     
     if not pagos:
         raise HTTPException(
@@ -412,7 +414,7 @@ async def obtener_estado_transaccion(
 @router.get("/historial-transbank/{residente_id}")
 async def obtener_historial_transbank(
     residente_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 50
 ):
@@ -423,14 +425,15 @@ async def obtener_historial_transbank(
         )
     ).order_by(Pago.fecha_pago.desc()).offset(skip).limit(limit)
     
-    pagos = db.exec(query).all()
+    pagos = (await db.exec(query)).all()
+    conceptos = await resolver_conceptos(db, pagos)
     
     return {
         "pagos": [
             {
                 "id": p.id,
                 "tipo": p.tipo.value,
-                "concepto": _obtener_concepto_pago(p, db),
+                "concepto": conceptos[p.id],
                 "monto": float(p.monto),
                 "estado": p.estado_pago.value,
                 "numero_transaccion": p.numero_transaccion,
@@ -442,36 +445,22 @@ async def obtener_historial_transbank(
     }
 
 
-def _obtener_concepto_pago(pago: Pago, db: Session) -> str:
-    concepto = ""
-    
-    if pago.tipo == TipoPago.GASTO_COMUN:
-        gasto = db.get(GastoComun, pago.referencia_id)
-        if gasto:
-            concepto = f"Gasto Común - {gasto.mes}/{gasto.anio}"
-        else:
-            concepto = "Gasto Común"
-    
-    elif pago.tipo == TipoPago.MULTA:
-        multa = db.get(Multa, pago.referencia_id)
-        if multa:
-            descripcion = multa.descripcion[:30] + "..." if len(multa.descripcion) > 30 else multa.descripcion
-            concepto = f"Multa - {descripcion}"
-        else:
-            concepto = "Multa"
-    
-    elif pago.tipo == TipoPago.RESERVA:
-        reserva = db.get(Reserva, pago.referencia_id)
-        if reserva:
-            from app.models.espacio_comun import EspacioComun
-            espacio = db.get(EspacioComun, reserva.espacio_comun_id)
-            nombre_espacio = espacio.nombre if espacio else "Espacio Común"
-            fecha = reserva.fecha_reserva.strftime("%d/%m")
-            concepto = f"Reserva {nombre_espacio} ({fecha})"
-        else:
-            concepto = "Reserva de espacio común"
-    
-    else:
-        concepto = pago.tipo.value
-    
-    return concepto
\ No newline at end of file
+def _select_sync_pagos(tipo: TipoPago, modelo, monto, condominio_id, registrado_por: int, *condiciones):
+    """SELECT con las columnas del Pago a crear para cada entidad sin registro de Pago"""
+    columnas = Pago.__table__.c
+    ya_tiene_pago = (
+        select(Pago.id)
+        .where(Pago.tipo == tipo, Pago.referencia_id == modelo.id)
+        .exists()
+    )
+    return select(
+        modelo.residente_id,
+        condominio_id,
+        literal(tipo, columnas.tipo.type),
+        modelo.id,
+        monto,
+        literal(MetodoPago.WEBPAY, columnas.metodo_pago.type),
+        literal(EstadoPago.PENDIENTE, columnas.estado_pago.type),
+        literal(datetime.utcnow(), columnas.fecha_pago.type),
+        literal(registrado_por),
+    ).where(*condiciones, ~ya_tiene_pago)
@@ -1,82 +1,83 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload
 from typing import List
-from decimal import Decimal
 import uuid
 
 # Se agregó get_current_active_user a los imports
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import get_async_db, get_current_active_user
 # Se agregó RolUsuario a los imports
 from app.models.usuario import Usuario, RolUsuario
 from app.models.residente import Residente
-from app.models.gasto_comun import EstadoGastoComun
-from app.models.multa import EstadoMulta
 from app.schemas.usuario import UsuarioRead, UsuarioCreate, UsuarioUpdate
-from app.core.security import get_password_hash
+from app.core.security import cache_usuarios, hashear_password
 
 router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
 
-def calcular_deuda_usuario(usuario: Usuario) -> float:
-    deuda = Decimal(0)
-    if not usuario.residentes:
-        return float(deuda)
+def _deuda_por_usuario():
+    """
+    Subconsulta (usuario_id, total_deuda): suma los saldos materializados de
+    los perfiles de residente del usuario (ver app.services.cuenta).
+    """
+    return (
+        select(Residente.usuario_id, func.sum(Residente.saldo).label("total_deuda"))
+        .group_by(Residente.usuario_id)
+        .subquery()
+    )
+
+
+async def calcular_deuda_usuario(db: AsyncSession, usuario_id: int) -> float:
+    deuda = (await db.exec(
+        select(func.sum(Residente.saldo)).where(Residente.usuario_id == usuario_id)
+    )).first()
+    return float(deuda or 0)
+
+
+def _dato_residente(columna):
+    """Dato del residente del usuario en su propio condominio (para la tabla)"""
+    return (
+        select(columna)
+        .where(
+            Residente.usuario_id == Usuario.id,
+            Residente.condominio_id == Usuario.condominio_id,
+        )
+        .order_by(Residente.id)
+        .limit(1)
+        .scalar_subquery()
+    )
 
-    estados_deuda_gc = {
-        EstadoGastoComun.PENDIENTE, 
-        EstadoGastoComun.VENCIDO, 
-        EstadoGastoComun.MOROSO
-    }
-    
-    for residente in usuario.residentes:
-        if residente.gastos_comunes:
-            deuda += sum(
-                gc.monto_total 
-                for gc in residente.gastos_comunes 
-                if gc.estado in estados_deuda_gc
-            )
-        if residente.multas:
-            deuda += sum(
-                m.monto 
-                for m in residente.multas 
-                if m.estado == EstadoMulta.PENDIENTE
-            )
-    return float(deuda)
 
 @router.get("", response_model=List[UsuarioRead])
 async def listar_usuarios(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    query = select(Usuario).options(
-        selectinload(Usuario.residentes).options(
-            selectinload(Residente.gastos_comunes),
-            selectinload(Residente.multas)
+    # Una sola consulta: la deuda se agrega en SQL y del residente solo se
+    # traen las dos columnas que se muestran
+    deudas = _deuda_por_usuario()
+    query = (
+        select(
+            Usuario,
+            deudas.c.total_deuda,
+            _dato_residente(Residente.telefono),
+            _dato_residente(Residente.vivienda_numero),
         )
+        .outerjoin(deudas, deudas.c.usuario_id == Usuario.id)
     )
 
     if current_user.rol != RolUsuario.SUPER_ADMINISTRADOR:
         query = query.where(Usuario.condominio_id == current_user.condominio_id)
 
-    usuarios_db = db.exec(query).all()
+    filas = (await db.exec(query)).all()
     
     usuarios_output = []
-    for usuario in usuarios_db:
+    for usuario, total_deuda, telefono, vivienda in filas:
         usuario_read = UsuarioRead.from_orm(usuario)
-        usuario_read.total_deuda = calcular_deuda_usuario(usuario)
-        
-        # --- NUEVO: Inyectar datos del residente para visualización ---
-        # Buscamos el residente que coincida con el condominio del usuario
-        if usuario.residentes:
-            residente = next(
-                (r for r in usuario.residentes if r.condominio_id == usuario.condominio_id), 
-                None
-            )
-            if residente:
-                usuario_read.telefono = residente.telefono
-                usuario_read.vivienda = residente.vivienda_numero
-        # -------------------------------------------------------------
-        
+        usuario_read.total_deuda = float(total_deuda or 0)
+        usuario_read.telefono = telefono
+        usuario_read.vivienda = vivienda
         usuarios_output.append(usuario_read)
         
     return usuarios_output
@@ -84,7 +85,7 @@ async def listar_usuarios(
 @router.post("", response_model=UsuarioRead, status_code=status.HTTP_201_CREATED)
 async def crear_usuario(
     data: UsuarioCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     # 1. Determinar Condominio
@@ -94,7 +95,7 @@ async def crear_usuario(
         condominio_asignado = current_user.condominio_id
 
     # 2. Crear el Usuario
-    hashed_password = get_password_hash(data.password)
+    hashed_password = await hashear_password(data.password)
     nuevo_usuario = Usuario(
         email=data.email,
         nombre=data.nombre,
@@ -105,8 +106,8 @@ async def crear_usuario(
         activo=data.activo,
     )
     db.add(nuevo_usuario)
-    db.commit()
-    db.refresh(nuevo_usuario)
+    await db.commit()
+    await db.refresh(nuevo_usuario)
     
     # 3. Crear Residente si el rol lo indica
     if data.rol == RolUsuario.RESIDENTE:
@@ -130,23 +131,17 @@ async def crear_usuario(
             es_propietario=data.es_propietario
         )
         db.add(nuevo_residente)
-        db.commit()
+        await db.commit()
     
     return nuevo_usuario
 
 @router.get("/{usuario_id}", response_model=UsuarioRead)
 async def obtener_usuario(
     usuario_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    query = select(Usuario).where(Usuario.id == usuario_id).options(
-        selectinload(Usuario.residentes).options(
-            selectinload(Residente.gastos_comunes),
-            selectinload(Residente.multas)
-        )
-    )
-    usuario = db.exec(query).first()
+    usuario = await db.get(Usuario, usuario_id)
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
@@ -156,24 +151,21 @@ async def obtener_usuario(
             raise HTTPException(status_code=404, detail="Usuario no encontrado") # 404 para no revelar existencia
 
     usuario_read = UsuarioRead.from_orm(usuario)
-    usuario_read.total_deuda = calcular_deuda_usuario(usuario)
+    usuario_read.total_deuda = await calcular_deuda_usuario(db, usuario.id)
     return usuario_read
 
 @router.put("/{usuario_id}", response_model=UsuarioRead)
 async def actualizar_usuario(
     usuario_id: int, 
     data: UsuarioUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     # 1. Buscar Usuario
     query = select(Usuario).where(Usuario.id == usuario_id).options(
-        selectinload(Usuario.residentes).options(
-            selectinload(Residente.gastos_comunes),
-            selectinload(Residente.multas)
-        )
+        selectinload(Usuario.residentes)
     )
-    usuario = db.exec(query).first()
+    usuario = (await db.exec(query)).first()
     
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
@@ -196,7 +188,7 @@ async def actualizar_usuario(
 
     if 'password' in update_data:
         password = update_data.pop('password')
-        usuario.password_hash = get_password_hash(password)
+        usuario.password_hash = await hashear_password(password)
         
     for key, value in update_data.items():
         setattr(usuario, key, value)
@@ -213,20 +205,21 @@ async def actualizar_usuario(
             db.add(residente)
             
     db.add(usuario)
-    db.commit()
-    db.refresh(usuario)
+    await db.commit()
+    cache_usuarios.invalidar(usuario.id)
+    # Sin refresh: refrescar expiraría usuario.residentes y en async no hay lazy-load
     
     usuario_read = UsuarioRead.from_orm(usuario)
-    usuario_read.total_deuda = calcular_deuda_usuario(usuario)
+    usuario_read.total_deuda = await calcular_deuda_usuario(db, usuario.id)
     return usuario_read
 
 @router.delete("/{usuario_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def eliminar_usuario(
     usuario_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    usuario = db.get(Usuario, usuario_id)
+    usuario = await db.get(Usuario, usuario_id)
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
@@ -235,6 +228,7 @@ async def eliminar_usuario(
         if usuario.condominio_id != current_user.condominio_id:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    db.delete(usuario)
-    db.commit()
+    await db.delete(usuario)
+    await db.commit()
+    cache_usuarios.invalidar(usuario_id)
     return None
\ No newline at end of file
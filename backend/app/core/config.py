@@ -1,8 +1,98 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     #DATABASE_URL: str = os.getenv("DATABASE_URL")
     DATABASE_URL: str = "postgresql+psycopg2://peritas:peritas123@db:5432/peritas_db"
+    # URL para el driver async (asyncpg). Si no se define se deriva de DATABASE_URL
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # "development" o "production". En produccion se desactiva el echo de SQL
+    ENVIRONMENT: str = "development"
+
+    # Pool de conexiones (aplica a cada engine: sync y async)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # segundos esperando una conexion libre
+    DB_POOL_RECYCLE: int = 1800  # segundos antes de reciclar una conexion
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 = sin limite
+    # None = automatico segun ENVIRONMENT
+    DB_ECHO: Optional[bool] = None
+
+    # Despacho de correos en segundo plano (bandeja de salida)
+    DESPACHO_CORREOS_ACTIVO: bool = True
+    DESPACHO_LOTE: int = 50  # correos reclamados por ciclo
+    DESPACHO_INTERVALO_SEG: float = 5.0  # espera entre ciclos sin trabajo
+    DESPACHO_LEASE_SEG: int = 300  # tiempo antes de re-tomar un lote no confirmado
+    DESPACHO_MAX_INTENTOS: int = 5
+    DESPACHO_BACKOFF_SEG: int = 30  # base del backoff exponencial entre reintentos
+    DESPACHO_CONCURRENCIA: int = 2  # conexiones SMTP enviando en paralelo
+    DIFUSION_BLOQUE: int = 500  # destinatarios leídos/insertados por bloque en envíos masivos
+
+    # Bitácora (registros) particionada por mes
+    PARTICIONES_MANTENCION_ACTIVA: bool = True
+    PARTICIONES_INTERVALO_SEG: float = 21600.0  # cada cuánto se revisan las particiones
+    REGISTROS_MESES_ADELANTE: int = 3  # particiones mensuales creadas por adelantado
+    # Retención opcional: con N > 0 las particiones de más de N meses se desacoplan
+    # (DETACH) y salen de GET /registros. 0 = sin límite, no se desacopla nada.
+    # Para activarla: REGISTROS_RETENCION_MESES=24 en el entorno (.env)
+    REGISTROS_RETENCION_MESES: int = 0
+
+    # Alertas: los eventos repetidos de una misma entidad dentro de la ventana se agrupan en una sola alerta
+    ALERTAS_VENTANA_MIN: int = 1440
+    # Cache del resumen de alertas pendientes (se invalida con los eventos de alertas)
+    ALERTAS_RESUMEN_TTL_SEG: float = 60.0  # 0 desactiva el cache
+
+    # KPIs por condominio (vistas materializadas refrescadas en segundo plano)
+    KPIS_REFRESCO_ACTIVO: bool = True
+    KPIS_REFRESCO_SEG: float = 900.0  # antigüedad máxima de las vistas
+
+    # Eventos en vivo (SSE) sobre LISTEN/NOTIFY
+    EVENTOS_ACTIVO: bool = True
+    EVENTOS_PING_SEG: float = 15.0  # comentario keep-alive cuando no hay eventos
+    EVENTOS_COLA_MAX: int = 100  # eventos en espera por cliente; los que sobran se descartan
+
+    # Webpay Plus (por defecto, ambiente de integración de Transbank)
+    WEBPAY_BASE_URL: str = "https://webpay3gint.transbank.cl"
+    WEBPAY_COMMERCE_CODE: str = "597055555532"
+    WEBPAY_API_KEY: str = "579B532A7440BB0C9079DED94D31EA1615BACEB56610332264630D42D0A36B1C"
+    WEBPAY_CONNECT_TIMEOUT_SEG: float = 5.0
+    WEBPAY_READ_TIMEOUT_SEG: float = 15.0
+    WEBPAY_MAX_CONEXIONES: int = 20
+    WEBPAY_CB_FALLOS: int = 5  # fallos seguidos para abrir el circuit breaker
+    WEBPAY_CB_ENFRIAMIENTO_SEG: float = 30.0
+
+    # Cache en memoria de usuarios autenticados (get_current_user)
+    AUTH_CACHE_TTL_SEG: float = 30.0  # 0 desactiva el cache
+    AUTH_CACHE_MAX_USUARIOS: int = 1024
+
+    # Cache en memoria de ocupación de espacios comunes (calendario)
+    DISPONIBILIDAD_CACHE_TTL_SEG: float = 300.0  # 0 desactiva el cache
+
+    # Hash de contraseñas (bcrypt) fuera del event loop
+    BCRYPT_ROUNDS: int = 12  # factor de costo; al cambiarlo se re-hashea en el login
+    HASH_PROCESOS: int = 2  # procesos del pool de bcrypt (0 = hilos del event loop)
+
+    @property
+    def is_production(self) -> bool:
+        return self.ENVIRONMENT.lower() in ("production", "prod")
+
+    @property
+    def db_echo(self) -> bool:
+        if self.DB_ECHO is not None:
+            return self.DB_ECHO
+        return not self.is_production
+
+    @property
+    def async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        url = self.DATABASE_URL
+        for prefijo in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if url.startswith(prefijo):
+                return "postgresql+asyncpg://" + url[len(prefijo):]
+        return url
 
 settings = Settings()
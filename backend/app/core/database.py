@@ -1,8 +1,68 @@
+from typing import AsyncGenerator
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+
+def _pool_kwargs() -> dict:
+    return {
+        "echo": settings.db_echo,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _connect_args(async_driver: bool) -> dict:
+    if not settings.DB_STATEMENT_TIMEOUT_MS:
+        return {}
+    timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if async_driver:
+        # asyncpg recibe los parametros de sesion como server_settings
+        return {"server_settings": {"statement_timeout": timeout}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    connect_args=_connect_args(async_driver=False),
+    **_pool_kwargs()
+)
+
+# Engine async (asyncpg) para los endpoints que no deben bloquear el event loop
+async_engine = create_async_engine(
+    settings.async_database_url,
+    connect_args=_connect_args(async_driver=True),
+    **_pool_kwargs()
+)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    # expire_on_commit=False: en async no se puede hacer lazy-load al leer
+    # atributos despues del commit (p.ej. al serializar la respuesta)
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def _estado_pool(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
+
+def estado_pools() -> dict:
+    """Ocupacion actual de los pools de conexiones (sync y async)"""
+    return {
+        "sync": _estado_pool(engine.pool),
+        "async": _estado_pool(async_engine.pool),
+    }
@@ -1,11 +1,19 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
-from app.core.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.core.database import get_async_session
 from app.models.usuario import Usuario
 import os
 import bcrypt
@@ -30,11 +38,102 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-# Ahora CryptContext cargará correctamente el esquema bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Ahora CryptContext cargará correctamente el esquema bcrypt.
+# Los hashes con otro factor de costo quedan marcados para re-hash (needs_update)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
 security = HTTPBearer()
 
 
+class CacheUsuarios:
+    """
+    Cache en memoria (por proceso) de los usuarios autenticados, con TTL y
+    desalojo LRU. Evita ir a la tabla usuarios en cada request autenticado.
+
+    Guarda una copia de las columnas, no la instancia ORM: cada request recibe
+    un Usuario nuevo, sin sesión, que puede modificar sin afectar a los demás.
+    actualizar_usuario/eliminar_usuario invalidan la entrada; con varios
+    workers cada uno tiene su cache y el TTL acota cuánto puede quedar atrasado.
+    """
+
+    def __init__(self, ttl_seg: float, max_usuarios: int):
+        self.ttl_seg = ttl_seg
+        self.max_usuarios = max_usuarios
+        self._entradas: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Sube en cada invalidación: una lectura de la BD que empezó antes no
+        # puede volver a cachear datos viejos
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidaciones = 0
+
+    @property
+    def activo(self) -> bool:
+        return self.ttl_seg > 0 and self.max_usuarios > 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def obtener(self, user_id: int) -> Optional[Usuario]:
+        if not self.activo:
+            return None
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._entradas[user_id]
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(user_id)
+            self.hits += 1
+            datos = entrada[1]
+        return Usuario(**datos)
+
+    def guardar(self, user: Usuario, version: int) -> None:
+        """Guarda el usuario leído de la BD si nada se invalidó desde `version`"""
+        if not self.activo:
+            return
+        datos = {col.name: getattr(user, col.name) for col in Usuario.__table__.columns}
+        with self._lock:
+            if version != self._version:
+                return
+            self._entradas[user.id] = (time.monotonic() + self.ttl_seg, datos)
+            self._entradas.move_to_end(user.id)
+            while len(self._entradas) > self.max_usuarios:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, user_id: Optional[int] = None) -> None:
+        """Descarta un usuario (o todos si user_id es None)"""
+        with self._lock:
+            self._version += 1
+            self.invalidaciones += 1
+            if user_id is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(user_id, None)
+
+    def estadisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "activo": self.activo,
+            "entradas": len(self._entradas),
+            "max_usuarios": self.max_usuarios,
+            "ttl_seg": self.ttl_seg,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidaciones": self.invalidaciones,
+            "tasa_hits": round(self.hits / total, 4) if total else None,
+        }
+
+
+cache_usuarios = CacheUsuarios(settings.AUTH_CACHE_TTL_SEG, settings.AUTH_CACHE_MAX_USUARIOS)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica que la contrasena coincida con el hash"""
     try:
@@ -51,6 +150,84 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _verificar_y_actualizar(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(valida, hash_nuevo): hash_nuevo viene solo si el hash guardado quedó obsoleto"""
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        print(f"Error verificando password: {e}")
+        return False, None
+
+
+def _hashear(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _precalentar() -> None:
+    # Carga el backend de bcrypt en el proceso del pool
+    pwd_context.handler("bcrypt").get_backend()
+
+
+class PoolHash:
+    """
+    Ejecuta bcrypt fuera del event loop. Cada hash/verificación son ~200 ms de
+    CPU: corriendo en el loop frenan todos los demás requests del worker.
+
+    Con HASH_PROCESOS > 0 usa un pool de procesos (paralelismo real, acotado
+    al tamaño del pool); con 0 usa el pool de hilos por defecto de asyncio.
+    """
+
+    def __init__(self, procesos: int):
+        self.procesos = procesos
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _obtener_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.procesos <= 0:
+            return None
+        if self._executor is None:
+            # spawn: los hijos no heredan sockets del pool de la BD ni el event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.procesos,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def ejecutar(self, funcion, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._obtener_executor(), funcion, *args)
+
+    async def iniciar(self):
+        """Levanta los procesos de antemano para que el primer login no pague el arranque"""
+        executor = self._obtener_executor()
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(executor, _precalentar)
+                for _ in range(self.procesos)
+            ))
+
+    def cerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pool_hash = PoolHash(settings.HASH_PROCESOS)
+
+
+async def verificar_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Versión async de verify_password para los endpoints. Retorna (valida, hash_nuevo);
+    si hash_nuevo no es None hay que guardarlo (cambió BCRYPT_ROUNDS).
+    """
+    return await pool_hash.ejecutar(_verificar_y_actualizar, plain_password, hashed_password)
+
+
+async def hashear_password(password: str) -> str:
+    """Versión async de get_password_hash para los endpoints"""
+    return await pool_hash.ejecutar(_hashear, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Crea un token JWT de acceso"""
     to_encode = data.copy()
@@ -88,7 +265,7 @@ def decode_token(token: str) -> dict:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> Usuario:
     """Obtiene el usuario actual desde el token JWT"""
     token = credentials.credentials
@@ -100,15 +277,22 @@ async def get_current_user(
             detail="Tipo de token invalido"
         )
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    sub = payload.get("sub")
+    if sub is None or not str(sub).isdigit():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales invalidas"
         )
+    # asyncpg es estricto con los tipos: el "sub" viene como string
+    user_id = int(sub)
     
-    statement = select(Usuario).where(Usuario.id == user_id)
-    user = session.exec(statement).first()
+    user = cache_usuarios.obtener(user_id)
+    if user is None:
+        version = cache_usuarios.version
+        statement = select(Usuario).where(Usuario.id == user_id)
+        user = (await session.exec(statement)).first()
+        if user is not None and user.activo:
+            cache_usuarios.guardar(user, version)
     
     if user is None:
         raise HTTPException(
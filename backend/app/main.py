@@ -1,13 +1,51 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import api_router
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.core.config import settings
+from app.core.database import estado_pools
+from app.core.security import cache_usuarios, pool_hash
+from app.services.alertas import cache_resumen_alertas
+from app.services.disponibilidad import cache_ocupacion
+from app.services.email_dispatcher import despachador
+from app.services.eventos import central_eventos
+from app.services.kpis import refresco_kpis
+from app.services.particiones import mantenedor_particiones
+from app.services.webpay import webpay
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker de correos: envía lo encolado en la tabla correos fuera del request
+    if settings.DESPACHO_CORREOS_ACTIVO:
+        despachador.iniciar()
+    # Particiones mensuales de la bitácora: crea las próximas y desacopla las antiguas
+    if settings.PARTICIONES_MANTENCION_ACTIVA:
+        mantenedor_particiones.iniciar()
+    # Una sola conexión LISTEN alimenta todos los streams SSE
+    if settings.EVENTOS_ACTIVO:
+        central_eventos.iniciar()
+    # Vistas materializadas de KPIs (GET /condominios/{id}/kpis)
+    if settings.KPIS_REFRESCO_ACTIVO:
+        refresco_kpis.iniciar()
+    await pool_hash.iniciar()
+    yield
+    await despachador.detener()
+    await mantenedor_particiones.detener()
+    await central_eventos.detener()
+    await refresco_kpis.detener()
+    await webpay.cerrar()
+    pool_hash.cerrar()
+
 
 app = FastAPI(
     title="Casitas Teto API",
     description="API para Sistema de Gestión de Condominios",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS
@@ -27,6 +65,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # cursor de paginación para el frontend
 )
 
 # Incluir routers
@@ -43,3 +82,22 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "database": "connected"}
+
+@app.get("/health/db")
+async def health_db():
+    """Ocupacion de los pools de conexiones a la base de datos"""
+    return {"pools": estado_pools()}
+
+@app.get("/health/cache")
+async def health_cache():
+    """Aciertos y fallos de los caches en memoria"""
+    return {
+        "usuarios": cache_usuarios.estadisticas(),
+        "ocupacion": cache_ocupacion.estadisticas(),
+        "resumen_alertas": cache_resumen_alertas.estadisticas(),
+    }
+
+@app.get("/health/eventos")
+async def health_eventos():
+    """Conexión LISTEN y clientes SSE conectados"""
+    return central_eventos.estadisticas()
@@ -2,6 +2,7 @@ from .usuario import Usuario, RolUsuario
 from .condominio import Condominio
 from .residente import Residente
 from .gasto_comun import GastoComun, EstadoGastoComun
+from .gasto_comun_item import GastoComunItem
 from .multa import Multa, TipoMulta, EstadoMulta
 from .espacio_comun import EspacioComun, TipoEspacioComun
 from .reserva import Reserva, EstadoReserva
@@ -9,17 +10,24 @@ from .pago import Pago, TipoPago, MetodoPago, EstadoPago
 from .anuncio import Anuncio
 from .registro import RegistroModel, TipoEvento
 from .alerta import Alerta, TipoAlerta, EstadoAlerta
+from .correo import Correo, EstadoCorreo
+from .movimiento_cuenta import MovimientoCuenta, OrigenMovimiento
+from .kpi import VISTAS_KPI
 
 __all__ = [
     "Usuario", "RolUsuario",
     "Condominio",
     "Residente",
     "GastoComun", "EstadoGastoComun",
+    "GastoComunItem",
     "Multa", "TipoMulta", "EstadoMulta",
     "EspacioComun", "TipoEspacioComun",
     "Reserva", "EstadoReserva",
     "Pago", "TipoPago", "MetodoPago", "EstadoPago",
     "Anuncio",
     "RegistroModel", "TipoEvento",
-    "Alerta", "TipoAlerta", "EstadoAlerta"
+    "Alerta", "TipoAlerta", "EstadoAlerta",
+    "Correo", "EstadoCorreo",
+    "MovimientoCuenta", "OrigenMovimiento",
+    "VISTAS_KPI"
 ]
\ No newline at end of file
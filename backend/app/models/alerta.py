@@ -1,5 +1,6 @@
 from typing import Optional
 from sqlmodel import Field, SQLModel
+from sqlalchemy import Index, text
 from datetime import datetime
 from enum import Enum
 
@@ -13,17 +14,47 @@ class EstadoAlerta(str, Enum):
     PENDIENTE = "PENDIENTE"
     RESUELTO = "RESUELTO"
 
+# Entidad a la que se refiere la alerta (entidad_tipo)
+ENTIDAD_RESIDENTE = "RESIDENTE"
+ENTIDAD_GASTO_COMUN = "GASTO_COMUN"
+
+# Una sola alerta PENDIENTE por clave (tipo, condominio, entidad, ventana): los
+# eventos repetidos se agrupan con ON CONFLICT sobre este índice (services/alertas.py)
+UQ_ALERTA_PENDIENTE = "uq_alerta_pendiente_clave"
+
 class Alerta(SQLModel, table=True):
+    __table_args__ = (
+        # Listado por estado en orden (fecha_creacion, id) descendente (keyset)
+        Index("ix_alerta_estado_fecha_creacion_id", "estado", "fecha_creacion", "id"),
+        Index(
+            UQ_ALERTA_PENDIENTE, "tipo", "condominio_id", "entidad_tipo", "entidad_id", "ventana",
+            unique=True, postgresql_where=text("estado = 'PENDIENTE'"),
+            postgresql_nulls_not_distinct=True,
+        ),
+        # Resumen de pendientes por condominio y tipo (GET /alertas/resumen): index-only scan
+        Index(
+            "ix_alerta_pendiente_condominio_id_tipo", "condominio_id", "tipo",
+            postgresql_include=["ocurrencias"], postgresql_where=text("estado = 'PENDIENTE'"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     titulo: str
     descripcion: str
     tipo: TipoAlerta
     estado: EstadoAlerta = Field(default=EstadoAlerta.PENDIENTE)
-    fecha_creacion: datetime = Field(default_factory=datetime.now)
+    fecha_creacion: datetime = Field(default_factory=datetime.now, index=True)
+
+    # Agrupación: entidad afectada, inicio de la ventana y cuántos eventos se juntaron
+    entidad_tipo: Optional[str] = None
+    entidad_id: Optional[int] = None
+    ventana: Optional[datetime] = None
+    ocurrencias: int = Field(default=1)
+    fecha_ultima_ocurrencia: Optional[datetime] = None
     
     # Campos para resolución
     comentario_resolucion: Optional[str] = None
     fecha_resolucion: Optional[datetime] = None
     resuelto_por: Optional[int] = None # ID del admin que resolvió
     
-    condominio_id: Optional[int] = None
\ No newline at end of file
+    condominio_id: Optional[int] = Field(default=None, index=True)
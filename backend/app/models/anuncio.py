@@ -6,11 +6,11 @@ class Anuncio(SQLModel, table=True):
     __tablename__ = "anuncios"
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    condominio_id: int = Field(foreign_key="condominios.id")
+    condominio_id: int = Field(foreign_key="condominios.id", index=True)
     titulo: str = Field(index=True)
     contenido: str
     activo: bool = Field(default=True)
-    fecha_publicacion: datetime = Field(default_factory=datetime.utcnow)
+    fecha_publicacion: datetime = Field(default_factory=datetime.utcnow, index=True)
     creado_por: int = Field(foreign_key="usuarios.id")
     
     # Relationships
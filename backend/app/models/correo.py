@@ -0,0 +1,26 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+
+class EstadoCorreo(str, Enum):
+    PENDIENTE = "PENDIENTE"
+    ENVIADO = "ENVIADO"
+    FALLIDO = "FALLIDO"
+
+class Correo(SQLModel, table=True):
+    """Bandeja de salida (outbox): los endpoints encolan y el despachador envía"""
+    __tablename__ = "correos"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    destinatario: str
+    asunto: str
+    cuerpo: str
+    # Residente a notificar; al enviarse se actualiza su ultimo_correo_enviado
+    residente_id: Optional[int] = Field(default=None, foreign_key="residentes.id")
+    estado: EstadoCorreo = Field(default=EstadoCorreo.PENDIENTE, index=True)
+    intentos: int = Field(default=0)
+    proximo_intento: datetime = Field(default_factory=datetime.utcnow, index=True)
+    ultimo_error: Optional[str] = None
+    fecha_creacion: datetime = Field(default_factory=datetime.utcnow)
+    fecha_envio: Optional[datetime] = None
@@ -1,6 +1,7 @@
-from sqlmodel import SQLModel, Field, Relationship, Column, JSON
+from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, UniqueConstraint
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Optional
 from enum import Enum
 from decimal import Decimal
 
@@ -10,11 +11,20 @@ class EstadoGastoComun(str, Enum):
     VENCIDO = "VENCIDO"
     MOROSO = "MOROSO"
 
+# Un gasto común por residente y periodo: permite upsert (ON CONFLICT)
+UQ_GASTO_PERIODO = "uq_gastos_comunes_residente_periodo"
+
 class GastoComun(SQLModel, table=True):
     __tablename__ = "gastos_comunes"
+    __table_args__ = (
+        # También sirve de índice por residente (es su primera columna)
+        UniqueConstraint("residente_id", "mes", "anio", name=UQ_GASTO_PERIODO),
+        # Gastos pendientes ya vencidos (procesar_atrasos)
+        Index("ix_gastos_comunes_estado_fecha_vencimiento", "estado", "fecha_vencimiento"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    residente_id: int = Field(foreign_key="residentes.id", index=True)
+    residente_id: int = Field(foreign_key="residentes.id")
     condominio_id: int = Field(foreign_key="condominios.id", index=True)
     mes: int = Field(ge=1, le=12)
     anio: int
@@ -24,10 +34,9 @@ class GastoComun(SQLModel, table=True):
     multas: Decimal = Field(default=0, max_digits=10, decimal_places=2)
     monto_total: Decimal = Field(max_digits=10, decimal_places=2)
     estado: EstadoGastoComun = Field(default=EstadoGastoComun.PENDIENTE)
-    fecha_emision: date = Field(default_factory=date.today)
+    fecha_emision: date = Field(default_factory=date.today, index=True)
     fecha_vencimiento: date
     fecha_pago: Optional[datetime] = None
-    observaciones: List[dict] = Field(default=[], sa_column=Column(JSON))
     
     # Relationships
     residente: "Residente" = Relationship(back_populates="gastos_comunes")
@@ -0,0 +1,27 @@
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import JSON, Index
+from datetime import date
+from typing import Optional
+from decimal import Decimal
+
+class GastoComunItem(SQLModel, table=True):
+    """
+    Línea de detalle de un gasto común: un cargo (monto > 0) o abono (monto < 0)
+    por fila, p. ej. el costo de una reserva o su anulación. Reemplaza la lista
+    JSON GastoComun.observaciones; la API la sigue entregando armada desde aquí.
+    """
+    __tablename__ = "gasto_comun_items"
+    __table_args__ = (
+        # Detalle de un gasto en orden de inserción
+        Index("ix_gasto_comun_items_gasto_comun_id_id", "gasto_comun_id", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    gasto_comun_id: int = Field(foreign_key="gastos_comunes.id", ondelete="CASCADE")
+    reserva_id: Optional[int] = Field(default=None, index=True)
+    tipo: str
+    descripcion: str = ""
+    monto: Decimal = Field(default=0, max_digits=12, decimal_places=2)
+    fecha: date = Field(default_factory=date.today)
+    # Claves adicionales de la observación original que no tienen columna propia
+    datos: Optional[dict] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
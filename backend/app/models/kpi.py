@@ -0,0 +1,99 @@
+# backend/app/models/kpi.py
+"""
+Vistas materializadas de KPIs por condominio y mes (GET /condominios/{id}/kpis).
+
+Cada vista resume una tabla de movimientos en una fila por (condominio, mes[,
+tipo o espacio]): el endpoint lee unas pocas filas por mes pedido, sin importar
+cuánta historia tengan pagos, gastos, multas o reservas.
+
+Se refrescan con REFRESH MATERIALIZED VIEW CONCURRENTLY (services/kpis.py),
+que no bloquea las lecturas y necesita un índice único por vista.
+create_all las crea después de las tablas; drop_all las borra antes.
+"""
+from typing import List, NamedTuple
+
+from sqlalchemy import DDL, event
+from sqlmodel import SQLModel
+
+from app.models.reserva import RANGO_RESERVA
+
+
+class VistaKpi(NamedTuple):
+    nombre: str
+    consulta: str
+    clave: List[str]  # columnas del índice único (requisito de CONCURRENTLY)
+
+
+# Gastos comunes por periodo: facturado y morosidad (estado que mantiene procesar_atrasos)
+KPI_GASTOS = VistaKpi("kpi_gastos_mensual", """
+    SELECT condominio_id,
+           make_date(anio, mes, 1) AS mes,
+           count(*) AS emitidos,
+           sum(monto_total) AS facturado,
+           count(*) FILTER (WHERE estado = 'PAGADO') AS pagados,
+           count(*) FILTER (WHERE estado IN ('VENCIDO', 'MOROSO')) AS morosos,
+           coalesce(sum(monto_total) FILTER (WHERE estado IN ('VENCIDO', 'MOROSO')), 0) AS monto_moroso
+    FROM gastos_comunes
+    GROUP BY condominio_id, anio, mes
+""", ["condominio_id", "mes"])
+
+# Pagos aprobados por mes de pago y concepto
+KPI_PAGOS = VistaKpi("kpi_pagos_mensual", """
+    SELECT condominio_id,
+           CAST(date_trunc('month', fecha_pago) AS date) AS mes,
+           tipo,
+           count(*) AS pagos,
+           sum(monto) AS recaudado
+    FROM pagos
+    WHERE estado_pago = 'APROBADO'
+    GROUP BY 1, 2, 3
+""", ["condominio_id", "mes", "tipo"])
+
+# Multas por mes de emisión y TipoMulta
+KPI_MULTAS = VistaKpi("kpi_multas_mensual", """
+    SELECT condominio_id,
+           CAST(date_trunc('month', fecha_emision) AS date) AS mes,
+           tipo,
+           count(*) AS cantidad,
+           sum(monto) AS monto,
+           coalesce(sum(monto) FILTER (WHERE estado = 'PENDIENTE'), 0) AS monto_pendiente
+    FROM multas
+    GROUP BY 1, 2, 3
+""", ["condominio_id", "mes", "tipo"])
+
+# Horas reservadas por espacio común y mes (reservas no canceladas)
+KPI_RESERVAS = VistaKpi("kpi_reservas_mensual", f"""
+    SELECT e.condominio_id,
+           CAST(date_trunc('month', r.fecha_reserva) AS date) AS mes,
+           r.espacio_comun_id,
+           count(*) AS reservas,
+           sum(extract(epoch FROM upper({RANGO_RESERVA}) - lower({RANGO_RESERVA})) / 3600) AS horas
+    FROM reservas r
+    JOIN espacios_comunes e ON e.id = r.espacio_comun_id
+    WHERE r.estado <> 'CANCELADA'
+    GROUP BY 1, 2, 3
+""", ["condominio_id", "mes", "espacio_comun_id"])
+
+# Una fila con la hora del último refresco (se refresca al final)
+KPI_ACTUALIZACION = VistaKpi("kpi_actualizacion", """
+    SELECT 1 AS id, CAST(now() AT TIME ZONE 'UTC' AS timestamp) AS fecha
+""", ["id"])
+
+VISTAS_KPI = [KPI_GASTOS, KPI_PAGOS, KPI_MULTAS, KPI_RESERVAS, KPI_ACTUALIZACION]
+
+
+def sql_crear(vista: VistaKpi) -> List[str]:
+    return [
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS {vista.nombre} AS {vista.consulta}",
+        f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{vista.nombre} ON {vista.nombre} ({', '.join(vista.clave)})",
+    ]
+
+
+def sql_borrar(vista: VistaKpi) -> str:
+    return f"DROP MATERIALIZED VIEW IF EXISTS {vista.nombre}"
+
+
+for _vista in VISTAS_KPI:
+    for _sentencia in sql_crear(_vista):
+        event.listen(SQLModel.metadata, "after_create", DDL(_sentencia))
+    event.listen(SQLModel.metadata, "before_drop", DDL(sql_borrar(_vista)))
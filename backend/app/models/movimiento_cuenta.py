@@ -0,0 +1,34 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+from decimal import Decimal
+
+class OrigenMovimiento(str, Enum):
+    APERTURA = "APERTURA"  # saldo inicial al crear la cuenta corriente
+    GASTO_COMUN = "GASTO_COMUN"
+    MULTA = "MULTA"
+    RESERVA = "RESERVA"
+    PAGO = "PAGO"
+
+class MovimientoCuenta(SQLModel, table=True):
+    """
+    Libro de movimientos (solo inserción) de la cuenta corriente de un residente.
+    monto > 0 aumenta la deuda (cargo), monto < 0 la disminuye (abono).
+    La suma de los movimientos es igual a Residente.saldo.
+    """
+    __tablename__ = "movimientos_cuenta"
+    __table_args__ = (
+        # Cartola de un residente: filtra por residente y pagina por id
+        Index("ix_movimientos_cuenta_residente_id_id", "residente_id", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    residente_id: int = Field(foreign_key="residentes.id")
+    origen: OrigenMovimiento
+    referencia_id: Optional[int] = None  # gasto_comun_id, multa_id, reserva_id o pago_id
+    monto: Decimal = Field(max_digits=12, decimal_places=2)
+    saldo_resultante: Decimal = Field(max_digits=12, decimal_places=2)
+    descripcion: str
+    fecha: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from datetime import date, datetime
 from typing import Optional
 from enum import Enum
@@ -15,18 +16,23 @@ class EstadoMulta(str, Enum):
     PENDIENTE = "PENDIENTE"
     PAGADA = "PAGADA"
     CONDONADA = "CONDONADA"
+    FACTURADA = "FACTURADA"  # incluida en un gasto común: su deuda pasa al gasto
 
 class Multa(SQLModel, table=True):
     __tablename__ = "multas"
+    __table_args__ = (
+        # Multas pendientes de un residente (deuda, sincronización de pagos)
+        Index("ix_multas_residente_id_estado", "residente_id", "estado"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    residente_id: int = Field(foreign_key="residentes.id", index=True)
+    residente_id: int = Field(foreign_key="residentes.id")
     condominio_id: int = Field(foreign_key="condominios.id", index=True)
     tipo: TipoMulta
     descripcion: str
     monto: Decimal = Field(max_digits=10, decimal_places=2)
-    estado: EstadoMulta = Field(default=EstadoMulta.PENDIENTE)
-    fecha_emision: date = Field(default_factory=date.today)
+    estado: EstadoMulta = Field(default=EstadoMulta.PENDIENTE, index=True)
+    fecha_emision: date = Field(default_factory=date.today, index=True)
     fecha_pago: Optional[datetime] = None
     motivo_condonacion: Optional[str] = None
     creado_por: int = Field(foreign_key="usuarios.id")
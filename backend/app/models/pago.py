@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -22,8 +23,20 @@ class EstadoPago(str, Enum):
     RECHAZADO = "RECHAZADO"
     REVERSADO = "REVERSADO"
 
+# Un solo pago PENDIENTE por concepto: la sincronización de pagos pendientes
+# (transbank.obtener_pagos_pendientes) inserta con ON CONFLICT sobre este índice
+UQ_PAGO_PENDIENTE = "uq_pagos_pendiente_tipo_referencia"
+
 class Pago(SQLModel, table=True):
     __tablename__ = "pagos"
+    __table_args__ = (
+        # "¿Esta multa/reserva ya tiene pago?" (sincronización y conceptos)
+        Index("ix_pagos_tipo_referencia_id", "tipo", "referencia_id"),
+        Index(
+            UQ_PAGO_PENDIENTE, "tipo", "referencia_id",
+            unique=True, postgresql_where=text("estado_pago = 'PENDIENTE'"),
+        ),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     condominio_id: int = Field(foreign_key="condominios.id", index=True)
@@ -32,9 +45,9 @@ class Pago(SQLModel, table=True):
     referencia_id: int  # ID genérico (gasto_comun_id, multa_id o reserva_id)
     monto: Decimal = Field(max_digits=10, decimal_places=2)
     metodo_pago: MetodoPago
-    estado_pago: EstadoPago = Field(default=EstadoPago.PENDIENTE)
-    numero_transaccion: Optional[str] = None
-    fecha_pago: datetime = Field(default_factory=datetime.utcnow)
+    estado_pago: EstadoPago = Field(default=EstadoPago.PENDIENTE, index=True)
+    numero_transaccion: Optional[str] = Field(default=None, index=True)  # buy_order de Webpay (varios pagos por orden)
+    fecha_pago: datetime = Field(default_factory=datetime.utcnow, index=True)
     comprobante_url: Optional[str] = None
     registrado_por: int = Field(foreign_key="usuarios.id")
     
@@ -1,10 +1,35 @@
 # backend/app/models/registro.py
+import json
 from datetime import datetime
-from typing import Optional
-from sqlmodel import Field, SQLModel, Relationship
+from typing import Any, Optional
+from pydantic import field_validator
+from sqlmodel import Field, SQLModel, Relationship, Column
+from sqlalchemy import DDL, Index, event
+from sqlalchemy.dialects.postgresql import JSONB
 from enum import Enum
 
 
+# Clave del id del objeto en datos_adicionales según tipo_objeto
+CLAVE_OBJETO = {"MULTA": "multa_id", "GASTO": "gasto_id"}
+
+
+def datos_desde_texto(texto: Optional[str]) -> Any:
+    """Texto recibido por la API -> valor JSONB (un texto que no es JSON queda como string JSON)"""
+    if texto is None:
+        return None
+    try:
+        return json.loads(texto)
+    except ValueError:
+        return texto
+
+
+def datos_a_texto(valor: Any) -> Optional[str]:
+    """Valor JSONB -> texto que entrega la API (el mismo formato de antes)"""
+    if valor is None or isinstance(valor, str):
+        return valor
+    return json.dumps(valor)
+
+
 class TipoEvento(str, Enum):
     RESERVA = "RESERVA"
     ANUNCIO = "ANUNCIO"
@@ -16,11 +41,32 @@ class TipoEvento(str, Enum):
     OTRO = "OTRO"
 
 
+# Partición que recibe las filas fuera de las particiones mensuales (ver services/particiones.py)
+PARTICION_DEFAULT = "registros_default"
+
+
 # Modelo de base de datos
 class RegistroModel(SQLModel, table=True):
+    """
+    Bitácora de auditoría, particionada por mes (RANGE sobre fecha_creacion).
+    Por eso la clave primaria es (id, fecha_creacion): todo índice único de una
+    tabla particionada debe incluir la columna de partición.
+    """
     __tablename__ = "registros"
+    __table_args__ = (
+        # Bitácora completa en orden (fecha_creacion, id) descendente (keyset)
+        Index("ix_registros_fecha_creacion_id", "fecha_creacion", "id"),
+        # Bitácora de un condominio en orden (fecha_creacion, id) descendente (keyset)
+        Index("ix_registros_condominio_id_fecha_creacion_id", "condominio_id", "fecha_creacion", "id"),
+        # Búsqueda por contenido: datos_adicionales @> '{"tipo_objeto": "MULTA", "multa_id": 5}'
+        Index(
+            "ix_registros_datos_adicionales", "datos_adicionales",
+            postgresql_using="gin", postgresql_ops={"datos_adicionales": "jsonb_path_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (fecha_creacion)"},
+    )
     
-    id: Optional[int] = Field(default=None, primary_key=True)
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
     
     # Usuario que realizó la acción
     usuario_id: int = Field(foreign_key="usuarios.id")
@@ -37,16 +83,25 @@ class RegistroModel(SQLModel, table=True):
     # Condominio relacionado (opcional)
     condominio_id: Optional[int] = Field(default=None, foreign_key="condominios.id")
     
-    # Metadata adicional (JSON string para flexibilidad)
-    datos_adicionales: Optional[str] = Field(default=None)
+    # Metadata adicional (JSONB; la API la sigue recibiendo y entregando como texto JSON)
+    datos_adicionales: Optional[Any] = Field(default=None, sa_column=Column(JSONB))
     
-    # Timestamps
-    fecha_creacion: datetime = Field(default_factory=datetime.utcnow)
+    # Timestamps (UTC; define la partición mensual de la fila)
+    fecha_creacion: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
     
     # Relaciones
     # usuario: Optional["Usuario"] = Relationship(back_populates="registros")
 
 
+# Sin particiones un INSERT falla: create_all deja creada la partición DEFAULT
+# y la mantención mueve sus filas a la partición del mes cuando la crea
+event.listen(
+    RegistroModel.__table__,
+    "after_create",
+    DDL(f"CREATE TABLE IF NOT EXISTS {PARTICION_DEFAULT} PARTITION OF registros DEFAULT"),
+)
+
+
 # Modelo Pydantic para API responses
 class Registro(SQLModel):
     id: int
@@ -62,6 +117,11 @@ class Registro(SQLModel):
     usuario_nombre: Optional[str] = None
     usuario_apellido: Optional[str] = None
 
+    @field_validator("datos_adicionales", mode="before")
+    @classmethod
+    def _datos_como_texto(cls, valor):
+        return datos_a_texto(valor)
+
 
 # Modelo para crear registros
 class RegistroCreate(SQLModel):
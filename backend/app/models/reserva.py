@@ -1,4 +1,6 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from datetime import date, datetime, time
 from typing import Optional
 from enum import Enum
@@ -10,16 +12,39 @@ class EstadoReserva(str, Enum):
     CANCELADA = "CANCELADA"
     COMPLETADA = "COMPLETADA"
 
+# Intervalo [inicio, fin) que ocupa una reserva. Si hora_fin <= hora_inicio
+# la reserva termina al día siguiente (igual que calcular_costo_reserva)
+RANGO_RESERVA = (
+    "tsrange(fecha_reserva + hora_inicio, fecha_reserva + hora_fin + "
+    "CASE WHEN hora_fin <= hora_inicio THEN interval '1 day' ELSE interval '0 days' END, '[)')"
+)
+# Mismo espacio como rango de un elemento: permite usar "=" en un índice GiST
+# sin la extensión btree_gist
+ESPACIO_RESERVA = "int4range(espacio_comun_id, espacio_comun_id, '[]')"
+
 class Reserva(SQLModel, table=True):
     __tablename__ = "reservas"
+    __table_args__ = (
+        # Dos reservas vigentes del mismo espacio no pueden traslaparse. El índice
+        # GiST de la restricción también sirve para buscar horarios libres
+        ExcludeConstraint(
+            (text(ESPACIO_RESERVA), "="),
+            (text(RANGO_RESERVA), "&&"),
+            name="reservas_sin_traslape",
+            using="gist",
+            where=text("estado <> 'CANCELADA'"),
+        ),
+        # Reservas de un espacio en un rango de fechas (listados, calendario)
+        Index("ix_reservas_espacio_comun_id_fecha_reserva", "espacio_comun_id", "fecha_reserva"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    espacio_comun_id: int = Field(foreign_key="espacios_comunes.id", index=True)
+    espacio_comun_id: int = Field(foreign_key="espacios_comunes.id")
     residente_id: int = Field(foreign_key="residentes.id", index=True)
-    fecha_reserva: date
+    fecha_reserva: date = Field(index=True)
     hora_inicio: time
     hora_fin: time
-    estado: EstadoReserva = Field(default=EstadoReserva.PENDIENTE_PAGO)
+    estado: EstadoReserva = Field(default=EstadoReserva.PENDIENTE_PAGO, index=True)
     monto_pago: Optional[Decimal] = Field(default=None, max_digits=10, decimal_places=2)
     pago_id: Optional[int] = Field(default=None, foreign_key="pagos.id")
     observaciones: Optional[str] = None
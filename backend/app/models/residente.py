@@ -1,13 +1,14 @@
 ﻿from sqlmodel import SQLModel, Field, Relationship
 from datetime import date, datetime
 from typing import Optional, List
+from decimal import Decimal
 
 class Residente(SQLModel, table=True):
     __tablename__ = "residentes"
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    usuario_id: Optional[int] = Field(default=None, foreign_key="usuarios.id")
-    condominio_id: int = Field(foreign_key="condominios.id")
+    usuario_id: Optional[int] = Field(default=None, foreign_key="usuarios.id", index=True)
+    condominio_id: int = Field(foreign_key="condominios.id", index=True)
     vivienda_numero: str = Field(index=True)
     nombre: str
     apellido: str
@@ -19,6 +20,11 @@ class Residente(SQLModel, table=True):
     es_propietario: bool
     fecha_ingreso: date = Field(default_factory=date.today)
     activo: bool = Field(default=True)
+    # Deuda vigente; solo se modifica a través de app.services.cuenta (libro movimientos_cuenta)
+    saldo: Decimal = Field(
+        default=0, max_digits=12, decimal_places=2,
+        sa_column_kwargs={"server_default": "0"}
+    )
     
     # Relationships
     usuario: Optional["Usuario"] = Relationship(back_populates="residentes")
@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
@@ -25,3 +25,22 @@ class GastoComunInput(BaseModel):
     estado: Optional[EstadoGastoComun] = EstadoGastoComun.PENDIENTE
     fecha_vencimiento: date
     observaciones: List[Dict] = []
+
+
+class GastoComunLeer(BaseModel):
+    """GastoComun con su detalle (gasto_comun_items) como lista `observaciones`"""
+    id: int
+    residente_id: int
+    condominio_id: int
+    mes: int
+    anio: int
+    monto_base: Decimal
+    cuota_mantencion: Decimal
+    servicios: Decimal
+    multas: Decimal
+    monto_total: Decimal
+    estado: EstadoGastoComun
+    fecha_emision: date
+    fecha_vencimiento: date
+    fecha_pago: Optional[datetime] = None
+    observaciones: List[Dict] = []
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
 class ReservaCreate(BaseModel):
@@ -10,3 +10,19 @@ class ReservaCreate(BaseModel):
     cantidad_personas: int
     observaciones: Optional[str] = None
     es_evento_comunidad: bool = False
+
+
+class HorarioLibre(BaseModel):
+    fecha: date
+    inicio: datetime
+    fin: datetime
+    minutos: int
+
+
+class OcupacionDia(BaseModel):
+    fecha: date
+    slot_minutos: int
+    # Un caracter por bloque desde las 00:00: "1" ocupado, "0" libre
+    mapa: str
+    slots_ocupados: int
+    porcentaje_ocupado: float
@@ -0,0 +1,187 @@
+"""
+Alertas agrupadas por (tipo, condominio, entidad, ventana).
+
+Los endpoints registran eventos (una edición de un gasto, una multa, un
+gasto que pasa a morosidad) y antes cada uno insertaba una alerta: una
+corrección masiva dejaba miles de alertas PENDIENTES casi iguales. Ahora un
+evento cuya clave ya tiene una alerta PENDIENTE en la misma ventana de
+ALERTAS_VENTANA_MIN minutos no inserta: suma a `ocurrencias` y actualiza la
+descripción y la fecha de la última ocurrencia, con un solo
+INSERT ... ON CONFLICT sobre el índice único parcial UQ_ALERTA_PENDIENTE.
+Una alerta resuelta deja de agrupar: el próximo evento abre una nueva.
+Cada registro o resolución avisa a los streams SSE del condominio (services/eventos.py).
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.alerta import Alerta, EstadoAlerta, TipoAlerta
+from app.services.eventos import central_eventos, sentencia_notificar
+
+_EPOCA = datetime(2000, 1, 1)
+CLAVE = ("tipo", "condominio_id", "entidad_tipo", "entidad_id", "ventana")
+
+
+def inicio_ventana(momento: datetime) -> datetime:
+    """Inicio de la ventana de agrupación que contiene `momento`"""
+    ventana = timedelta(minutes=max(1, settings.ALERTAS_VENTANA_MIN))
+    return _EPOCA + ((momento - _EPOCA) // ventana) * ventana
+
+
+def alerta(
+    titulo: str,
+    descripcion: str,
+    tipo: TipoAlerta,
+    condominio_id: Optional[int] = None,
+    entidad_tipo: Optional[str] = None,
+    entidad_id: Optional[int] = None,
+) -> dict:
+    """Fila de alerta para registrar_alertas"""
+    return {
+        "titulo": titulo,
+        "descripcion": descripcion,
+        "tipo": tipo,
+        "condominio_id": condominio_id,
+        "entidad_tipo": entidad_tipo,
+        "entidad_id": entidad_id,
+    }
+
+
+async def registrar_alertas(db: AsyncSession, alertas: List[dict]) -> int:
+    """
+    Inserta o agrupa las alertas en una sola sentencia. Las filas con la misma
+    clave se juntan antes (ON CONFLICT no puede tocar dos veces la misma fila).
+    Retorna la cantidad de alertas distintas afectadas; el commit queda para el llamador.
+    """
+    if not alertas:
+        return 0
+    ahora = datetime.now()
+    ventana = inicio_ventana(ahora)
+    agrupadas: Dict[Tuple, dict] = {}
+    for fila in alertas:
+        fila = {**fila, "ventana": ventana}
+        clave = tuple(fila[c] for c in CLAVE)
+        if clave in agrupadas:
+            # Gana la descripción del último evento
+            agrupadas[clave]["descripcion"] = fila["descripcion"]
+            agrupadas[clave]["ocurrencias"] += 1
+        else:
+            agrupadas[clave] = {
+                **fila,
+                "estado": EstadoAlerta.PENDIENTE,
+                "fecha_creacion": ahora,
+                "fecha_ultima_ocurrencia": ahora,
+                "ocurrencias": 1,
+            }
+
+    sentencia = pg_insert(Alerta).values(list(agrupadas.values()))
+    filas = (await db.execute(sentencia.on_conflict_do_update(
+        index_elements=[getattr(Alerta, c) for c in CLAVE],
+        # Literal (no parámetro): debe calzar con el predicado del índice parcial
+        index_where=text("estado = 'PENDIENTE'"),
+        set_={
+            "descripcion": sentencia.excluded.descripcion,
+            "ocurrencias": Alerta.ocurrencias + sentencia.excluded.ocurrencias,
+            "fecha_ultima_ocurrencia": sentencia.excluded.fecha_ultima_ocurrencia,
+        },
+    ).returning(Alerta.id, Alerta.condominio_id))).all()
+    for notificacion in notificaciones_alertas("registrada", filas):
+        await db.execute(notificacion)
+    return len(agrupadas)
+
+
+def notificaciones_alertas(accion: str, filas) -> list:
+    """pg_notify por condominio con los ids de las alertas (filas de id, condominio_id)"""
+    por_condominio: Dict[Optional[int], List[int]] = {}
+    for id, condominio_id in filas:
+        por_condominio.setdefault(condominio_id, []).append(id)
+    return [
+        sentencia_notificar("alerta", accion=accion, condominio_id=condominio_id, ids=ids)
+        for condominio_id, ids in por_condominio.items()
+    ]
+
+
+class CacheResumenAlertas:
+    """
+    Conteo de alertas PENDIENTES por tipo, por condominio (None = todos), en
+    memoria y por proceso. Se calcula con un GROUP BY sobre el índice parcial
+    ix_alerta_pendiente_condominio_id_tipo (index-only scan).
+
+    Se invalida con los eventos "alerta" de LISTEN/NOTIFY, que llegan después
+    del commit a todos los procesos; el TTL acota el atraso si la conexión
+    LISTEN está caída o los eventos desactivados.
+    """
+
+    def __init__(self, ttl_seg: float):
+        self.ttl_seg = ttl_seg
+        self._entradas: Dict[Optional[int], Tuple[float, dict]] = {}
+        # Sube en cada invalidación: un cálculo que empezó antes no se guarda
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidaciones = 0
+
+    async def _calcular(self, db: AsyncSession, condominio_id: Optional[int]) -> dict:
+        query = (
+            select(Alerta.tipo, func.count(), func.coalesce(func.sum(Alerta.ocurrencias), 0))
+            .where(Alerta.estado == EstadoAlerta.PENDIENTE)
+            .group_by(Alerta.tipo)
+        )
+        if condominio_id is not None:
+            query = query.where(Alerta.condominio_id == condominio_id)
+        filas = (await db.execute(query)).all()
+
+        por_tipo = {tipo.value: 0 for tipo in TipoAlerta}
+        ocurrencias = 0
+        for tipo, cantidad, suma in filas:
+            por_tipo[tipo.value] = cantidad
+            ocurrencias += suma
+        return {
+            "condominio_id": condominio_id,
+            "total": sum(por_tipo.values()),
+            "ocurrencias": ocurrencias,
+            "por_tipo": por_tipo,
+        }
+
+    async def resumen(self, db: AsyncSession, condominio_id: Optional[int]) -> dict:
+        entrada = self._entradas.get(condominio_id)
+        if entrada is not None and entrada[0] >= time.monotonic():
+            self.hits += 1
+            return entrada[1]
+        self.misses += 1
+        version = self._version
+        resultado = await self._calcular(db, condominio_id)
+        if self.ttl_seg > 0 and version == self._version:
+            self._entradas[condominio_id] = (time.monotonic() + self.ttl_seg, resultado)
+        return resultado
+
+    def invalidar(self, condominio_id: Optional[int] = None) -> None:
+        """Descarta el condominio y el resumen global (o todo si condominio_id es None)"""
+        self._version += 1
+        self.invalidaciones += 1
+        if condominio_id is None:
+            self._entradas.clear()
+        else:
+            self._entradas.pop(condominio_id, None)
+            self._entradas.pop(None, None)
+
+    def estadisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "condominios": len(self._entradas),
+            "ttl_seg": self.ttl_seg,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidaciones": self.invalidaciones,
+            "tasa_hits": round(self.hits / total, 4) if total else None,
+        }
+
+
+cache_resumen_alertas = CacheResumenAlertas(settings.ALERTAS_RESUMEN_TTL_SEG)
+central_eventos.al_recibir("alerta", lambda datos: cache_resumen_alertas.invalidar(datos.get("condominio_id")))
@@ -0,0 +1,89 @@
+"""
+Resolución en lote del texto de concepto de los pagos.
+
+Un Pago solo guarda (tipo, referencia_id); para mostrarlo hay que leer el
+GastoComun, la Multa o la Reserva (+ EspacioComun) que referencia. En vez de
+hacer esas lecturas por fila, se agrupan los pagos por tipo y se hace una
+consulta IN por tipo: a lo más tres consultas sin importar el tamaño de la página.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable
+
+from sqlalchemy import Integer, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.espacio_comun import EspacioComun
+from app.models.gasto_comun import GastoComun
+from app.models.multa import Multa
+from app.models.pago import Pago, TipoPago
+from app.models.reserva import Reserva
+
+
+def _en(columna, ids):
+    return columna == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+
+
+def concepto_gasto_comun(mes, anio) -> str:
+    return f"Gasto Común - {mes}/{anio}"
+
+
+def concepto_multa(descripcion: str) -> str:
+    descripcion = descripcion[:30] + "..." if len(descripcion) > 30 else descripcion
+    return f"Multa - {descripcion}"
+
+
+def concepto_reserva(nombre_espacio, fecha_reserva) -> str:
+    nombre_espacio = nombre_espacio or "Espacio Común"
+    return f"Reserva {nombre_espacio} ({fecha_reserva.strftime('%d/%m')})"
+
+
+# Concepto cuando la entidad referenciada ya no existe
+CONCEPTO_POR_DEFECTO = {
+    TipoPago.GASTO_COMUN: "Gasto Común",
+    TipoPago.MULTA: "Multa",
+    TipoPago.RESERVA: "Reserva de espacio común",
+}
+
+
+async def resolver_conceptos(db: AsyncSession, pagos: Iterable[Pago]) -> Dict[int, str]:
+    """Retorna {pago.id: concepto} para todos los pagos dados"""
+    pagos = list(pagos)
+    referencias = defaultdict(set)
+    for pago in pagos:
+        referencias[pago.tipo].add(pago.referencia_id)
+
+    textos: Dict[TipoPago, Dict[int, str]] = defaultdict(dict)
+
+    if referencias[TipoPago.GASTO_COMUN]:
+        filas = (await db.exec(
+            select(GastoComun.id, GastoComun.mes, GastoComun.anio)
+            .where(_en(GastoComun.id, referencias[TipoPago.GASTO_COMUN]))
+        )).all()
+        for gasto_id, mes, anio in filas:
+            textos[TipoPago.GASTO_COMUN][gasto_id] = concepto_gasto_comun(mes, anio)
+
+    if referencias[TipoPago.MULTA]:
+        filas = (await db.exec(
+            select(Multa.id, Multa.descripcion)
+            .where(_en(Multa.id, referencias[TipoPago.MULTA]))
+        )).all()
+        for multa_id, descripcion in filas:
+            textos[TipoPago.MULTA][multa_id] = concepto_multa(descripcion)
+
+    if referencias[TipoPago.RESERVA]:
+        filas = (await db.exec(
+            select(Reserva.id, Reserva.fecha_reserva, EspacioComun.nombre)
+            .outerjoin(EspacioComun, EspacioComun.id == Reserva.espacio_comun_id)
+            .where(_en(Reserva.id, referencias[TipoPago.RESERVA]))
+        )).all()
+        for reserva_id, fecha_reserva, nombre_espacio in filas:
+            textos[TipoPago.RESERVA][reserva_id] = concepto_reserva(nombre_espacio, fecha_reserva)
+
+    return {
+        pago.id: textos[pago.tipo].get(
+            pago.referencia_id, CONCEPTO_POR_DEFECTO.get(pago.tipo, pago.tipo.value)
+        )
+        for pago in pagos
+    }
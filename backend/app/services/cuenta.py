@@ -0,0 +1,182 @@
+"""
+Cuenta corriente de los residentes: libro de movimientos + saldo materializado.
+
+Residente.saldo es la deuda vigente del residente, la misma que antes se
+recalculaba en cada request sumando gastos comunes impagos y multas pendientes.
+Cada operación que cambia esa deuda registra aquí la diferencia, en la misma
+transacción que el cambio:
+
+    antes = aporte_gasto(gasto)
+    ... modificar gasto ...
+    await registrar_movimiento(db, gasto.residente_id, aporte_gasto(gasto) - antes, ...)
+
+El saldo se incrementa con un UPDATE atómico (saldo = saldo + monto), así dos
+requests concurrentes sobre el mismo residente no pierden actualizaciones, y el
+movimiento guarda el saldo resultante para armar cartolas sin recalcular.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import Integer, bindparam, insert, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.gasto_comun import GastoComun, EstadoGastoComun
+from app.models.movimiento_cuenta import MovimientoCuenta, OrigenMovimiento
+from app.models.multa import Multa, EstadoMulta
+from app.models.residente import Residente
+
+# Estados en que un gasto común cuenta como deuda
+ESTADOS_DEUDA_GC = (
+    EstadoGastoComun.PENDIENTE,
+    EstadoGastoComun.VENCIDO,
+    EstadoGastoComun.MOROSO,
+)
+
+
+def aporte_gasto(gasto: Optional[GastoComun]) -> Decimal:
+    """Cuánto aporta el gasto común a la deuda del residente"""
+    if gasto is None or gasto.estado not in ESTADOS_DEUDA_GC:
+        return Decimal(0)
+    return Decimal(gasto.monto_total or 0)
+
+
+def aporte_multa(multa: Optional[Multa]) -> Decimal:
+    """Cuánto aporta la multa a la deuda del residente"""
+    if multa is None or multa.estado != EstadoMulta.PENDIENTE:
+        return Decimal(0)
+    return Decimal(multa.monto or 0)
+
+
+async def registrar_movimiento(
+    db: AsyncSession,
+    residente_id: int,
+    monto: Decimal,
+    origen: OrigenMovimiento,
+    referencia_id: Optional[int],
+    descripcion: str,
+) -> Optional[MovimientoCuenta]:
+    """
+    Aplica `monto` al saldo del residente y agrega el movimiento al libro.
+    No hace commit: queda en la transacción del llamador. Monto 0 no registra nada.
+    """
+    if not monto:
+        return None
+    saldo = (await db.execute(
+        update(Residente)
+        .where(Residente.id == residente_id)
+        .values(saldo=Residente.saldo + monto)
+        .returning(Residente.saldo)
+    )).scalar_one()
+    movimiento = MovimientoCuenta(
+        residente_id=residente_id,
+        origen=origen,
+        referencia_id=referencia_id,
+        monto=monto,
+        saldo_resultante=saldo,
+        descripcion=descripcion,
+    )
+    db.add(movimiento)
+    return movimiento
+
+
+async def registrar_movimientos(db: AsyncSession, movimientos: Iterable[dict]) -> int:
+    """
+    Versión masiva para procesos batch: un UPDATE de saldos y un INSERT de
+    movimientos, sin importar cuántos sean. Cada dict trae residente_id, monto,
+    origen, referencia_id y descripcion. Retorna la cantidad registrada.
+    """
+    movimientos = [m for m in movimientos if m["monto"]]
+    if not movimientos:
+        return 0
+
+    por_residente = defaultdict(list)
+    for movimiento in movimientos:
+        por_residente[movimiento["residente_id"]].append(movimiento)
+    totales = {rid: sum(m["monto"] for m in movs) for rid, movs in por_residente.items()}
+
+    # Orden por id: dos lotes concurrentes con residentes en común bloquean las
+    # filas en el mismo orden y no se producen deadlocks
+    residentes = sorted(totales)
+    deltas = [totales[rid] for rid in residentes]
+    await db.execute(
+        text("SELECT id FROM residentes WHERE id = ANY(:ids) ORDER BY id FOR UPDATE")
+        .bindparams(bindparam("ids", residentes, type_=ARRAY(Integer)))
+    )
+    # UPDATE ... FROM unnest(ids, deltas): un solo statement para todos los residentes
+    saldos = dict((await db.execute(
+        text(
+            "UPDATE residentes AS r SET saldo = r.saldo + d.delta "
+            "FROM unnest(:ids, :deltas) AS d(id, delta) "
+            "WHERE r.id = d.id RETURNING r.id, r.saldo"
+        ).bindparams(
+            bindparam("ids", residentes, type_=ARRAY(Integer)),
+            bindparam("deltas", deltas, type_=ARRAY(MovimientoCuenta.__table__.c.monto.type)),
+        )
+    )).all())
+
+    filas = []
+    for rid, movs in por_residente.items():
+        # Reconstruir el saldo intermedio después de cada movimiento del lote
+        saldo = saldos[rid] - totales[rid]
+        for movimiento in movs:
+            saldo += movimiento["monto"]
+            filas.append({**movimiento, "saldo_resultante": saldo})
+    await db.execute(insert(MovimientoCuenta), filas)
+    return len(filas)
+
+
+async def registrar_edicion(
+    db: AsyncSession,
+    residente_anterior: int,
+    residente_nuevo: int,
+    aporte_anterior: Decimal,
+    aporte_nuevo: Decimal,
+    origen: OrigenMovimiento,
+    referencia_id: Optional[int],
+    descripcion: str,
+) -> None:
+    """
+    Movimientos de una edición. Si el cargo cambió de residente, el aporte
+    anterior sale de la cuenta del anterior y el nuevo entra a la del nuevo;
+    si no, se registra solo la diferencia.
+    """
+    if residente_anterior == residente_nuevo:
+        await registrar_movimiento(
+            db, residente_nuevo, aporte_nuevo - aporte_anterior, origen, referencia_id, descripcion
+        )
+        return
+    await registrar_movimientos(db, [
+        {"residente_id": residente_anterior, "monto": -aporte_anterior, "origen": origen,
+         "referencia_id": referencia_id, "descripcion": descripcion},
+        {"residente_id": residente_nuevo, "monto": aporte_nuevo, "origen": origen,
+         "referencia_id": referencia_id, "descripcion": descripcion},
+    ])
+
+
+# Abre la cuenta corriente de los residentes que aún no tienen movimientos,
+# con un movimiento APERTURA igual a la deuda calculada desde gastos y multas.
+# Idempotente: lo usa scripts/init_db.py (la migración 0002 tiene su copia).
+SQL_ABRIR_CUENTAS = """
+WITH deuda AS (
+    SELECT r.id AS residente_id, SUM(c.monto) AS monto
+    FROM residentes r
+    JOIN (
+        SELECT residente_id, monto_total AS monto FROM gastos_comunes
+        WHERE estado IN ('PENDIENTE', 'VENCIDO', 'MOROSO')
+        UNION ALL
+        SELECT residente_id, monto FROM multas WHERE estado = 'PENDIENTE'
+    ) c ON c.residente_id = r.id
+    WHERE NOT EXISTS (SELECT 1 FROM movimientos_cuenta m WHERE m.residente_id = r.id)
+    GROUP BY r.id
+),
+apertura AS (
+    INSERT INTO movimientos_cuenta (residente_id, origen, monto, saldo_resultante, descripcion, fecha)
+    SELECT residente_id, 'APERTURA', monto, monto, 'Saldo inicial', now() AT TIME ZONE 'utc'
+    FROM deuda WHERE monto <> 0
+    RETURNING residente_id, monto
+)
+UPDATE residentes r SET saldo = apertura.monto
+FROM apertura WHERE r.id = apertura.residente_id
+"""
@@ -0,0 +1,240 @@
+"""
+Disponibilidad de espacios comunes.
+
+Las reservas vigentes (no canceladas) de un espacio no pueden traslaparse: lo
+garantiza la restricción de exclusión reservas_sin_traslape en la base, así
+dos requests en paralelo no pueden tomar el mismo horario. Los horarios libres
+se calculan en SQL restando los rangos ocupados (multirange) a la ventana de
+atención de cada día, usando el índice GiST de esa misma restricción.
+
+Antes de insertar o mover una reserva se toma un advisory lock por espacio:
+dos inserciones traslapadas que verifican la restricción al mismo tiempo se
+esperan mutuamente y PostgreSQL aborta una con deadlock. Con el lock las
+reservas de un mismo espacio se validan de a una y la perdedora recibe la
+violación de la restricción (409) en vez de un error 500.
+"""
+import time as reloj
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.reserva import ESPACIO_RESERVA, RANGO_RESERVA, EstadoReserva, Reserva
+
+RESTRICCION_TRASLAPE = "reservas_sin_traslape"
+# Primer entero de pg_advisory_xact_lock(int, int): identifica los locks de reservas
+CLASE_LOCK_RESERVAS = 7301
+
+SQL_HORARIOS_LIBRES = text(f"""
+WITH parametros AS (
+    SELECT CAST(:desde AS date) AS desde, CAST(:hasta AS date) AS hasta,
+           CAST(:apertura AS time) AS apertura, CAST(:cierre AS time) AS cierre
+),
+ventanas AS (
+    SELECT d::date AS dia,
+           tsrange(d::date + p.apertura, d::date + p.cierre, '[)') AS ventana
+    FROM parametros p, generate_series(p.desde, p.hasta, interval '1 day') AS d
+),
+ocupado AS (
+    SELECT range_agg({RANGO_RESERVA}) AS rangos
+    FROM reservas, parametros p
+    WHERE {ESPACIO_RESERVA} = int4range(:espacio_id, :espacio_id, '[]')
+      AND estado <> 'CANCELADA'
+      AND {RANGO_RESERVA} && tsrange(p.desde + p.apertura, p.hasta + p.cierre, '[)')
+)
+SELECT v.dia, lower(libre) AS inicio, upper(libre) AS fin
+FROM ventanas v
+CROSS JOIN ocupado o
+CROSS JOIN LATERAL unnest(
+    tsmultirange(v.ventana) - coalesce(o.rangos, '{{}}'::tsmultirange)
+) AS libre
+WHERE upper(libre) - lower(libre) >= CAST(:duracion_minima AS interval)
+ORDER BY inicio
+""")
+
+
+async def bloquear_espacios(db: AsyncSession, *espacio_ids: int) -> None:
+    """Serializa (hasta el fin de la transacción) las reservas de estos espacios"""
+    for espacio_id in sorted(set(espacio_ids)):
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(:clase, :espacio_id)"),
+            {"clase": CLASE_LOCK_RESERVAS, "espacio_id": espacio_id},
+        )
+
+
+def es_traslape(error: IntegrityError) -> bool:
+    """True si el IntegrityError viene de la restricción de no traslape"""
+    return RESTRICCION_TRASLAPE in str(error.orig)
+
+
+async def horarios_libres(
+    db: AsyncSession,
+    espacio_id: int,
+    desde: date,
+    hasta: date,
+    apertura: time,
+    cierre: time,
+    duracion_minima: timedelta,
+) -> List[dict]:
+    """Bloques libres [inicio, fin) del espacio entre `desde` y `hasta` (inclusive)"""
+    filas = (await db.execute(SQL_HORARIOS_LIBRES, {
+        "espacio_id": espacio_id,
+        "desde": desde,
+        "hasta": hasta,
+        "apertura": apertura,
+        "cierre": cierre,
+        "duracion_minima": duracion_minima,
+    })).all()
+    return [
+        {
+            "fecha": fila.dia,
+            "inicio": fila.inicio,
+            "fin": fila.fin,
+            "minutos": int((fila.fin - fila.inicio).total_seconds() // 60),
+        }
+        for fila in filas
+    ]
+
+
+# --- Ocupación por día en bloques fijos (calendario) ---
+
+SLOT_MINUTOS = 15
+SLOTS_POR_DIA = 24 * 60 // SLOT_MINUTOS
+
+SQL_RESERVAS_RANGO = text(f"""
+SELECT fecha_reserva, hora_inicio, hora_fin
+FROM reservas
+WHERE {ESPACIO_RESERVA} = int4range(:espacio_id, :espacio_id, '[]')
+  AND estado <> 'CANCELADA'
+  AND {RANGO_RESERVA} && tsrange(CAST(:desde AS timestamp), CAST(:hasta AS timestamp), '[)')
+""")
+
+
+def _minutos(hora: time) -> int:
+    return hora.hour * 60 + hora.minute + (1 if hora.second or hora.microsecond else 0)
+
+
+def bits_reserva(fecha_reserva: date, hora_inicio: time, hora_fin: time) -> List[Tuple[date, int]]:
+    """
+    Bits que ocupa una reserva: [(día, máscara)]. El bit i es el bloque
+    [i*SLOT_MINUTOS, (i+1)*SLOT_MINUTOS) del día; un bloque ocupado en parte
+    cuenta como ocupado. Si termina al día siguiente se reparte en dos días.
+    """
+    inicio = _minutos(hora_inicio)
+    fin = _minutos(hora_fin)
+    tramos = [(fecha_reserva, inicio, fin)] if fin > inicio else [
+        (fecha_reserva, inicio, 24 * 60),
+        (fecha_reserva + timedelta(days=1), 0, fin),
+    ]
+    resultado = []
+    for dia, desde, hasta in tramos:
+        primero = desde // SLOT_MINUTOS
+        ultimo = -(-hasta // SLOT_MINUTOS)  # techo
+        if ultimo > primero:
+            resultado.append((dia, ((1 << (ultimo - primero)) - 1) << primero))
+    return resultado
+
+
+def _mes(dia: date) -> Tuple[int, int]:
+    return dia.year, dia.month
+
+
+def _dias_del_mes(anio: int, mes: int) -> Tuple[date, date]:
+    inicio = date(anio, mes, 1)
+    fin = date(anio + (mes == 12), mes % 12 + 1, 1)
+    return inicio, fin
+
+
+class CacheOcupacion:
+    """
+    Mapas de bits de ocupación por espacio y día (SLOTS_POR_DIA bloques de
+    SLOT_MINUTOS), en memoria y por proceso. Se carga de a un mes por espacio
+    con una sola consulta y después se mantiene con los cambios de reservas:
+
+    - agregar(): una reserva nueva solo prende bits (no puede traslaparse).
+    - invalidar(): editar, cancelar o eliminar descarta el mes afectado, que se
+      recarga exacto en la siguiente lectura (dos reservas pueden compartir un
+      bloque a medias, así que apagar sus bits podría borrar la otra).
+
+    Con varios workers cada uno tiene su copia; el TTL acota cuánto tarda en
+    verse un cambio hecho en otro proceso.
+    """
+
+    def __init__(self, ttl_seg: float):
+        self.ttl_seg = ttl_seg
+        # (espacio_id, anio, mes) -> (expira, {dia: mascara})
+        self._meses: Dict[Tuple[int, int, int], Tuple[float, Dict[date, int]]] = {}
+        # Sube con cada cambio del espacio: una carga que empezó antes no se guarda
+        self._version: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _cargar_mes(self, db: AsyncSession, espacio_id: int, anio: int, mes: int) -> Dict[date, int]:
+        inicio, fin = _dias_del_mes(anio, mes)
+        version = self._version.get(espacio_id, 0)
+        filas = (await db.execute(SQL_RESERVAS_RANGO, {
+            "espacio_id": espacio_id,
+            "desde": datetime.combine(inicio, time.min),
+            "hasta": datetime.combine(fin, time.min),
+        })).all()
+
+        mapas = {inicio + timedelta(days=i): 0 for i in range((fin - inicio).days)}
+        for fila in filas:
+            for dia, mascara in bits_reserva(fila.fecha_reserva, fila.hora_inicio, fila.hora_fin):
+                if dia in mapas:
+                    mapas[dia] |= mascara
+
+        if self.ttl_seg > 0 and version == self._version.get(espacio_id, 0):
+            self._meses[(espacio_id, anio, mes)] = (reloj.monotonic() + self.ttl_seg, mapas)
+        return mapas
+
+    async def ocupacion(self, db: AsyncSession, espacio_id: int, desde: date, hasta: date) -> Dict[date, int]:
+        """Máscara de ocupación de cada día entre desde y hasta (inclusive)"""
+        resultado = {}
+        anio, mes = _mes(desde)
+        while (anio, mes) <= _mes(hasta):
+            entrada = self._meses.get((espacio_id, anio, mes))
+            if entrada is not None and entrada[0] >= reloj.monotonic():
+                self.hits += 1
+                mapas = entrada[1]
+            else:
+                self.misses += 1
+                mapas = await self._cargar_mes(db, espacio_id, anio, mes)
+            resultado.update({dia: m for dia, m in mapas.items() if desde <= dia <= hasta})
+            anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+        return resultado
+
+    def agregar(self, reserva: Reserva) -> None:
+        """Marca en los meses cargados los bloques de una reserva recién confirmada en la BD"""
+        if reserva.estado == EstadoReserva.CANCELADA:
+            return
+        self._version[reserva.espacio_comun_id] = self._version.get(reserva.espacio_comun_id, 0) + 1
+        for dia, mascara in bits_reserva(reserva.fecha_reserva, reserva.hora_inicio, reserva.hora_fin):
+            entrada = self._meses.get((reserva.espacio_comun_id, *_mes(dia)))
+            if entrada is not None:
+                entrada[1][dia] |= mascara
+
+    def invalidar(self, espacio_id: int, *fechas: Optional[date]) -> None:
+        """Descarta los meses cargados que contienen esas fechas (y el día siguiente)"""
+        self._version[espacio_id] = self._version.get(espacio_id, 0) + 1
+        for fecha in fechas:
+            if fecha is None:
+                continue
+            for dia in (fecha, fecha + timedelta(days=1)):
+                self._meses.pop((espacio_id, *_mes(dia)), None)
+
+    def estadisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "meses_cargados": len(self._meses),
+            "ttl_seg": self.ttl_seg,
+            "hits": self.hits,
+            "misses": self.misses,
+            "tasa_hits": round(self.hits / total, 4) if total else None,
+        }
+
+
+cache_ocupacion = CacheOcupacion(settings.DISPONIBILIDAD_CACHE_TTL_SEG)
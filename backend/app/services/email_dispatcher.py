@@ -0,0 +1,244 @@
+"""
+Despacho de correos en segundo plano a partir de la bandeja de salida (tabla correos).
+
+Los endpoints solo encolan (encolar_correo) dentro de su propia transacción,
+así la latencia del request no incluye el SMTP y un correo nunca se pierde ni
+se envía por una operación que terminó en rollback. El despachador:
+
+- reclama lotes con FOR UPDATE SKIP LOCKED (seguro con varios workers),
+- los envía por DESPACHO_CONCURRENCIA conexiones SMTP reutilizadas
+  (un solo STARTTLS/login por conexión), un mensaje por destinatario,
+- reintenta con backoff exponencial hasta DESPACHO_MAX_INTENTOS,
+- actualiza Residente.ultimo_correo_enviado con un único UPDATE por lote.
+
+Para probar localmente sin un servidor real:
+    python -m aiosmtpd -n -l localhost:8025
+    SMTP_HOST=localhost SMTP_PORT=8025 SMTP_STARTTLS=false uvicorn app.main:app
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import Integer, any_, bindparam, insert, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.correo import Correo, EstadoCorreo
+from app.models.residente import Residente
+from app.utils.email_service import SMTPConnection
+
+
+def encolar_correo(db, destinatario: str, asunto: str, cuerpo: str, residente_id: Optional[int] = None) -> Correo:
+    """
+    Agrega un correo a la bandeja de salida en la sesión dada (sync o async).
+    Se persiste con el commit del llamador, junto con el resto de la operación.
+    """
+    correo = Correo(
+        destinatario=destinatario,
+        asunto=asunto,
+        cuerpo=cuerpo,
+        residente_id=residente_id,
+    )
+    db.add(correo)
+    return correo
+
+
+def encolar_difusion(
+    db: Session,
+    destinatarios,
+    asunto: str,
+    cuerpo: str,
+    tamano_bloque: Optional[int] = None,
+) -> int:
+    """
+    Encola un correo personalizado por destinatario para envíos masivos.
+    `destinatarios` es un select de (Residente.id, Residente.email, Residente.nombre);
+    se recorre por bloques con un cursor del servidor (sin cargar todo en memoria)
+    y cada bloque se inserta con un único INSERT. `cuerpo` puede usar {nombre}.
+    Retorna la cantidad de correos encolados; el commit queda para el llamador.
+    """
+    tamano_bloque = tamano_bloque or settings.DIFUSION_BLOQUE
+    ahora = datetime.utcnow()
+    total = 0
+    filas = db.execute(destinatarios.execution_options(yield_per=tamano_bloque))
+    for bloque in filas.partitions():
+        correos = [
+            {
+                "destinatario": email,
+                "asunto": asunto,
+                "cuerpo": cuerpo.replace("{nombre}", nombre),
+                "residente_id": residente_id,
+                "estado": EstadoCorreo.PENDIENTE,
+                "intentos": 0,
+                "proximo_intento": ahora,
+                "fecha_creacion": ahora,
+            }
+            for residente_id, email, nombre in bloque
+            if email
+        ]
+        if correos:
+            db.execute(insert(Correo), correos)
+            total += len(correos)
+    return total
+
+
+def _ids(nombre: str, valores: List[int]):
+    return any_(bindparam(nombre, valores, type_=ARRAY(Integer)))
+
+
+class DespachadorCorreos:
+
+    def __init__(self):
+        self._tarea: Optional[asyncio.Task] = None
+        self._despertar = asyncio.Event()
+        # Una conexión por hilo de envío: SMTPConnection no es thread-safe
+        self._conexiones = [
+            SMTPConnection() for _ in range(max(1, settings.DESPACHO_CONCURRENCIA))
+        ]
+
+    def iniciar(self) -> None:
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        for conexion in self._conexiones:
+            await asyncio.to_thread(conexion.close)
+
+    def despertar(self) -> None:
+        """Adelanta el próximo ciclo (p.ej. después de encolar muchos correos)"""
+        self._despertar.set()
+
+    async def _bucle(self) -> None:
+        while True:
+            try:
+                procesados = await self.procesar_lote()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"[email] error en despachador: {exc}")
+                procesados = 0
+            # Si el lote vino lleno probablemente hay más pendientes: seguir sin esperar
+            if procesados >= settings.DESPACHO_LOTE:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._despertar.wait(), timeout=settings.DESPACHO_INTERVALO_SEG
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._despertar.clear()
+
+    async def _reclamar_lote(self) -> List[Correo]:
+        """
+        Toma un lote de pendientes y les corre el proximo_intento (lease): si el
+        proceso muere a mitad del envío, vuelven a estar disponibles al vencer.
+        """
+        ahora = datetime.utcnow()
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            candidatos = (
+                select(Correo.id)
+                .where(
+                    Correo.estado == EstadoCorreo.PENDIENTE,
+                    Correo.proximo_intento <= ahora,
+                )
+                .order_by(Correo.id)
+                .limit(settings.DESPACHO_LOTE)
+                .with_for_update(skip_locked=True)
+            )
+            lote = (await db.exec(
+                update(Correo)
+                .where(Correo.id.in_(candidatos.scalar_subquery()))
+                .values(proximo_intento=ahora + timedelta(seconds=settings.DESPACHO_LEASE_SEG))
+                .returning(Correo)
+            )).scalars().all()
+            await db.commit()
+            return list(lote)
+
+    @staticmethod
+    def _enviar(conexion: SMTPConnection, correos: List[Correo]) -> dict:
+        """Corre en un hilo: envía los correos por una conexión"""
+        errores = {}
+        for correo in correos:
+            try:
+                conexion.send([correo.destinatario], correo.asunto, correo.cuerpo)
+            except Exception as exc:
+                errores[correo.id] = str(exc)[:500]
+                # Conexión posiblemente inválida: se recrea en el próximo envío
+                conexion.close()
+        return errores
+
+    async def _enviar_concurrente(self, lote: List[Correo]) -> dict:
+        """Reparte el lote entre las conexiones y las usa en paralelo"""
+        n = len(self._conexiones)
+        partes = [lote[i::n] for i in range(n)]
+        resultados = await asyncio.gather(*[
+            asyncio.to_thread(self._enviar, conexion, parte)
+            for conexion, parte in zip(self._conexiones, partes)
+            if parte
+        ])
+        errores = {}
+        for resultado in resultados:
+            errores.update(resultado)
+        return errores
+
+    async def procesar_lote(self) -> int:
+        """Procesa un lote de la bandeja de salida. Retorna cuántos correos tomó."""
+        if not self._conexiones[0].configured:
+            return 0
+
+        lote = await self._reclamar_lote()
+        if not lote:
+            return 0
+
+        errores = await self._enviar_concurrente(lote)
+        ahora = datetime.utcnow()
+        enviados = [c for c in lote if c.id not in errores]
+
+        async with AsyncSession(async_engine) as db:
+            if enviados:
+                await db.execute(
+                    update(Correo)
+                    .where(Correo.id == _ids("enviados", [c.id for c in enviados]))
+                    .values(estado=EstadoCorreo.ENVIADO, fecha_envio=ahora, ultimo_error=None)
+                )
+                residentes = list({c.residente_id for c in enviados if c.residente_id})
+                if residentes:
+                    await db.execute(
+                        update(Residente)
+                        .where(Residente.id == _ids("residentes", residentes))
+                        .values(ultimo_correo_enviado=ahora)
+                    )
+            for correo in lote:
+                if correo.id not in errores:
+                    continue
+                intentos = correo.intentos + 1
+                agotado = intentos >= settings.DESPACHO_MAX_INTENTOS
+                espera = settings.DESPACHO_BACKOFF_SEG * (2 ** (intentos - 1))
+                await db.execute(
+                    update(Correo)
+                    .where(Correo.id == correo.id)
+                    .values(
+                        intentos=intentos,
+                        ultimo_error=errores[correo.id],
+                        estado=EstadoCorreo.FALLIDO if agotado else EstadoCorreo.PENDIENTE,
+                        proximo_intento=ahora + timedelta(seconds=espera),
+                    )
+                )
+            await db.commit()
+
+        if errores:
+            print(f"[email] {len(errores)} de {len(lote)} correos fallaron: {set(errores.values())}")
+        return len(lote)
+
+
+despachador = DespachadorCorreos()
@@ -0,0 +1,148 @@
+"""
+Eventos en vivo (alertas y estado de pagos) con LISTEN/NOTIFY de PostgreSQL.
+
+Los endpoints que cambian una alerta o un pago agregan un pg_notify en su
+propia transacción (sentencia_notificar): PostgreSQL lo entrega solo si hay
+commit, y en el orden de los commits.
+
+La app mantiene UNA conexión asyncpg escuchando el canal y reparte cada
+evento en memoria a los suscriptores del condominio o del residente
+(endpoints SSE en api/v1/eventos.py). Miles de paneles abiertos cuestan una
+cola en memoria cada uno, no una consulta cada pocos segundos.
+
+El payload de NOTIFY tiene un límite de 8000 bytes: los eventos llevan ids y
+estados, no filas completas; el cliente vuelve a pedir lo que necesite.
+"""
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import text
+
+from app.core.config import settings
+
+CANAL = "eventos"
+MAX_IDS = 100  # ids por evento (el resto se informa en "cantidad")
+
+
+def sentencia_notificar(evento: str, **datos):
+    """
+    pg_notify para ejecutar en la sesión del llamador (sync o async):
+        await db.execute(sentencia_notificar("pago", residente_id=1, ...))
+    Se enruta por condominio_id y residente_id (si vienen en los datos).
+    """
+    ids = datos.pop("ids", None)
+    if ids is not None:
+        datos["cantidad"] = len(ids)
+        datos["ids"] = ids[:MAX_IDS]
+    return text("SELECT pg_notify(:canal, :payload)").bindparams(
+        canal=CANAL, payload=json.dumps({"evento": evento, **datos}, default=str)
+    )
+
+
+def _dsn() -> str:
+    # asyncpg directo (sin el dialecto de SQLAlchemy)
+    return settings.async_database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+class CentralEventos:
+
+    def __init__(self):
+        self._tarea: Optional[asyncio.Task] = None
+        self._suscriptores: Dict[Tuple[str, int], Set[asyncio.Queue]] = defaultdict(set)
+        # evento -> funciones llamadas con cada evento recibido (p. ej. invalidar caches)
+        self._oyentes: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+        self._conectado = False
+        self._recibidos = 0
+        self._descartados = 0
+
+    def iniciar(self) -> None:
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    async def _bucle(self) -> None:
+        espera = 1.0
+        while True:
+            conexion = None
+            try:
+                conexion = await asyncpg.connect(_dsn())
+                perdida = asyncio.Event()
+                conexion.add_termination_listener(lambda _: perdida.set())
+                await conexion.add_listener(CANAL, self._recibir)
+                self._conectado = True
+                espera = 1.0
+                await perdida.wait()
+                print("[eventos] se perdió la conexión LISTEN, reconectando")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"[eventos] error en conexión LISTEN: {exc}")
+            finally:
+                self._conectado = False
+                if conexion is not None and not conexion.is_closed():
+                    await conexion.close()
+            # Los eventos emitidos mientras no hay conexión se pierden: el
+            # cliente SSE se reconecta y recarga su estado
+            await asyncio.sleep(espera)
+            espera = min(espera * 2, 30.0)
+
+    def _recibir(self, conexion, pid, canal, payload) -> None:
+        try:
+            datos = json.loads(payload)
+        except ValueError:
+            return
+        self._recibidos += 1
+        for oyente in self._oyentes.get(datos.get("evento"), ()):
+            try:
+                oyente(datos)
+            except Exception as exc:
+                print(f"[eventos] error en oyente de {datos.get('evento')}: {exc}")
+        for clave in (("condominio", datos.get("condominio_id")), ("residente", datos.get("residente_id"))):
+            if clave[1] is None:
+                continue
+            for cola in self._suscriptores.get(clave, ()):
+                try:
+                    cola.put_nowait(datos)
+                except asyncio.QueueFull:
+                    # Cliente lento: se descarta en vez de acumular memoria
+                    self._descartados += 1
+
+    def al_recibir(self, evento: str, oyente: Callable[[dict], None]) -> None:
+        """Registra una función que se llama (en el event loop) con cada evento de ese tipo"""
+        self._oyentes[evento].append(oyente)
+
+    @asynccontextmanager
+    async def suscribir(self, tipo: str, id: int):
+        """Cola con los eventos del condominio o residente mientras dure el bloque"""
+        clave = (tipo, id)
+        cola: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTOS_COLA_MAX)
+        self._suscriptores[clave].add(cola)
+        try:
+            yield cola
+        finally:
+            self._suscriptores[clave].discard(cola)
+            if not self._suscriptores[clave]:
+                del self._suscriptores[clave]
+
+    def estadisticas(self) -> dict:
+        return {
+            "conectado": self._conectado,
+            "suscriptores": sum(len(colas) for colas in self._suscriptores.values()),
+            "recibidos": self._recibidos,
+            "descartados": self._descartados,
+        }
+
+
+central_eventos = CentralEventos()
@@ -0,0 +1,91 @@
+"""
+Detalle de los gastos comunes (tabla gasto_comun_items).
+
+Antes el detalle vivía en GastoComun.observaciones, una lista JSON que cada
+reserva copiaba, extendía y reescribía completa. Ahora cada cargo o abono es
+una fila; para no romper a los clientes la API sigue entregando
+`observaciones` con el mismo formato, armado al leer con una sola consulta
+por página de gastos.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List
+
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.gasto_comun import GastoComun
+from app.models.gasto_comun_item import GastoComunItem
+from app.schemas.gasto_comun import GastoComunLeer
+
+# Claves de una observación que se guardan en columnas propias
+CLAVES_ITEM = ("fecha", "tipo", "descripcion", "monto", "reserva_id")
+
+
+def item_desde_observacion(gasto_id: int, observacion: Dict) -> GastoComunItem:
+    """Convierte una observación en el formato JSON histórico a una fila"""
+    try:
+        monto = Decimal(str(observacion.get("monto") or 0))
+    except InvalidOperation:
+        monto = Decimal(0)
+    try:
+        fecha = date.fromisoformat(str(observacion.get("fecha"))[:10])
+    except ValueError:
+        fecha = date.today()
+    reserva_id = observacion.get("reserva_id")
+    datos = {k: v for k, v in observacion.items() if k not in CLAVES_ITEM}
+    return GastoComunItem(
+        gasto_comun_id=gasto_id,
+        reserva_id=reserva_id if isinstance(reserva_id, int) else None,
+        tipo=str(observacion.get("tipo") or "OTRO"),
+        descripcion=str(observacion.get("descripcion") or ""),
+        monto=monto,
+        fecha=fecha,
+        datos=datos or None,
+    )
+
+
+def observacion_de_item(item: GastoComunItem) -> Dict:
+    """Fila -> observación con el formato JSON histórico"""
+    observacion = {
+        "fecha": str(item.fecha),
+        "tipo": item.tipo,
+        "descripcion": item.descripcion,
+        "monto": float(item.monto),
+    }
+    if item.reserva_id is not None:
+        observacion["reserva_id"] = item.reserva_id
+    if item.datos:
+        observacion.update(item.datos)
+    return observacion
+
+
+async def reemplazar_items(db: AsyncSession, gasto_id: int, observaciones: Iterable[Dict]) -> None:
+    """Reemplaza el detalle de un gasto (crear/editar con `observaciones`), sin commit"""
+    await db.execute(delete(GastoComunItem).where(GastoComunItem.gasto_comun_id == gasto_id))
+    for observacion in observaciones:
+        db.add(item_desde_observacion(gasto_id, observacion))
+
+
+async def con_observaciones(db: AsyncSession, gastos: List[GastoComun]) -> List[GastoComunLeer]:
+    """Gastos con su lista `observaciones` armada desde gasto_comun_items"""
+    por_gasto: Dict[int, List[Dict]] = defaultdict(list)
+    ids = [g.id for g in gastos]
+    if ids:
+        items = (await db.exec(
+            select(GastoComunItem)
+            .where(GastoComunItem.gasto_comun_id.in_(ids))
+            .order_by(GastoComunItem.gasto_comun_id, GastoComunItem.id)
+        )).all()
+        for item in items:
+            por_gasto[item.gasto_comun_id].append(observacion_de_item(item))
+    return [
+        GastoComunLeer(**g.model_dump(), observaciones=por_gasto.get(g.id, []))
+        for g in gastos
+    ]
+
+
+async def un_gasto_con_observaciones(db: AsyncSession, gasto: GastoComun) -> GastoComunLeer:
+    return (await con_observaciones(db, [gasto]))[0]
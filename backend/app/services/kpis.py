@@ -0,0 +1,194 @@
+"""
+KPIs por condominio desde las vistas materializadas de models/kpi.py.
+
+Refresco:
+- cada KPIS_REFRESCO_SEG, si la última actualización (kpi_actualizacion) es
+  más antigua que ese intervalo: con varios workers de la app refresca el
+  primero que despierta y los demás ven las vistas al día y se saltan la pasada,
+- al terminar un proceso masivo (generar-periodo, procesar-atrasos), que llama
+  a refresco_kpis.solicitar(),
+- a mano o desde cron: python scripts/refrescar_kpis.py
+
+REFRESH ... CONCURRENTLY recalcula la vista aparte y aplica solo las filas que
+cambiaron: las lecturas del endpoint no se bloquean mientras tanto. Cada vista
+se refresca en su propia transacción.
+"""
+import asyncio
+import time
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.kpi import KPI_ACTUALIZACION, KPI_GASTOS, KPI_MULTAS, KPI_PAGOS, KPI_RESERVAS, VISTAS_KPI
+from app.models.multa import TipoMulta
+from app.models.pago import TipoPago
+from app.services.particiones import inicio_mes, sumar_meses
+
+
+def ultima_actualizacion(conn: Connection) -> Optional[datetime]:
+    return conn.execute(text(f"SELECT fecha FROM {KPI_ACTUALIZACION.nombre}")).scalar()
+
+
+def refrescar_vistas(motor: Engine) -> Dict[str, float]:
+    """Refresca todas las vistas (kpi_actualizacion al final). Retorna los segundos por vista."""
+    duraciones = {}
+    for vista in VISTAS_KPI:
+        t0 = time.perf_counter()
+        with motor.begin() as conn:
+            # Con mucha historia el refresco puede pasar el statement_timeout de la API
+            conn.execute(text("SET LOCAL statement_timeout = 0"))
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {vista.nombre}"))
+        duraciones[vista.nombre] = round(time.perf_counter() - t0, 3)
+    return duraciones
+
+
+def _meses(desde: date, hasta: date):
+    mes = inicio_mes(desde)
+    while mes <= hasta:
+        yield mes
+        mes = sumar_meses(mes, 1)
+
+
+def _tasa(parte, total) -> Optional[float]:
+    return round(parte / total, 4) if total else None
+
+
+async def kpis_condominio(db: AsyncSession, condominio_id: int, desde: date, hasta: date) -> dict:
+    """Recaudación, morosidad, multas y uso de espacios por mes entre desde y hasta"""
+    rango = {"condominio_id": condominio_id, "desde": inicio_mes(desde), "hasta": hasta}
+    filtro = "condominio_id = :condominio_id AND mes BETWEEN :desde AND :hasta"
+
+    meses = {
+        mes: {
+            "mes": mes.strftime("%Y-%m"),
+            "facturado": 0, "recaudado_gastos": 0, "recaudado_total": 0,
+            "recaudado_por_tipo": {tipo.value: 0 for tipo in TipoPago},
+            "emitidos": 0, "pagados": 0, "morosos": 0, "monto_moroso": 0,
+        }
+        for mes in _meses(desde, hasta)
+    }
+
+    gastos = await db.execute(text(f"""
+        SELECT mes, emitidos, facturado, pagados, morosos, monto_moroso
+        FROM {KPI_GASTOS.nombre} WHERE {filtro}
+    """), rango)
+    for mes, emitidos, facturado, pagados, morosos, monto_moroso in gastos:
+        meses[mes].update(
+            emitidos=emitidos, facturado=facturado, pagados=pagados,
+            morosos=morosos, monto_moroso=monto_moroso,
+        )
+
+    pagos = await db.execute(text(f"SELECT mes, tipo, recaudado FROM {KPI_PAGOS.nombre} WHERE {filtro}"), rango)
+    for mes, tipo, recaudado in pagos:
+        fila = meses[mes]
+        fila["recaudado_por_tipo"][tipo] = recaudado
+        fila["recaudado_total"] += recaudado
+        if tipo == TipoPago.GASTO_COMUN.value:
+            fila["recaudado_gastos"] = recaudado
+
+    multas = {tipo.value: {"tipo": tipo.value, "cantidad": 0, "monto": 0, "monto_pendiente": 0} for tipo in TipoMulta}
+    filas = await db.execute(text(f"""
+        SELECT tipo, sum(cantidad), sum(monto), sum(monto_pendiente)
+        FROM {KPI_MULTAS.nombre} WHERE {filtro}
+        GROUP BY tipo
+    """), rango)
+    for tipo, cantidad, monto, pendiente in filas:
+        multas[tipo].update(cantidad=cantidad, monto=monto, monto_pendiente=pendiente)
+
+    # Espacios sin reservas en el rango también aparecen (con 0 horas)
+    espacios = await db.execute(text(f"""
+        SELECT e.id, e.nombre, coalesce(sum(k.reservas), 0), coalesce(sum(k.horas), 0)
+        FROM espacios_comunes e
+        LEFT JOIN {KPI_RESERVAS.nombre} k
+               ON k.espacio_comun_id = e.id AND k.mes BETWEEN :desde AND :hasta
+        WHERE e.condominio_id = :condominio_id
+        GROUP BY e.id, e.nombre
+        ORDER BY e.id
+    """), rango)
+
+    actualizado = (await db.execute(text(f"SELECT fecha FROM {KPI_ACTUALIZACION.nombre}"))).scalar()
+
+    for fila in meses.values():
+        fila["tasa_morosidad"] = _tasa(fila["morosos"], fila["emitidos"])
+    totales = {
+        campo: sum(fila[campo] for fila in meses.values())
+        for campo in ("facturado", "recaudado_gastos", "recaudado_total", "emitidos", "pagados", "morosos", "monto_moroso")
+    }
+    totales["tasa_morosidad"] = _tasa(totales["morosos"], totales["emitidos"])
+
+    return {
+        "condominio_id": condominio_id,
+        "desde": desde,
+        "hasta": hasta,
+        "actualizado": actualizado,
+        "meses": list(meses.values()),
+        "totales": totales,
+        "multas": list(multas.values()),
+        "espacios": [
+            {"espacio_comun_id": id, "nombre": nombre, "reservas": reservas, "horas": round(float(horas), 2)}
+            for id, nombre, reservas, horas in espacios
+        ],
+    }
+
+
+class RefrescoKpis:
+    """Refresca las vistas de KPIs cada KPIS_REFRESCO_SEG o cuando se pide con solicitar()"""
+
+    def __init__(self):
+        self._tarea: Optional[asyncio.Task] = None
+        self._pedido = asyncio.Event()
+
+    def iniciar(self) -> None:
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    def solicitar(self) -> None:
+        """Refresco lo antes posible (después de un proceso masivo ya confirmado)"""
+        self._pedido.set()
+
+    @staticmethod
+    def _pasada(forzar: bool) -> Optional[Dict[str, float]]:
+        if not forzar:
+            with engine.connect() as conn:
+                # Margen del 10%: el timer de este worker no calza exacto con el último refresco
+                vencidas = conn.execute(text(f"""
+                    SELECT fecha < (now() AT TIME ZONE 'UTC') - make_interval(secs => :seg)
+                    FROM {KPI_ACTUALIZACION.nombre}
+                """), {"seg": settings.KPIS_REFRESCO_SEG * 0.9}).scalar()
+            if not vencidas:
+                return None
+        return refrescar_vistas(engine)
+
+    async def _bucle(self) -> None:
+        while True:
+            forzar = self._pedido.is_set()
+            self._pedido.clear()
+            try:
+                duraciones = await asyncio.to_thread(self._pasada, forzar)
+                if duraciones:
+                    print(f"[kpis] vistas refrescadas en {sum(duraciones.values()):.2f} s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"[kpis] error al refrescar vistas: {exc}")
+            try:
+                await asyncio.wait_for(self._pedido.wait(), timeout=settings.KPIS_REFRESCO_SEG)
+            except asyncio.TimeoutError:
+                pass
+
+
+refresco_kpis = RefrescoKpis()
@@ -0,0 +1,171 @@
+"""
+Particiones mensuales de la bitácora (tabla registros, RANGE sobre fecha_creacion).
+
+Cada mes vive en su propia tabla registros_AAAA_MM, así:
+- los INSERT siempre caen en la partición del mes (índices chicos y calientes),
+- las lecturas por rango de fechas o por cursor solo tocan las particiones
+  necesarias (partition pruning),
+- la retención es desacoplar una partición entera en vez de un DELETE masivo.
+
+La mantención (al iniciar la app y cada PARTICIONES_INTERVALO_SEG):
+- crea por adelantado las particiones del mes actual y de los
+  REGISTROS_MESES_ADELANTE siguientes; si la partición DEFAULT ya tiene filas
+  de ese mes, se mueven a la nueva partición antes de adjuntarla,
+- solo si se configuró REGISTROS_RETENCION_MESES > 0 (por defecto 0, sin
+  límite): desacopla (DETACH) las particiones más antiguas que esa cantidad de
+  meses. La tabla desacoplada queda en la base como archivo (fuera de la API)
+  para respaldarla o eliminarla.
+
+Uso manual (p. ej. desde cron):
+    python scripts/mantener_particiones.py
+"""
+import asyncio
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.registro import PARTICION_DEFAULT
+
+TABLA = "registros"
+_NOMBRE = re.compile(rf"^{TABLA}_(\d{{4}})_(\d{{2}})$")
+
+
+def inicio_mes(fecha: date) -> date:
+    return fecha.replace(day=1)
+
+
+def sumar_meses(mes: date, meses: int) -> date:
+    total = mes.year * 12 + (mes.month - 1) + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(mes: date) -> str:
+    return f"{TABLA}_{mes:%Y_%m}"
+
+
+def particiones(conn: Connection) -> List[date]:
+    """Meses con partición adjunta a registros (sin contar la DEFAULT), en orden"""
+    nombres = conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:tabla AS regclass)
+    """), {"tabla": TABLA}).scalars()
+    meses = []
+    for nombre in nombres:
+        m = _NOMBRE.match(nombre)
+        if m:
+            meses.append(date(int(m.group(1)), int(m.group(2)), 1))
+    return sorted(meses)
+
+
+def crear_particion(conn: Connection, mes: date) -> Optional[int]:
+    """
+    Crea y adjunta la partición del mes. Retorna las filas movidas desde la
+    DEFAULT, o None si ya existía una tabla con ese nombre (adjunta o archivada).
+    """
+    nombre = nombre_particion(mes)
+    if conn.execute(text("SELECT to_regclass(:nombre)"), {"nombre": nombre}).scalar():
+        return None
+    desde, hasta = mes, sumar_meses(mes, 1)
+    rango = {"desde": desde, "hasta": hasta}
+    conn.execute(text(f"CREATE TABLE {nombre} (LIKE {TABLA})"))
+    # ATTACH falla si la DEFAULT tiene filas del rango: se mueven primero
+    movidas = conn.execute(text(f"""
+        WITH movidas AS (
+            DELETE FROM {PARTICION_DEFAULT}
+            WHERE fecha_creacion >= :desde AND fecha_creacion < :hasta
+            RETURNING *
+        )
+        INSERT INTO {nombre} SELECT * FROM movidas
+    """), rango).rowcount
+    conn.execute(text(
+        f"ALTER TABLE {TABLA} ATTACH PARTITION {nombre} "
+        f"FOR VALUES FROM ('{desde.isoformat()}') TO ('{hasta.isoformat()}')"
+    ))
+    return movidas
+
+
+def asegurar_particiones(conn: Connection, desde: date, hasta: date) -> List[str]:
+    """Crea las particiones que falten entre los meses desde y hasta (inclusive)"""
+    creadas = []
+    mes = inicio_mes(desde)
+    while mes <= hasta:
+        movidas = crear_particion(conn, mes)
+        if movidas is not None:
+            creadas.append(nombre_particion(mes))
+            if movidas:
+                print(f"[particiones] {movidas} filas movidas de {PARTICION_DEFAULT} a {nombre_particion(mes)}")
+        mes = sumar_meses(mes, 1)
+    return creadas
+
+
+def desacoplar_antiguas(conn: Connection, limite: date) -> List[str]:
+    """Desacopla las particiones cuyo mes termina en o antes de `limite`"""
+    desacopladas = []
+    for mes in particiones(conn):
+        if sumar_meses(mes, 1) <= limite:
+            nombre = nombre_particion(mes)
+            conn.execute(text(f"ALTER TABLE {TABLA} DETACH PARTITION {nombre}"))
+            desacopladas.append(nombre)
+    return desacopladas
+
+
+def mantener_particiones(conn: Connection, hoy: Optional[date] = None) -> dict:
+    """Una pasada de mantención. El commit queda para el llamador."""
+    mes_actual = inicio_mes(hoy or date.today())
+    # Un solo proceso a la vez (varios workers de la app corren la misma mantención)
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('particiones_registros'))"))
+    creadas = asegurar_particiones(
+        conn, mes_actual, sumar_meses(mes_actual, settings.REGISTROS_MESES_ADELANTE)
+    )
+    desacopladas = []
+    if settings.REGISTROS_RETENCION_MESES > 0:
+        desacopladas = desacoplar_antiguas(
+            conn, sumar_meses(mes_actual, -settings.REGISTROS_RETENCION_MESES)
+        )
+    return {"creadas": creadas, "desacopladas": desacopladas}
+
+
+class MantenedorParticiones:
+    """Corre mantener_particiones al iniciar y luego cada PARTICIONES_INTERVALO_SEG"""
+
+    def __init__(self):
+        self._tarea: Optional[asyncio.Task] = None
+
+    def iniciar(self) -> None:
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    @staticmethod
+    def _pasada() -> dict:
+        with engine.begin() as conn:
+            return mantener_particiones(conn)
+
+    async def _bucle(self) -> None:
+        while True:
+            try:
+                resultado = await asyncio.to_thread(self._pasada)
+                if resultado["creadas"] or resultado["desacopladas"]:
+                    print(f"[particiones] {resultado}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"[particiones] error en mantención: {exc}")
+            await asyncio.sleep(settings.PARTICIONES_INTERVALO_SEG)
+
+
+mantenedor_particiones = MantenedorParticiones()
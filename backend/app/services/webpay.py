@@ -0,0 +1,160 @@
+"""
+Cliente async para la API REST de Webpay Plus (Transbank).
+
+Reemplaza las llamadas síncronas de transbank-sdk (Transaction.create/commit),
+que bloqueaban el event loop durante todo el round trip a Webpay. Usa un
+httpx.AsyncClient compartido (keep-alive entre requests) con timeouts de
+conexión/lectura y un circuit breaker: tras WEBPAY_CB_FALLOS errores seguidos
+deja de llamar a Webpay por WEBPAY_CB_ENFRIAMIENTO_SEG y responde de inmediato.
+
+Para pruebas offline / de carga apuntar WEBPAY_BASE_URL al servidor falso:
+    python scripts/fake_webpay.py --port 8090
+    WEBPAY_BASE_URL=http://localhost:8090 uvicorn app.main:app
+"""
+import time
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+WEBPAY_ENDPOINT = "/rswebpaytransaction/api/webpay/v1.3/transactions"
+
+
+class WebpayError(Exception):
+    """Error de Webpay (respuesta con error o falla de red)"""
+
+    def __init__(self, mensaje: str, status_code: Optional[int] = None):
+        super().__init__(mensaje)
+        self.status_code = status_code
+
+
+class WebpayNoDisponible(WebpayError):
+    """El circuit breaker está abierto: no se intenta la llamada"""
+
+
+class CircuitBreaker:
+    """
+    Cerrado: deja pasar. Abierto: rechaza hasta que pase el enfriamiento.
+    Semi-abierto: deja pasar una sola llamada de prueba (las demás se rechazan
+    mientras está en curso); si falla vuelve a abrir, si resulta se cierra.
+    """
+
+    def __init__(self, umbral_fallos: int, enfriamiento_seg: float):
+        self.umbral_fallos = umbral_fallos
+        self.enfriamiento_seg = enfriamiento_seg
+        self.fallos = 0
+        self.abierto_desde: Optional[float] = None
+        self.prueba_en_curso = False
+
+    @property
+    def estado(self) -> str:
+        if self.abierto_desde is None:
+            return "cerrado"
+        if time.monotonic() - self.abierto_desde >= self.enfriamiento_seg:
+            return "semi-abierto"
+        return "abierto"
+
+    def verificar(self) -> None:
+        estado = self.estado
+        if estado == "abierto" or (estado == "semi-abierto" and self.prueba_en_curso):
+            raise WebpayNoDisponible("Webpay no disponible temporalmente", 503)
+        if estado == "semi-abierto":
+            self.prueba_en_curso = True
+
+    def liberar_prueba(self) -> None:
+        """La llamada de prueba terminó sin veredicto (p. ej. cancelada)"""
+        self.prueba_en_curso = False
+
+    def registrar_exito(self) -> None:
+        self.fallos = 0
+        self.abierto_desde = None
+        self.prueba_en_curso = False
+
+    def registrar_fallo(self) -> None:
+        self.prueba_en_curso = False
+        self.fallos += 1
+        if self.fallos >= self.umbral_fallos or self.abierto_desde is not None:
+            # En semi-abierto un solo fallo reinicia el enfriamiento
+            self.abierto_desde = time.monotonic()
+
+
+class WebpayClient:
+
+    def __init__(self):
+        self._cliente: Optional[httpx.AsyncClient] = None
+        self.breaker = CircuitBreaker(
+            settings.WEBPAY_CB_FALLOS, settings.WEBPAY_CB_ENFRIAMIENTO_SEG
+        )
+
+    @property
+    def cliente(self) -> httpx.AsyncClient:
+        # Se crea perezosamente para quedar ligado al event loop de la app
+        if self._cliente is None:
+            self._cliente = httpx.AsyncClient(
+                base_url=settings.WEBPAY_BASE_URL,
+                headers={
+                    "Tbk-Api-Key-Id": settings.WEBPAY_COMMERCE_CODE,
+                    "Tbk-Api-Key-Secret": settings.WEBPAY_API_KEY,
+                    "Content-Type": "application/json",
+                },
+                timeout=httpx.Timeout(
+                    settings.WEBPAY_READ_TIMEOUT_SEG,
+                    connect=settings.WEBPAY_CONNECT_TIMEOUT_SEG,
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.WEBPAY_MAX_CONEXIONES,
+                    max_keepalive_connections=settings.WEBPAY_MAX_CONEXIONES,
+                ),
+            )
+        return self._cliente
+
+    async def cerrar(self) -> None:
+        if self._cliente is not None:
+            await self._cliente.aclose()
+            self._cliente = None
+
+    async def _request(self, metodo: str, ruta: str, json: Optional[dict] = None) -> dict:
+        self.breaker.verificar()
+        try:
+            respuesta = await self.cliente.request(metodo, WEBPAY_ENDPOINT + ruta, json=json)
+        except httpx.HTTPError as exc:
+            self.breaker.registrar_fallo()
+            raise WebpayError(f"Error de comunicación con Webpay: {exc!r}")
+        finally:
+            # Si el request se canceló no hubo veredicto: otra llamada puede probar
+            self.breaker.liberar_prueba()
+
+        if respuesta.status_code >= 500:
+            self.breaker.registrar_fallo()
+        else:
+            # Un 4xx es un error del request, no de disponibilidad de Webpay
+            self.breaker.registrar_exito()
+
+        if not respuesta.is_success:
+            try:
+                mensaje = respuesta.json().get("error_message", respuesta.text)
+            except ValueError:
+                mensaje = respuesta.text
+            raise WebpayError(mensaje, respuesta.status_code)
+        return respuesta.json()
+
+    async def crear(self, buy_order: str, session_id: str, amount: int, return_url: str) -> dict:
+        """Equivalente a Transaction.create: retorna {"token", "url"}"""
+        return await self._request("POST", "", {
+            "buy_order": buy_order,
+            "session_id": session_id,
+            "amount": amount,
+            "return_url": return_url,
+        })
+
+    async def confirmar(self, token: str) -> dict:
+        """Equivalente a Transaction.commit"""
+        return await self._request("PUT", f"/{token}")
+
+    async def estado(self, token: str) -> dict:
+        """Equivalente a Transaction.status"""
+        return await self._request("GET", f"/{token}")
+
+
+webpay = WebpayClient()
@@ -1,7 +1,73 @@
 ﻿import os
 import smtplib
 from email.message import EmailMessage
-from typing import List
+from typing import List, Optional
+
+
+def smtp_config() -> dict:
+    """Configuración SMTP desde variables de entorno"""
+    user = os.getenv("SMTP_USER")
+    return {
+        "host": os.getenv("SMTP_HOST"),
+        "port": os.getenv("SMTP_PORT"),
+        "user": user,
+        "password": os.getenv("SMTP_PASSWORD"),
+        "from_address": os.getenv("SMTP_FROM") or user or "no-reply@example.com",
+        "use_starttls": os.getenv("SMTP_STARTTLS", "true").lower() == "true",
+    }
+
+
+def build_message(from_address: str, to_addresses: List[str], subject: str, body: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = from_address
+    msg["To"] = ",".join(to_addresses)
+    msg.set_content(body)
+    return msg
+
+
+class SMTPConnection:
+    """
+    Conexión SMTP reutilizable: hace STARTTLS y login una sola vez y la
+    mantiene abierta entre envíos. Reconecta si el servidor la cerró.
+    No es thread-safe: cada hilo/worker debe usar su propia instancia.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = config or smtp_config()
+        self._server: Optional[smtplib.SMTP] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.config["host"] and self.config["port"])
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.config["host"], int(self.config["port"]), timeout=30)
+        if self.config["use_starttls"]:
+            server.starttls()
+        if self.config["user"] and self.config["password"]:
+            server.login(self.config["user"], self.config["password"])
+        return server
+
+    def send(self, to_addresses: List[str], subject: str, body: str) -> None:
+        """Envía un mensaje; lanza excepción si falla (el llamador decide reintentar)"""
+        msg = build_message(self.config["from_address"], to_addresses, subject, body)
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # La conexión se cerró por inactividad: reconectar una vez
+            self._server = self._connect()
+            self._server.send_message(msg)
+
+    def close(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
 
 
 def send_email(to_addresses: List[str], subject: str, body: str) -> bool:
@@ -9,32 +75,17 @@ def send_email(to_addresses: List[str], subject: str, body: str) -> bool:
     if not to_addresses:
         return False
 
-    host = os.getenv("SMTP_HOST")
-    port = os.getenv("SMTP_PORT")
-    user = os.getenv("SMTP_USER")
-    password = os.getenv("SMTP_PASSWORD")
-    from_address = os.getenv("SMTP_FROM") or user or "no-reply@example.com"
-    use_starttls = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
-
-    if not host or not port:
+    config = smtp_config()
+    if not config["host"] or not config["port"]:
         print(f"[email] SMTP config missing; skipping send to {to_addresses} - subject: {subject}")
         return False
 
+    conexion = SMTPConnection(config)
     try:
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = from_address
-        msg["To"] = ",".join(to_addresses)
-        msg.set_content(body)
-
-        with smtplib.SMTP(host, int(port)) as server:
-            if use_starttls:
-                server.starttls()
-            if user and password:
-                server.login(user, password)
-            server.send_message(msg)
-
+        conexion.send(to_addresses, subject, body)
         return True
     except Exception as exc:  # pragma: no cover - best-effort logging
         print(f"[email] failed to send to {to_addresses}: {exc}")
         return False
+    finally:
+        conexion.close()
@@ -0,0 +1,82 @@
+"""
+Benchmark de login: throughput de POST /auth/login con varios clientes en
+paralelo y, al mismo tiempo, la latencia de GET /health para ver cuánto se
+frena el resto del worker mientras se verifican contraseñas.
+
+Uso (con la API corriendo):
+    python scripts/benchmark_login.py --url http://localhost:8000 --total 200 --concurrencia 20
+
+Comparar HASH_PROCESOS=0 vs HASH_PROCESOS=4, o distintos BCRYPT_ROUNDS.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def _percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))], 1)
+
+
+async def _logins(cliente, args, latencias, errores):
+    cola = asyncio.Queue()
+    for _ in range(args.total):
+        cola.put_nowait(None)
+
+    async def trabajador():
+        while not cola.empty():
+            cola.get_nowait()
+            inicio = time.perf_counter()
+            r = await cliente.post("/api/v1/auth/login", json={"email": args.email, "password": args.password})
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if r.status_code != 200:
+                errores.append(r.status_code)
+
+    await asyncio.gather(*(trabajador() for _ in range(args.concurrencia)))
+
+
+async def _sondear_health(cliente, detener, latencias):
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await cliente.get("/health")
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        await asyncio.sleep(0.05)
+
+
+async def main(args):
+    limites = httpx.Limits(max_connections=args.concurrencia + 1)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limites) as cliente:
+        # Calentamiento: pool de hash y conexiones a la BD
+        await cliente.post("/api/v1/auth/login", json={"email": args.email, "password": args.password})
+
+        latencias_login, latencias_health, errores = [], [], []
+        detener = asyncio.Event()
+        sonda = asyncio.create_task(_sondear_health(cliente, detener, latencias_health))
+        inicio = time.perf_counter()
+        await _logins(cliente, args, latencias_login, errores)
+        duracion = time.perf_counter() - inicio
+        detener.set()
+        await sonda
+
+    print(f"Logins:        {args.total} en {duracion:.2f} s ({args.total / duracion:.1f} logins/s), errores: {len(errores)}")
+    print(f"Latencia login  p50={_percentil(latencias_login, 0.5)} ms  p95={_percentil(latencias_login, 0.95)} ms")
+    print(
+        f"Latencia /health p50={_percentil(latencias_health, 0.5)} ms  p95={_percentil(latencias_health, 0.95)} ms  "
+        f"max={round(max(latencias_health), 1) if latencias_health else None} ms  "
+        f"(media {round(statistics.mean(latencias_health), 1) if latencias_health else None} ms, n={len(latencias_health)})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de POST /auth/login")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@lospinos.cl")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--total", type=int, default=200, help="logins a realizar")
+    parser.add_argument("--concurrencia", type=int, default=20, help="clientes en paralelo")
+    asyncio.run(main(parser.parse_args()))
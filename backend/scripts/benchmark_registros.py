@@ -0,0 +1,117 @@
+"""
+Benchmark de la bitácora particionada: llena `registros` con muchos meses de
+historia y mide lo que debe mantenerse plano al crecer la tabla:
+- la primera página y una página profunda (cursor en el mes más antiguo) con
+  la misma query keyset que arma GET /registros/,
+- cuántas particiones toca cada página (EXPLAIN, después de la poda),
+- la latencia de un INSERT suelto, como los de ajustar/revertir.
+
+Uso (con la base migrada):
+    python scripts/benchmark_registros.py --meses 24 --filas-por-mes 50000
+    python scripts/benchmark_registros.py --limpiar   # borra las filas del benchmark
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text
+from sqlmodel import select
+
+from app.api.pagination import Paginacion, codificar_cursor
+from app.core.config import settings
+from app.models.registro import RegistroModel, TipoEvento
+from app.services.particiones import asegurar_particiones, inicio_mes, sumar_meses
+
+DETALLE = "benchmark_registros"
+
+
+def _pagina(conn, cursor=None):
+    query = Paginacion(cursor=cursor, limit=100).aplicar(
+        select(RegistroModel), RegistroModel.fecha_creacion, RegistroModel.id, descendente=True
+    )
+    sql = str(query.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    t0 = time.perf_counter()
+    conn.execute(text(sql)).all()
+    ms = (time.perf_counter() - t0) * 1000
+    plan = conn.execute(text("EXPLAIN (FORMAT JSON) " + sql)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    particiones = set()
+    pendientes = [plan[0]["Plan"]]
+    while pendientes:
+        nodo = pendientes.pop()
+        if "Relation Name" in nodo:
+            particiones.add(nodo["Relation Name"])
+        pendientes.extend(nodo.get("Plans", []))
+    return round(ms, 1), len(particiones)
+
+
+def main(args) -> int:
+    engine = create_engine(settings.DATABASE_URL, echo=False)
+    if args.limpiar:
+        with engine.begin() as conn:
+            borradas = conn.execute(text("DELETE FROM registros WHERE detalle = :d"), {"d": DETALLE}).rowcount
+        print(f"{borradas} filas del benchmark eliminadas")
+        return 0
+
+    mes_actual = inicio_mes(date.today())
+    primero = sumar_meses(mes_actual, -(args.meses - 1))
+    with engine.begin() as conn:
+        usuario_id = conn.execute(text("SELECT min(id) FROM usuarios")).scalar()
+        asegurar_particiones(conn, primero, mes_actual)
+
+    t0 = time.perf_counter()
+    mes = primero
+    while mes <= mes_actual:
+        with engine.begin() as conn:
+            # Filas repartidas a lo largo del mes (un INSERT ... SELECT por mes)
+            conn.execute(text("""
+                INSERT INTO registros (usuario_id, tipo_evento, detalle, fecha_creacion)
+                SELECT :usuario, 'OTRO', :detalle,
+                       CAST(:desde AS timestamp) + (g * (CAST(:hasta AS timestamp) - CAST(:desde AS timestamp)) / (:n + 1))
+                FROM generate_series(1, :n) g
+            """), {"usuario": usuario_id, "detalle": DETALLE, "desde": mes,
+                   "hasta": min(sumar_meses(mes, 1), date.today()), "n": args.filas_por_mes})
+        mes = sumar_meses(mes, 1)
+    print(f"Carga: {args.meses * args.filas_por_mes} filas en {time.perf_counter() - t0:.1f} s")
+
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE registros"))
+        total = conn.execute(text("SELECT count(*) FROM registros")).scalar()
+        # Cursor a mitad del mes más antiguo: la página más profunda
+        profundo = codificar_cursor([datetime.combine(primero, datetime.min.time()) + timedelta(days=15), 0])
+        primera = min((_pagina(conn) for _ in range(5)), key=lambda r: r[0])
+        ultima = min((_pagina(conn, profundo) for _ in range(5)), key=lambda r: r[0])
+
+    latencias = []
+    with engine.connect() as conn:
+        for _ in range(args.inserts):
+            t0 = time.perf_counter()
+            with conn.begin():
+                conn.execute(insert(RegistroModel.__table__).values(
+                    usuario_id=usuario_id, tipo_evento=TipoEvento.OTRO, detalle=DETALLE,
+                    fecha_creacion=datetime.utcnow(),
+                ))
+            latencias.append((time.perf_counter() - t0) * 1000)
+    latencias.sort()
+
+    print(f"Filas en registros: {total}")
+    print(f"Primera página:  {primera[0]} ms, {primera[1]} particiones")
+    print(f"Página profunda: {ultima[0]} ms, {ultima[1]} particiones")
+    print(f"INSERT suelto:   p50 {latencias[len(latencias) // 2]:.2f} ms, "
+          f"p95 {latencias[int(len(latencias) * 0.95)]:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--meses", type=int, default=24)
+    parser.add_argument("--filas-por-mes", type=int, default=50000)
+    parser.add_argument("--inserts", type=int, default=200)
+    parser.add_argument("--limpiar", action="store_true")
+    sys.exit(main(parser.parse_args()))
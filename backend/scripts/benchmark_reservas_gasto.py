@@ -0,0 +1,102 @@
+"""
+Benchmark de contención al cobrar reservas: muchas reservas pagadas en
+paralelo del MISMO residente en el MISMO mes, todas cargando al mismo gasto
+común. Mide throughput y latencia y verifica que el gasto no haya perdido
+incrementos (monto_total y observaciones cuadran con las reservas creadas).
+
+Uso (con la API corriendo):
+    python scripts/benchmark_reservas_gasto.py --url http://localhost:8000 --residente 2 --espacio 2 --reservas 40
+
+Sale con código 1 si el gasto común no cuadra.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import httpx
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))], 1) if ordenados else None
+
+
+async def main(args):
+    # Un mes futuro al azar, para partir sin gasto común en ese periodo
+    hoy = date.today()
+    anio = hoy.year + random.randint(2, 20)
+    mes = random.randint(1, 12)
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=120) as cliente:
+        r = await cliente.post("/api/v1/auth/login", json={"email": args.email, "password": args.password})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        # Bloques de una hora que no se traslapan: 14 por día desde las 08:00
+        bloques = []
+        for i in range(args.reservas):
+            inicio = datetime(anio, mes, 1 + i // 14, 8 + i % 14)
+            bloques.append((inicio, inicio + timedelta(hours=1)))
+
+        latencias = []
+
+        async def reservar(inicio, fin):
+            t0 = time.perf_counter()
+            r = await cliente.post("/api/v1/reservas", headers=headers, json={
+                "residente_id": args.residente,
+                "espacio_comun_id": args.espacio,
+                "fecha_inicio": inicio.isoformat(),
+                "fecha_fin": fin.isoformat(),
+                "cantidad_personas": 2,
+            })
+            latencias.append((time.perf_counter() - t0) * 1000)
+            return r
+
+        t0 = time.perf_counter()
+        respuestas = await asyncio.gather(*(reservar(i, f) for i, f in bloques))
+        duracion = time.perf_counter() - t0
+
+        creadas = [r.json() for r in respuestas if r.status_code == 201]
+        esperado = sum(Decimal(str(x["monto_pago"])) for x in creadas)
+        print(f"Periodo {mes}/{anio}: {args.reservas} reservas en paralelo en {duracion:.2f} s "
+              f"({args.reservas / duracion:.1f} reservas/s), respuestas {dict(Counter(r.status_code for r in respuestas))}")
+        print(f"Latencia p50={_percentil(latencias, 0.5)} ms  p95={_percentil(latencias, 0.95)} ms")
+
+        r = await cliente.get("/api/v1/gastos-comunes", headers=headers, params={
+            "residente_id": args.residente, "limit": 100,
+        })
+        r.raise_for_status()
+        gasto = next((g for g in r.json() if g["mes"] == mes and g["anio"] == anio), None)
+        while gasto is None and r.headers.get("x-next-cursor"):
+            r = await cliente.get("/api/v1/gastos-comunes", headers=headers, params={
+                "residente_id": args.residente, "limit": 100, "cursor": r.headers["x-next-cursor"],
+            })
+            gasto = next((g for g in r.json() if g["mes"] == mes and g["anio"] == anio), None)
+
+    if gasto is None:
+        print("FALLA: no se encontró el gasto común del periodo")
+        sys.exit(1)
+    monto = Decimal(str(gasto["monto_total"]))
+    observaciones = [o for o in gasto["observaciones"] if o.get("tipo") == "RESERVA"]
+    print(f"Gasto común {gasto['id']}: monto_total={monto} (esperado {esperado}), "
+          f"observaciones de reserva={len(observaciones)} (esperado {len(creadas)})")
+    if monto != esperado or len(observaciones) != len(creadas):
+        print("FALLA: se perdieron incrementos del gasto común")
+        sys.exit(1)
+    print("OK: el gasto común cuadra con las reservas creadas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Contención de reservas pagadas sobre un mismo gasto común")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@lospinos.cl")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--residente", type=int, default=2, help="residente_id que paga las reservas")
+    parser.add_argument("--espacio", type=int, default=2, help="espacio_comun_id con costo_por_hora")
+    parser.add_argument("--reservas", type=int, default=40, help="reservas en paralelo (máx. 14 por día del mes)")
+    asyncio.run(main(parser.parse_args()))
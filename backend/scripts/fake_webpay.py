@@ -0,0 +1,114 @@
+"""
+Servidor falso de Webpay Plus para probar el flujo de pago sin salir a internet
+(desarrollo offline y pruebas de carga).
+
+Implementa los endpoints que usa app.services.webpay (crear, confirmar y
+estado de una transacción) y la página de pago, que redirige de inmediato al
+return_url con el token_ws como hace Webpay al aprobar.
+
+Uso:
+    python scripts/fake_webpay.py --port 8090 [--latencia-ms 200] [--tasa-error 0.1] [--tasa-rechazo 0.1]
+    WEBPAY_BASE_URL=http://localhost:8090 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, RedirectResponse
+
+WEBPAY_ENDPOINT = "/rswebpaytransaction/api/webpay/v1.3/transactions"
+
+app = FastAPI(title="Webpay falso")
+config = {"latencia_ms": 0, "tasa_error": 0.0, "tasa_rechazo": 0.0}
+transacciones = {}
+
+
+async def _simular_red(request: Request):
+    if not request.headers.get("Tbk-Api-Key-Id") or not request.headers.get("Tbk-Api-Key-Secret"):
+        raise HTTPException(status_code=401, detail={"error_message": "Not Authorized"})
+    if config["latencia_ms"]:
+        await asyncio.sleep(config["latencia_ms"] / 1000)
+    if random.random() < config["tasa_error"]:
+        raise HTTPException(status_code=503, detail={"error_message": "Servicio no disponible (simulado)"})
+
+
+@app.post(WEBPAY_ENDPOINT)
+async def crear(request: Request):
+    await _simular_red(request)
+    datos = await request.json()
+    token = uuid.uuid4().hex + uuid.uuid4().hex[:8]
+    transacciones[token] = {**datos, "estado": "INITIALIZED"}
+    return {"token": token, "url": str(request.base_url).rstrip("/") + "/webpayserver/initTransaction"}
+
+
+def _detalle(token: str, tx: dict) -> dict:
+    autorizada = tx["estado"] == "AUTHORIZED"
+    return {
+        "vci": "TSY" if autorizada else "TSN",
+        "amount": tx["amount"],
+        "status": tx["estado"],
+        "buy_order": tx["buy_order"],
+        "session_id": tx["session_id"],
+        "card_detail": {"card_number": "6623"},
+        "accounting_date": datetime.now().strftime("%m%d"),
+        "transaction_date": datetime.utcnow().isoformat() + "Z",
+        "authorization_code": "1213" if autorizada else "000000",
+        "payment_type_code": "VN",
+        "response_code": 0 if autorizada else -1,
+        "installments_number": 0,
+    }
+
+
+@app.put(WEBPAY_ENDPOINT + "/{token}")
+async def confirmar(token: str, request: Request):
+    await _simular_red(request)
+    tx = transacciones.get(token)
+    if tx is None:
+        raise HTTPException(status_code=422, detail={"error_message": "Invalid value for parameter: token"})
+    if tx["estado"] != "INITIALIZED":
+        raise HTTPException(status_code=422, detail={"error_message": "Transaction already locked by another process"})
+    tx["estado"] = "FAILED" if random.random() < config["tasa_rechazo"] else "AUTHORIZED"
+    return _detalle(token, tx)
+
+
+@app.get(WEBPAY_ENDPOINT + "/{token}")
+async def estado(token: str, request: Request):
+    await _simular_red(request)
+    tx = transacciones.get(token)
+    if tx is None:
+        raise HTTPException(status_code=422, detail={"error_message": "Invalid value for parameter: token"})
+    return _detalle(token, tx)
+
+
+@app.api_route("/webpayserver/initTransaction", methods=["GET", "POST"])
+async def formulario_pago(request: Request):
+    """Simula que el usuario paga en Webpay y vuelve al comercio"""
+    token = request.query_params.get("token_ws") or (await request.form()).get("token_ws")
+    tx = transacciones.get(token)
+    if tx is None:
+        raise HTTPException(status_code=404, detail="Token desconocido")
+    separador = "&" if "?" in tx["return_url"] else "?"
+    return RedirectResponse(f"{tx['return_url']}{separador}token_ws={token}", status_code=303)
+
+
+# Los errores se devuelven con el mismo formato que Webpay: {"error_message": ...}
+@app.exception_handler(HTTPException)
+async def _error_webpay(request: Request, exc: HTTPException):
+    cuerpo = exc.detail if isinstance(exc.detail, dict) else {"error_message": exc.detail}
+    return JSONResponse(cuerpo, status_code=exc.status_code)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor falso de Webpay Plus")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latencia-ms", type=int, default=0, help="latencia agregada a cada llamada")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="fracción de llamadas que responden 503")
+    parser.add_argument("--tasa-rechazo", type=float, default=0.0, help="fracción de pagos rechazados")
+    args = parser.parse_args()
+    config.update(latencia_ms=args.latencia_ms, tasa_error=args.tasa_error, tasa_rechazo=args.tasa_rechazo)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
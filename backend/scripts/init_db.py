@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Script de inicialización de base de datos
-Crea las tablas y carga datos de ejemplo, incluyendo un usuario residente completo para pruebas.
+Aplica las migraciones (alembic upgrade head) y carga datos de ejemplo, incluyendo un usuario residente completo para pruebas.
 """
 import sys
 import os
@@ -11,9 +11,15 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from sqlmodel import Session, create_engine, SQLModel, select
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlmodel import Session, create_engine, select
 from app.core.config import settings
 from app.core.security import get_password_hash
+from app.services.cuenta import SQL_ABRIR_CUENTAS
+from app.services.kpis import refrescar_vistas
+from app.services.particiones import mantener_particiones
 from app.models import (
     Usuario, RolUsuario,
     Condominio,
@@ -23,7 +29,9 @@ from app.models import (
     EspacioComun, TipoEspacioComun,
     Reserva, EstadoReserva,
     Pago, TipoPago, MetodoPago, EstadoPago,
-    Anuncio
+    Anuncio,
+    Correo,
+    MovimientoCuenta
 )
 
 
@@ -38,9 +46,14 @@ def init_database(force_recreate=False):
     # Crear engine
     engine = create_engine(settings.DATABASE_URL, echo=False)
     
-    print("\n1. Creando tablas...")
-    SQLModel.metadata.create_all(engine)
-    print("   Tablas creadas")
+    print("\n1. Aplicando migraciones...")
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(backend, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend, "alembic"))
+    command.upgrade(config, "head")
+    with engine.begin() as conn:
+        mantener_particiones(conn)
+    print("   Esquema al día")
     
     with Session(engine) as session:
         # Verificar si ya hay datos
@@ -66,7 +79,7 @@ def init_database(force_recreate=False):
             
             print("\n2. Limpiando datos existentes...")
             # Orden importante por Foreign Keys
-            for model in [Pago, Reserva, Multa, GastoComun, Anuncio, EspacioComun, Residente, Usuario, Condominio]:
+            for model in [MovimientoCuenta, Correo, Pago, Reserva, Multa, GastoComun, Anuncio, EspacioComun, Residente, Usuario, Condominio]:
                 session.exec(select(model)).all()
                 session.query(model).delete()
             session.commit()
@@ -224,8 +237,7 @@ def init_database(force_recreate=False):
             estado=EstadoGastoComun.PAGADO,
             fecha_emision=hoy - timedelta(days=35),
             fecha_vencimiento=hoy - timedelta(days=5),
-            fecha_pago=datetime.utcnow() - timedelta(days=10),
-            observaciones=[]
+            fecha_pago=datetime.utcnow() - timedelta(days=10)
         )
         session.add(gasto_pagado)
         session.commit() # Commit para obtener ID del gasto
@@ -244,8 +256,7 @@ def init_database(force_recreate=False):
             monto_total=Decimal("97000"),
             estado=EstadoGastoComun.PENDIENTE,
             fecha_emision=hoy - timedelta(days=2),
-            fecha_vencimiento=hoy + timedelta(days=28),
-            observaciones=[]
+            fecha_vencimiento=hoy + timedelta(days=28)
         )
         session.add(gasto_pendiente)
         session.commit()
@@ -324,6 +335,14 @@ def init_database(force_recreate=False):
         session.add(anuncio)
         session.commit()
 
+        # --- 10. Cuenta corriente: saldo inicial desde gastos y multas ---
+        session.execute(text(SQL_ABRIR_CUENTAS))
+        session.commit()
+        print("   ✓ Cuentas corrientes abiertas")
+
+    # Las vistas de KPIs se crearon con las migraciones, antes de los datos
+    refrescar_vistas(engine)
+
     print("\n" + "=" * 60)
     print("✓ SEED COMPLETADO - DATOS DE PRUEBA LISTOS")
     print("=" * 60)
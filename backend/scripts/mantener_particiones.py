@@ -0,0 +1,40 @@
+"""
+Mantención manual de las particiones mensuales de la bitácora (registros):
+crea las particiones por adelantado y, si REGISTROS_RETENCION_MESES > 0
+(retención opcional, por defecto desactivada), desacopla las más antiguas.
+La app hace lo mismo al iniciar y cada
+PARTICIONES_INTERVALO_SEG; este script sirve para cron o para revisar el estado.
+
+Uso:
+    python scripts/mantener_particiones.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.models.registro import PARTICION_DEFAULT
+from app.services.particiones import mantener_particiones, nombre_particion, particiones
+
+
+def main() -> int:
+    engine = create_engine(settings.DATABASE_URL, echo=False)
+    with engine.begin() as conn:
+        resultado = mantener_particiones(conn)
+    print(f"Creadas: {', '.join(resultado['creadas']) or '-'}")
+    print(f"Desacopladas: {', '.join(resultado['desacopladas']) or '-'}")
+
+    with engine.connect() as conn:
+        meses = particiones(conn)
+        en_default = conn.execute(text(f"SELECT count(*) FROM {PARTICION_DEFAULT}")).scalar()
+    if meses:
+        print(f"\n{len(meses)} particiones: {nombre_particion(meses[0])} .. {nombre_particion(meses[-1])}")
+    print(f"Filas en {PARTICION_DEFAULT}: {en_default}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Prueba de concurrencia de reservas: lanza muchas reservas en paralelo sobre el
+mismo espacio con horarios que se traslapan y verifica que la API acepte solo
+reservas compatibles entre sí (el resto debe responder 409).
+
+Uso (con la API corriendo):
+    python scripts/prueba_reservas_concurrentes.py --url http://localhost:8000 --espacio 1 --intentos 30
+
+Sale con código 1 si quedan reservas traslapadas o si hay respuestas inesperadas.
+"""
+import argparse
+import asyncio
+import random
+import sys
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+import httpx
+
+
+async def _login(cliente, email, password):
+    r = await cliente.post("/api/v1/auth/login", json={"email": email, "password": password})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def main(args):
+    fecha = args.fecha or (date.today() + timedelta(days=random.randint(100, 300)))
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as cliente:
+        headers = await _login(cliente, args.email, args.password)
+
+        # Bloques de 1 a 3 horas que empiezan cada 30 minutos entre 10:00 y 14:00:
+        # muchos se traslapan entre sí
+        solicitudes = []
+        for _ in range(args.intentos):
+            inicio = datetime.combine(fecha, time(10)) + timedelta(minutes=30 * random.randint(0, 8))
+            fin = inicio + timedelta(hours=random.randint(1, 3))
+            solicitudes.append((inicio, fin))
+
+        async def reservar(inicio, fin):
+            r = await cliente.post("/api/v1/reservas", headers=headers, json={
+                "residente_id": args.residente,
+                "espacio_comun_id": args.espacio,
+                "fecha_inicio": inicio.isoformat(),
+                "fecha_fin": fin.isoformat(),
+                "cantidad_personas": 2,
+                "es_evento_comunidad": True,
+            })
+            return r.status_code
+
+        codigos = await asyncio.gather(*(reservar(i, f) for i, f in solicitudes))
+        print(f"Fecha {fecha}, {args.intentos} intentos en paralelo: {dict(Counter(codigos))}")
+
+        r = await cliente.get("/api/v1/reservas", headers=headers, params={
+            "espacio_comun_id": args.espacio, "desde": str(fecha), "hasta": str(fecha), "limit": 500,
+        })
+        r.raise_for_status()
+        vigentes = [
+            (datetime.combine(fecha, time.fromisoformat(x["hora_inicio"])),
+             datetime.combine(fecha, time.fromisoformat(x["hora_fin"])), x["id"])
+            for x in r.json() if x["estado"] != "CANCELADA"
+        ]
+        vigentes.sort()
+        traslapes = [
+            (a[2], b[2]) for a, b in zip(vigentes, vigentes[1:]) if b[0] < a[1]
+        ]
+        for inicio, fin, reserva_id in vigentes:
+            print(f"  reserva {reserva_id}: {inicio.time()} - {fin.time()}")
+
+        r = await cliente.get(f"/api/v1/espacios-comunes/{args.espacio}/horarios-libres", params={
+            "desde": str(fecha), "duracion_minima": 30,
+        })
+        r.raise_for_status()
+        print("Horarios libres:", ", ".join(f"{x['inicio'][11:16]}-{x['fin'][11:16]}" for x in r.json()))
+
+    inesperados = [c for c in codigos if c not in (201, 409)]
+    if traslapes or inesperados or codigos.count(201) != len(vigentes):
+        print(f"FALLA: traslapes={traslapes} respuestas inesperadas={inesperados}")
+        sys.exit(1)
+    print("OK: ninguna reserva aceptada se traslapa")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reservas concurrentes sobre un mismo espacio")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@lospinos.cl")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--espacio", type=int, default=1, help="espacio_comun_id")
+    parser.add_argument("--residente", type=int, default=1, help="residente_id de las reservas")
+    parser.add_argument("--intentos", type=int, default=30, help="reservas lanzadas en paralelo")
+    parser.add_argument("--fecha", type=date.fromisoformat, default=None, help="YYYY-MM-DD (por defecto, una fecha futura al azar)")
+    asyncio.run(main(parser.parse_args()))
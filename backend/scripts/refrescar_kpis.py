@@ -0,0 +1,38 @@
+"""
+Refresco manual de las vistas materializadas de KPIs (GET /condominios/{id}/kpis).
+La app las refresca cada KPIS_REFRESCO_SEG y después de generar-periodo y
+procesar-atrasos; este script sirve para cron o después de cargas masivas
+hechas fuera de la API.
+
+Uso:
+    python scripts/refrescar_kpis.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.models.kpi import VISTAS_KPI
+from app.services.kpis import refrescar_vistas, ultima_actualizacion
+
+
+def main() -> int:
+    engine = create_engine(settings.DATABASE_URL, echo=False)
+    with engine.connect() as conn:
+        print(f"Última actualización: {ultima_actualizacion(conn)}")
+
+    duraciones = refrescar_vistas(engine)
+
+    with engine.connect() as conn:
+        for vista in VISTAS_KPI:
+            filas = conn.execute(text(f"SELECT count(*) FROM {vista.nombre}")).scalar()
+            print(f"{vista.nombre:24} {filas:8} filas  {duraciones[vista.nombre]:.3f} s")
+        print(f"Actualizado: {ultima_actualizacion(conn)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Verificación de índices: corre EXPLAIN sobre las consultas frecuentes de la API
+y falla si alguna recorre su tabla completa (Seq Scan).
+
+Con los datos de ejemplo las tablas son tan chicas que PostgreSQL preferiría
+un Seq Scan aunque exista el índice, así que se desactiva con
+enable_seqscan = off: si aun así el plan tiene un Seq Scan sobre la tabla, es
+que ningún índice sirve para esa consulta.
+
+Uso (con la base migrada, p. ej. después de scripts/init_db.py):
+    python scripts/verificar_indices.py
+
+La misma revisión corre como prueba en tests/test_indices.py (make test).
+
+También revisa que existan en la base todos los índices declarados en los
+modelos: create_all solo los crea en una base nueva, así que un índice
+agregado a un modelo sin su migración falta en las bases actualizadas.
+
+Sale con código 1 si alguna consulta cae en Seq Scan o falta algún índice.
+"""
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import cast, create_engine, func, literal, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, select
+
+from app.core.config import settings
+from app.models import (
+    Alerta, EstadoAlerta,
+    GastoComun, EstadoGastoComun,
+    GastoComunItem,
+    MovimientoCuenta,
+    Multa, EstadoMulta,
+    Pago, TipoPago,
+    RegistroModel,
+    Reserva,
+    Residente,
+)
+
+hoy = date.today()
+
+# (nombre, tabla que no debe recorrerse completa, consulta) con la forma que usa la API
+CONSULTAS = [
+    ("confirmar pago Webpay (transbank)", "pagos",
+     select(Pago).where(Pago.numero_transaccion == "ORD11700000000")),
+    ("¿concepto ya tiene pago? (sincronización)", "pagos",
+     select(Pago.id).where(Pago.tipo == TipoPago.MULTA, Pago.referencia_id == 1)),
+    ("gasto común del periodo (cobro de reservas)", "gastos_comunes",
+     select(GastoComun).where(GastoComun.residente_id == 1, GastoComun.mes == hoy.month, GastoComun.anio == hoy.year)),
+    ("gastos pendientes vencidos (procesar_atrasos)", "gastos_comunes",
+     select(GastoComun.id).where(
+         GastoComun.estado == EstadoGastoComun.PENDIENTE, GastoComun.fecha_vencimiento < hoy
+     )),
+    ("multas pendientes de un residente", "multas",
+     select(Multa).where(Multa.residente_id == 1, Multa.estado == EstadoMulta.PENDIENTE)),
+    ("reservas de un espacio por fecha", "reservas",
+     select(Reserva).where(
+         Reserva.espacio_comun_id == 1,
+         Reserva.fecha_reserva >= hoy,
+         Reserva.fecha_reserva <= hoy + timedelta(days=31),
+     )),
+    ("residente de un usuario", "residentes",
+     select(Residente).where(Residente.usuario_id == 1)),
+    ("alertas pendientes, más recientes primero", "alerta",
+     select(Alerta).where(Alerta.estado == EstadoAlerta.PENDIENTE)
+     .order_by(Alerta.fecha_creacion.desc(), Alerta.id.desc()).limit(101)),
+    ("resumen de alertas pendientes de un condominio", "alerta",
+     select(Alerta.tipo, func.count(), func.sum(Alerta.ocurrencias))
+     .where(Alerta.estado == EstadoAlerta.PENDIENTE, Alerta.condominio_id == 1)
+     .group_by(Alerta.tipo)),
+    ("bitácora de un condominio", "registros",
+     select(RegistroModel).where(RegistroModel.condominio_id == 1)
+     .order_by(RegistroModel.fecha_creacion.desc(), RegistroModel.id.desc()).limit(101)),
+    ("ajustes de una multa (datos_adicionales @>)", "registros",
+     select(RegistroModel).where(
+         # (el dict como literal: EXPLAIN se arma con literal_binds)
+         RegistroModel.datos_adicionales.contains(
+             cast(literal(json.dumps({"tipo_objeto": "MULTA", "multa_id": 1})), JSONB)
+         )
+     )),
+    ("detalle de una página de gastos", "gasto_comun_items",
+     select(GastoComunItem).where(GastoComunItem.gasto_comun_id.in_([1, 2, 3]))
+     .order_by(GastoComunItem.gasto_comun_id, GastoComunItem.id)),
+    ("cartola de un residente", "movimientos_cuenta",
+     select(MovimientoCuenta).where(MovimientoCuenta.residente_id == 1)
+     .order_by(MovimientoCuenta.id).limit(101)),
+]
+
+
+def _nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from _nodos(hijo)
+
+
+def _relaciones(conn, tabla: str) -> set:
+    """La tabla y, si está particionada (registros), todas sus particiones:
+    en el plan el Seq Scan aparece con el nombre de la partición"""
+    particiones = conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:tabla AS regclass)
+    """), {"tabla": tabla}).scalars()
+    return {tabla, *particiones}
+
+
+def indices_faltantes(conn) -> list:
+    """Índices de los modelos (Index e index=True) que no existen en la base"""
+    existentes = set(conn.execute(text("SELECT indexname FROM pg_indexes WHERE schemaname = 'public'")).scalars())
+    return sorted(
+        (tabla.name, indice.name)
+        for tabla in SQLModel.metadata.tables.values()
+        for indice in tabla.indexes
+        if indice.name not in existentes
+    )
+
+
+def revisar_consultas(conn) -> list:
+    """
+    EXPLAIN de cada consulta de CONSULTAS. Retorna (nombre, relaciones con
+    Seq Scan, índices usados) por consulta. Deja enable_seqscan = off en la
+    transacción de `conn`.
+    """
+    tablas = sorted({tabla for _, tabla, _ in CONSULTAS})
+    conn.execute(text(f"ANALYZE {', '.join(tablas)}"))
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    relaciones = {tabla: _relaciones(conn, tabla) for tabla in tablas}
+    resultados = []
+    for nombre, tabla, consulta in CONSULTAS:
+        sql = str(consulta.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+        plan = conn.execute(text("EXPLAIN (FORMAT JSON) " + sql)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodos = list(_nodos(plan[0]["Plan"]))
+        seq = sorted(
+            n["Relation Name"] for n in nodos
+            if n["Node Type"] == "Seq Scan" and n.get("Relation Name") in relaciones[tabla]
+        )
+        indices = sorted({n["Index Name"] for n in nodos if "Index Name" in n})
+        resultados.append((nombre, seq, indices))
+    return resultados
+
+
+def main() -> int:
+    engine = create_engine(settings.DATABASE_URL, echo=False)
+    fallas = 0
+    with engine.connect() as conn:
+        for nombre, seq, indices in revisar_consultas(conn):
+            if seq:
+                fallas += 1
+                print(f"FALLA  {nombre}: Seq Scan sobre {', '.join(seq)}")
+            else:
+                print(f"OK     {nombre}: {', '.join(indices) or '(sin índice)'}")
+        faltantes = indices_faltantes(conn)
+    print(f"\n{len(CONSULTAS) - fallas}/{len(CONSULTAS)} consultas usan índice")
+    for tabla, nombre in faltantes:
+        print(f"FALTA  {nombre} (declarado en el modelo de {tabla}, sin migración aplicada)")
+    return 1 if fallas or faltantes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Fixtures de las pruebas de integración: necesitan PostgreSQL con el esquema
+migrado (alembic upgrade head o scripts/init_db.py) en DATABASE_URL.
+
+Si DATABASE_URL no está definida, el servidor no responde o la base no tiene
+las tablas, las pruebas se saltan. Cada prueba corre dentro de una transacción
+que se revierte al terminar (los commit de los endpoints solo liberan un
+savepoint), así que no dejan datos en la base.
+"""
+import os
+from datetime import date
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_async_db
+from app.core.config import settings
+from app.models import Condominio, Residente, RolUsuario, Usuario
+
+
+@pytest.fixture(scope="session")
+def motor():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL no definida")
+    motor = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        with motor.connect() as conn:
+            migrada = conn.execute(text("SELECT to_regclass('residentes')")).scalar()
+    except DBAPIError as exc:
+        pytest.skip(f"PostgreSQL no disponible: {exc.orig}")
+    if migrada is None:
+        pytest.skip("La base no tiene el esquema (alembic upgrade head)")
+    yield motor
+    motor.dispose()
+
+
+@pytest.fixture
+def conn(motor):
+    """Conexión sync dentro de una transacción que se revierte"""
+    with motor.connect() as conn:
+        transaccion = conn.begin()
+        try:
+            yield conn
+        finally:
+            transaccion.rollback()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(motor):
+    """AsyncSession dentro de una transacción que se revierte"""
+    motor_async = create_async_engine(settings.async_database_url, poolclass=NullPool)
+    async with motor_async.connect() as conexion:
+        transaccion = await conexion.begin()
+        async with AsyncSession(
+            bind=conexion, join_transaction_mode="create_savepoint", expire_on_commit=False
+        ) as sesion:
+            yield sesion
+        await transaccion.rollback()
+    await motor_async.dispose()
+
+
+@pytest.fixture
+async def cliente(db):
+    """Cliente HTTP de la API usando la sesión de la prueba"""
+    from app.main import app
+
+    async def db_de_prueba():
+        yield db
+
+    app.dependency_overrides[get_async_db] = db_de_prueba
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as cliente:
+            yield cliente
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+
+
+def datos_base(residentes: int = 2):
+    """Condominio, usuario administrador y residentes sin guardar (agregar en ese orden)"""
+    sufijo = os.urandom(4).hex()
+    condominio = Condominio(nombre=f"Prueba {sufijo}", direccion="Calle 1", total_viviendas=residentes)
+    usuario = Usuario(
+        email=f"admin-{sufijo}@prueba.cl", nombre="Admin", apellido="Prueba",
+        password_hash="-", rol=RolUsuario.ADMINISTRADOR,
+    )
+    lista = [
+        Residente(
+            vivienda_numero=str(i + 1), nombre=f"Residente {i + 1}", apellido="Prueba",
+            rut=f"{sufijo}-{i}", email=f"residente{i}-{sufijo}@prueba.cl",
+            es_propietario=True, fecha_ingreso=date.today(), saldo=Decimal(0),
+        )
+        for i in range(residentes)
+    ]
+    return condominio, usuario, lista
+
+
+def sembrar(conn, residentes: int = 2):
+    """Inserta datos_base en la transacción de una conexión sync"""
+    condominio, usuario, lista = datos_base(residentes)
+    with Session(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False) as sesion:
+        sesion.add(condominio)
+        sesion.add(usuario)
+        sesion.flush()
+        for residente in lista:
+            residente.condominio_id = condominio.id
+            sesion.add(residente)
+        sesion.commit()
+    return condominio, usuario, lista
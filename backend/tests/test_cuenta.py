@@ -0,0 +1,103 @@
+"""
+Cuenta corriente: las ediciones que cambian el residente de un cargo mueven
+la deuda de una cuenta a la otra.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlmodel import select
+
+from app.models import EstadoMulta, GastoComun, Multa, TipoMulta
+from app.models.movimiento_cuenta import OrigenMovimiento
+from app.services.cuenta import registrar_movimiento
+from tests.conftest import datos_base
+
+pytestmark = pytest.mark.anyio
+
+
+async def _sembrar(db):
+    condominio, usuario, residentes = datos_base(residentes=2)
+    db.add(condominio)
+    db.add(usuario)
+    await db.flush()
+    for residente in residentes:
+        residente.condominio_id = condominio.id
+        db.add(residente)
+    await db.commit()
+    return condominio, usuario, residentes
+
+
+async def _saldos(db, *residentes):
+    saldos = []
+    for residente in residentes:
+        await db.refresh(residente)
+        saldos.append(residente.saldo)
+    return saldos
+
+
+async def test_mover_multa_de_residente_mueve_la_deuda(db, cliente):
+    condominio, usuario, (a, b) = await _sembrar(db)
+    respuesta = await cliente.post("/api/v1/multas", json={
+        "residente_id": a.id, "condominio_id": condominio.id, "tipo": TipoMulta.RUIDO.value,
+        "descripcion": "Ruido", "monto": 10000, "creado_por": usuario.id,
+    })
+    assert respuesta.status_code == 201, respuesta.text
+    assert await _saldos(db, a, b) == [Decimal(10000), Decimal(0)]
+
+    respuesta = await cliente.put(f"/api/v1/multas/{respuesta.json()['id']}", json={"residente_id": b.id})
+    assert respuesta.status_code == 200, respuesta.text
+    assert await _saldos(db, a, b) == [Decimal(0), Decimal(10000)]
+
+
+async def test_mover_gasto_de_residente_mueve_la_deuda(db, cliente):
+    condominio, usuario, (a, b) = await _sembrar(db)
+    hoy = date.today()
+    gasto = GastoComun(
+        residente_id=a.id, condominio_id=condominio.id, mes=hoy.month, anio=hoy.year,
+        monto_base=Decimal(50000), servicios=Decimal(0), monto_total=Decimal(50000),
+        fecha_vencimiento=hoy + timedelta(days=5),
+    )
+    db.add(gasto)
+    await db.flush()
+    await registrar_movimiento(db, a.id, Decimal(50000), OrigenMovimiento.GASTO_COMUN, gasto.id, "Gasto")
+    await db.commit()
+
+    respuesta = await cliente.put(f"/api/v1/gastos-comunes/{gasto.id}", json={
+        "residente_id": b.id, "condominio_id": condominio.id, "mes": hoy.month, "anio": hoy.year,
+        "monto_base": 60000, "servicios": 0, "monto_total": 60000,
+        "fecha_vencimiento": str(gasto.fecha_vencimiento),
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    assert await _saldos(db, a, b) == [Decimal(0), Decimal(60000)]
+
+
+async def test_eliminar_gasto_devuelve_la_deuda_de_sus_multas(db, cliente):
+    condominio, usuario, (a, b) = await _sembrar(db)
+    hoy = date.today()
+    # Multa de un mes anterior al cobrado: igual entra al gasto del periodo
+    multa = Multa(
+        residente_id=a.id, condominio_id=condominio.id, tipo=TipoMulta.RUIDO, descripcion="Ruido",
+        monto=Decimal(7000), fecha_emision=hoy - timedelta(days=40), creado_por=usuario.id,
+    )
+    db.add(multa)
+    await db.flush()
+    await registrar_movimiento(db, a.id, Decimal(7000), OrigenMovimiento.MULTA, multa.id, "Multa")
+    await db.commit()
+
+    respuesta = await cliente.post("/api/v1/gastos-comunes/generar-periodo", json={
+        "condominio_id": condominio.id, "mes": hoy.month, "anio": hoy.year, "monto_base": 50000,
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["multas_incluidas"] == 1
+    await db.refresh(multa)
+    assert multa.estado == EstadoMulta.FACTURADA
+    assert await _saldos(db, a, b) == [Decimal(57000), Decimal(50000)]
+
+    gasto = (await db.exec(select(GastoComun).where(GastoComun.residente_id == a.id))).one()
+    assert gasto.monto_total == Decimal(57000)
+    respuesta = await cliente.delete(f"/api/v1/gastos-comunes/{gasto.id}")
+    assert respuesta.status_code == 204, respuesta.text
+    await db.refresh(multa)
+    assert multa.estado == EstadoMulta.PENDIENTE
+    assert await _saldos(db, a, b) == [Decimal(7000), Decimal(50000)]
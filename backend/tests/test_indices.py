@@ -0,0 +1,40 @@
+"""
+Regresión de índices: las consultas frecuentes de la API no deben recorrer su
+tabla completa (Seq Scan). Misma revisión que scripts/verificar_indices.py,
+sobre unas pocas filas sembradas en la transacción de la prueba.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlmodel import Session
+
+from app.models import GastoComun, Multa, TipoMulta
+from scripts.verificar_indices import indices_faltantes, revisar_consultas
+from tests.conftest import sembrar
+
+
+def _sembrar_cargos(conn):
+    condominio, usuario, residentes = sembrar(conn, residentes=3)
+    hoy = date.today()
+    with Session(bind=conn, join_transaction_mode="create_savepoint") as sesion:
+        for residente in residentes:
+            sesion.add(GastoComun(
+                residente_id=residente.id, condominio_id=condominio.id, mes=hoy.month, anio=hoy.year,
+                monto_base=Decimal(50000), servicios=Decimal(0), monto_total=Decimal(50000),
+                fecha_vencimiento=hoy + timedelta(days=5),
+            ))
+            sesion.add(Multa(
+                residente_id=residente.id, condominio_id=condominio.id, tipo=TipoMulta.RUIDO,
+                descripcion="Ruido", monto=Decimal(5000), creado_por=usuario.id,
+            ))
+        sesion.commit()
+
+
+def test_consultas_frecuentes_usan_indice(conn):
+    _sembrar_cargos(conn)
+    con_seq_scan = {nombre: seq for nombre, seq, _ in revisar_consultas(conn) if seq}
+    assert con_seq_scan == {}
+
+
+def test_indices_de_los_modelos_existen(conn):
+    assert indices_faltantes(conn) == []
@@ -0,0 +1,44 @@
+"""
+Listados paginados por cursor: las pantallas con "Cargar más" piden las
+multas más recientes primero y siguen el cursor de X-Next-Cursor.
+"""
+from decimal import Decimal
+
+import pytest
+
+from app.models import Multa, TipoMulta
+from tests.conftest import datos_base
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_multas_mas_recientes_primero_por_cursor(db, cliente):
+    condominio, usuario, (residente,) = datos_base(residentes=1)
+    db.add(condominio)
+    db.add(usuario)
+    await db.flush()
+    residente.condominio_id = condominio.id
+    db.add(residente)
+    await db.flush()
+    multas = [
+        Multa(
+            residente_id=residente.id, condominio_id=condominio.id, tipo=TipoMulta.RUIDO,
+            descripcion=f"Ruido {i}", monto=Decimal(1000), creado_por=usuario.id,
+        )
+        for i in range(3)
+    ]
+    db.add_all(multas)
+    await db.commit()
+    esperado = sorted((m.id for m in multas), reverse=True)
+
+    vistos, cursor = [], None
+    while True:
+        params = {"condominio_id": condominio.id, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        respuesta = await cliente.get("/api/v1/multas", params=params)
+        assert respuesta.status_code == 200, respuesta.text
+        vistos += [m["id"] for m in respuesta.json()]
+        cursor = respuesta.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert vistos == esperado
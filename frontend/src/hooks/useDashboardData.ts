@@ -3,9 +3,9 @@ import { pagoService } from '../services/pagoService';
 import { gastoComunService } from '../services/gastoComunService';
 import { usuarioService } from '../services/usuarioService';
 import { reservaService } from '../services/reservaService';
-import { multaService } from '../services/multaService';
 import { anuncioService } from '../services/anuncioService';
 import { residenteService } from '../services/residenteService';
+import { condominioService, type KpisCondominio } from '../services/condominioService';
 import { authService } from '../services/authService';
 
 export interface HogarMoroso {
@@ -51,82 +51,62 @@ export const useDashboardData = () => {
           throw new Error("Usuario no autenticado");
         }
 
-        // Cargar datos en paralelo
-        const [pagos, gastos, usuarios, reservas, multas, anuncios, residentes] = await Promise.all([
-          pagoService.getAll({ condominio_id: user.condominioId }).catch(() => []),
-          gastoComunService.getAll().catch(() => []),
+        const condominioId = user.condominio_id || user.condominioId;
+        if (!condominioId) {
+          throw new Error("No se encontró el condominio del administrador.");
+        }
+
+        // Los totales del año salen de los KPIs del servidor; del resto solo
+        // se piden los registros acotados que se muestran (deudas, últimos
+        // pagos, reservas por confirmar, anuncios recientes)
+        const currentYear = new Date().getFullYear();
+        const [kpis, gastosImpagos, usuarios, reservasPendientes, pagos, anuncios, residentes] = await Promise.all([
+          condominioService.getKpis(condominioId, `${currentYear}-01-01`, `${currentYear}-12-31`).catch(() => null as KpisCondominio | null),
+          gastoComunService.getImpagosByCondominio(condominioId).catch(() => []),
           usuarioService.getAll().catch(() => []),
-          reservaService.getAll().catch(() => []),
-          multaService.getAll().catch(() => []),
-          anuncioService.getAll(0, 100).catch(() => []),
-          residenteService.getAll().catch(() => [])
+          reservaService.getAll({ condominio_id: condominioId, estado: 'PENDIENTE_PAGO' }).catch(() => []),
+          pagoService.getRecientes(condominioId, 5).catch(() => []),
+          anuncioService.getPagina(null, 3, true).then((p) => p.items).catch(() => []),
+          residenteService.getByCondominio(condominioId).catch(() => [])
         ]);
 
-        // Filtrar por condominio del usuario
-        const condominioId = user.condominio_id || user.condominioId;
-        const gastosCondo = gastos.filter((g: any) => g.condominio_id === condominioId);
         const usuariosCondo = usuarios.filter((u: any) => u.condominio_id === condominioId);
-        const multasCondo = multas.filter((m: any) => m.condominio_id === condominioId);
-        const anunciosCondo = anuncios.filter((a: any) => a.condominio_id === condominioId && a.activo === true);
+        const mesesKpi = kpis?.meses ?? [];
 
-        // 1. INGRESO TOTAL (Pagos aprobados)
-        const ingresoTotal = pagos
-          .filter((p: any) => p.estado_pago === 'APROBADO')
-          .reduce((acc: number, p: any) => acc + (Number(p.monto) || 0), 0);
+        // 1. INGRESO DEL AÑO (Pagos aprobados)
+        const ingresoTotal = Number(kpis?.totales.recaudado_total ?? 0);
 
         // 2. DEUDA TOTAL (Gastos pendientes/vencidos/morosos)
-        const estadosDeuda = ['PENDIENTE', 'VENCIDO', 'MOROSO'];
-        const deudaTotal = gastosCondo
-          .filter((g: any) => estadosDeuda.includes(g.estado))
+        const deudaTotal = gastosImpagos
           .reduce((acc: number, g: any) => acc + (Number(g.monto_total) || 0), 0);
 
-        // 3. ÍNDICE DE MOROSIDAD
-        const totalGastos = gastosCondo.length;
-        const gastosImpagos = gastosCondo.filter((g: any) => 
-          estadosDeuda.includes(g.estado)
-        ).length;
-        const morosidadPorcentaje = totalGastos > 0 
-          ? Math.round((gastosImpagos / totalGastos) * 100) 
-          : 0;
+        // 3. ÍNDICE DE MOROSIDAD (gastos vencidos o morosos sobre emitidos en el año)
+        const morosidadPorcentaje = Math.round(Number(kpis?.totales.tasa_morosidad ?? 0) * 100);
 
-        // 4. MULTAS REGISTRADAS (del condominio)
-        const multasRegistradas = multasCondo.length;
+        // 4. MULTAS REGISTRADAS (del condominio, en el año)
+        const multasRegistradas = (kpis?.multas ?? [])
+          .reduce((acc, m) => acc + Number(m.cantidad), 0);
 
-        // 5. INGRESOS POR RESERVAS
-        const ingresosReservas = reservas
-          .filter((r: any) => r.estado === 'CONFIRMADA' || r.estado === 'COMPLETADA')
-          .reduce((acc: number, r: any) => acc + (Number(r.monto_pago) || 0), 0);
+        // 5. INGRESOS POR RESERVAS (pagos de reservas aprobados en el año)
+        const ingresosReservas = mesesKpi
+          .reduce((acc, m) => acc + Number(m.recaudado_por_tipo.RESERVA ?? 0), 0);
 
         // 6. RESERVAS POR CONFIRMAR
-        const reservasPorConfirmar = reservas
-          .filter((r: any) => r.estado === 'PENDIENTE_PAGO')
-          .length;
+        const reservasPorConfirmar = reservasPendientes.length;
 
         // 7. USUARIOS ACTIVOS
         const usuariosActivos = usuariosCondo.filter((u: any) => u.activo).length;
 
-        // 8. DATOS PARA GRÁFICO (Ingresos por mes del año actual)
-        const currentYear = new Date().getFullYear();
+        // 8. DATOS PARA GRÁFICO (Recaudado vs facturado por mes del año actual)
         const meses = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"];
         const graficoMap = new Array(12).fill(0);
         const estimadoMap = new Array(12).fill(0);
-        
-        pagos.forEach((p: any) => {
-          if (p.estado_pago === 'APROBADO') {
-            const fecha = new Date(p.fecha_pago);
-            if (fecha.getFullYear() === currentYear) {
-              const mes = fecha.getMonth();
-              graficoMap[mes] += Number(p.monto);
-            }
-          }
-        });
 
-        gastosCondo.forEach((g: any) => {
-          if (g.anio === currentYear) {
-            const mesIndex = g.mes - 1;
-            if (mesIndex >= 0 && mesIndex < 12) {
-              estimadoMap[mesIndex] += Number(g.monto_total);
-            }
+        mesesKpi.forEach((m) => {
+          const mesIndex = Number(m.mes.slice(5, 7)) - 1;
+          if (mesIndex >= 0 && mesIndex < 12) {
+            graficoMap[mesIndex] += Number(m.recaudado_total);
+            estimadoMap[mesIndex] += Number(m.facturado);
           }
         });
 
@@ -137,7 +117,7 @@ export const useDashboardData = () => {
         }));
 
         // 9. PAGOS RECIENTES (Últimos 5)
-        const pagosRecientes = pagos
+        const pagosRecientes = [...pagos]
           .sort((a: any, b: any) => new Date(b.fecha_pago).getTime() - new Date(a.fecha_pago).getTime())
           .slice(0, 5)
           .map((p: any) => {
@@ -153,8 +133,7 @@ export const useDashboardData = () => {
         // 10. HOGARES MOROSOS (Top 5 con mayor deuda)
         const morososMap = new Map<number, { deuda: number; gastos: any[] }>();
         
-        gastosCondo
-          .filter((g: any) => estadosDeuda.includes(g.estado))
+        gastosImpagos
           .forEach((g: any) => {
             const current = morososMap.get(g.residente_id) || { deuda: 0, gastos: [] };
             current.deuda += Number(g.monto_total);
@@ -194,14 +173,8 @@ export const useDashboardData = () => {
           .sort((a, b) => b.montoDeuda - a.montoDeuda)
           .slice(0, 5);
 
-        // 11. ANUNCIOS RECIENTES (Últimos 3 activos del condominio)
-        const anunciosRecientes: AnuncioComunidad[] = anunciosCondo
-          .sort((a: any, b: any) => {
-            const fechaA = new Date(a.fecha_publicacion);
-            const fechaB = new Date(b.fecha_publicacion);
-            return fechaB.getTime() - fechaA.getTime();
-          })
-          .slice(0, 3)
+        // 11. ANUNCIOS RECIENTES (Últimos 3 activos del condominio, ya ordenados por la API)
+        const anunciosRecientes: AnuncioComunidad[] = anuncios
           .map((a: any) => {
             // Buscar el usuario que creó el anuncio
             const autor = usuariosCondo.find((u: any) => u.id === a.creado_por);
@@ -221,7 +194,8 @@ export const useDashboardData = () => {
             };
           });
 
-        const reservasCount = reservas.length;
+        const reservasCount = (kpis?.espacios ?? [])
+          .reduce((acc, e) => acc + Number(e.reservas), 0);
 
         setData({
           ingresoTotal: Math.round(ingresoTotal),
@@ -17,9 +17,9 @@ export function useDetalleCuenta() {
       if (!user) throw new Error("Usuario no autenticado");
 
       // 1. Obtener ID de Residente
-      const resResidentes = await fetchWithAuth("/api/v1/residentes");
+      const resResidentes = await fetchWithAuth(`/api/v1/residentes?usuario_id=${user.id}`);
       const residentes = await resResidentes.json();
-      const miResidente = residentes.find((r: any) => r.usuario_id === user.id);
+      const miResidente = residentes[0];
 
       if (!miResidente) throw new Error("Perfil de residente no encontrado");
 
@@ -0,0 +1,72 @@
+import { useCallback, useEffect, useRef, useState } from "react";
+import type { Pagina } from "@/services/paginacion";
+
+/**
+ * Listado paginado por cursor para pantallas con "Cargar más": trae la
+ * primera página al montar (o cuando cambian las dependencias, p. ej. un
+ * filtro) y agrega las siguientes a pedido.
+ */
+export function useListaPaginada<T>(
+  cargarPagina: (cursor: string | null) => Promise<Pagina<T>>,
+  deps: unknown[] = [],
+) {
+  const [items, setItems] = useState<T[]>([]);
+  const [siguiente, setSiguiente] = useState<string | null>(null);
+  const [loading, setLoading] = useState(true);
+  const [cargandoMas, setCargandoMas] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+  // Descarta respuestas de una carga anterior si los filtros cambiaron
+  const version = useRef(0);
+
+  const recargar = useCallback(async () => {
+    const actual = ++version.current;
+    setLoading(true);
+    setError(null);
+    try {
+      const pagina = await cargarPagina(null);
+      if (actual !== version.current) return;
+      setItems(pagina.items);
+      setSiguiente(pagina.siguiente);
+    } catch (err: any) {
+      if (actual !== version.current) return;
+      console.error(err);
+      setError(err.message || "Error al cargar los datos.");
+    } finally {
+      if (actual === version.current) setLoading(false);
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, deps);
+
+  const cargarMas = useCallback(async () => {
+    if (!siguiente || cargandoMas) return;
+    const actual = version.current;
+    setCargandoMas(true);
+    try {
+      const pagina = await cargarPagina(siguiente);
+      if (actual !== version.current) return;
+      setItems((previos) => [...previos, ...pagina.items]);
+      setSiguiente(pagina.siguiente);
+    } catch (err: any) {
+      console.error(err);
+      setError(err.message || "Error al cargar más datos.");
+    } finally {
+      setCargandoMas(false);
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [siguiente, cargandoMas, ...deps]);
+
+  useEffect(() => {
+    recargar();
+  }, [recargar]);
+
+  return {
+    items,
+    setItems,
+    loading,
+    cargandoMas,
+    error,
+    hayMas: siguiente !== null,
+    cargarMas,
+    recargar,
+  };
+}
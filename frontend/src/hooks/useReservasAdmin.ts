@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import { reservaService, type Reserva } from "@/services/reservaService";
 import { espaciosComunesService } from "@/services/espaciosComunesService";
 import { authService, fetchWithAuth } from "@/services/authService";
+import { fetchTodasLasPaginas } from "@/services/paginacion";
 
 export interface ReservaAdminView extends Reserva {
   nombreResidente: string;
@@ -27,18 +28,20 @@ export function useReservasAdmin() {
       
       // 1. Fetch Paralelo de entidades necesarias
       const [reservas, espacios] = await Promise.all([
-        reservaService.getAll(),
+        reservaService.getAll({ condominio_id: condominioId }),
         espaciosComunesService.getByCondominio(condominioId),
       ]);
 
       // 2. Fetch de Residentes
-      const resResidentes = await fetchWithAuth("http://localhost:8000/api/v1/residentes");
+      const resResidentes = await fetchTodasLasPaginas(
+        `http://localhost:8000/api/v1/residentes?condominio_id=${condominioId}`,
+        (url) => fetchWithAuth(url)
+      );
       const residentes = await resResidentes.json();
 
       // 3. Unificar datos
+      // (el servidor ya filtra las reservas de los espacios de este condominio)
       const joinedData: ReservaAdminView[] = reservas
-        // Filtrar reservas que pertenezcan a los espacios de este condominio
-        .filter(r => espacios.some(e => e.id === r.espacio_comun_id))
         .map((reserva) => {
           const espacio = espacios.find((e) => e.id === reserva.espacio_comun_id);
           const residente = residentes.find((r: any) => r.id === reserva.residente_id);
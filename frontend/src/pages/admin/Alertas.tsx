@@ -1,7 +1,8 @@
-import { useEffect, useState } from "react";
+import { useState } from "react";
 import Navbar from "@/components/Navbar";
 import { SidebarAdmin } from "@/components/SidebarAdmin";
 import { alertaService, type Alerta } from "@/services/alertaService";
+import { useListaPaginada } from "@/hooks/useListaPaginada";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
@@ -13,27 +14,16 @@ import { format } from "date-fns";
 import { es } from "date-fns/locale";
 
 export default function AdminAlertasPage() {
-  const [alertas, setAlertas] = useState<Alerta[]>([]);
-  const [loading, setLoading] = useState(true);
+  const [tab, setTab] = useState("todas");
   const [selectedAlerta, setSelectedAlerta] = useState<Alerta | null>(null);
   const [comentario, setComentario] = useState("");
   const [isDialogOpen, setIsDialogOpen] = useState(false);
 
-  const fetchAlertas = async () => {
-    setLoading(true);
-    try {
-      const data = await alertaService.getAll();
-      setAlertas(data);
-    } catch (error) {
-      console.error("Error fetching alertas", error);
-    } finally {
-      setLoading(false);
-    }
-  };
-
-  useEffect(() => {
-    fetchAlertas();
-  }, []);
+  // Cada pestaña pide al servidor su estado y pagina con "Cargar más"
+  const estado = tab === "pendientes" ? "PENDIENTE" : tab === "resueltas" ? "RESUELTO" : undefined;
+  const {
+    items: alertas, loading, cargandoMas, hayMas, cargarMas, recargar: fetchAlertas,
+  } = useListaPaginada<Alerta>((cursor) => alertaService.getPagina({ estado }, cursor), [estado]);
 
   const handleResolver = async () => {
     if (!selectedAlerta) return;
@@ -78,18 +68,16 @@ export default function AdminAlertasPage() {
               <span>Cargando alertas...</span>
             </div>
           ) : (
-            <Tabs defaultValue="todas" className="w-full">
+            <Tabs value={tab} onValueChange={setTab} className="w-full">
               <TabsList className="bg-white border mb-4">
                 <TabsTrigger value="todas">Todas</TabsTrigger>
                 <TabsTrigger value="pendientes">Pendientes</TabsTrigger>
                 <TabsTrigger value="resueltas">Resueltas</TabsTrigger>
               </TabsList>
 
-              {["todas", "pendientes", "resueltas"].map((tab) => (
-                <TabsContent key={tab} value={tab} className="space-y-4">
-                  {alertas
-                    .filter(a => tab === "todas" ? true : tab === "pendientes" ? a.estado === "PENDIENTE" : a.estado === "RESUELTO")
-                    .map((alerta) => (
+              {["todas", "pendientes", "resueltas"].map((pestana) => (
+                <TabsContent key={pestana} value={pestana} className="space-y-4">
+                  {alertas.map((alerta) => (
                     <Card key={alerta.id} className="border-l-4 border-l-blue-500 shadow-sm hover:shadow-md transition-shadow">
                       <CardHeader className="flex flex-row items-center justify-between py-4">
                         <div className="flex items-center gap-4">
@@ -97,9 +85,17 @@ export default function AdminAlertasPage() {
                             {getIcon(alerta.tipo)}
                           </div>
                           <div>
-                            <CardTitle className="text-base font-semibold text-gray-900">{alerta.titulo}</CardTitle>
+                            <CardTitle className="text-base font-semibold text-gray-900">
+                              {alerta.titulo}
+                              {alerta.ocurrencias > 1 && (
+                                <span className="ml-2 text-xs font-medium text-gray-500">x{alerta.ocurrencias}</span>
+                              )}
+                            </CardTitle>
                             <p className="text-xs text-muted-foreground mt-1 capitalize">
                               {format(new Date(alerta.fecha_creacion), "dd MMMM yyyy HH:mm", { locale: es })}
+                              {alerta.ocurrencias > 1 && alerta.fecha_ultima_ocurrencia && (
+                                <> · última {format(new Date(alerta.fecha_ultima_ocurrencia), "dd MMMM yyyy HH:mm", { locale: es })}</>
+                              )}
                             </p>
                           </div>
                         </div>
@@ -147,7 +143,15 @@ export default function AdminAlertasPage() {
                     </Card>
                   ))}
                   
-                  {alertas.filter(a => tab === "todas" ? true : tab === "pendientes" ? a.estado === "PENDIENTE" : a.estado === "RESUELTO").length === 0 && (
+                  {hayMas && (
+                    <div className="flex justify-center">
+                      <Button variant="outline" onClick={cargarMas} disabled={cargandoMas}>
+                        {cargandoMas ? "Cargando..." : "Cargar más"}
+                      </Button>
+                    </div>
+                  )}
+
+                  {alertas.length === 0 && (
                     <div className="flex flex-col items-center justify-center py-12 border-2 border-dashed border-gray-200 rounded-xl bg-gray-50/50">
                         <Bell className="h-12 w-12 text-gray-300 mb-3" />
                         <p className="text-gray-500 font-medium">No hay alertas registradas en esta categoría.</p>
@@ -23,9 +23,13 @@ interface AnuncioListProps {
   onDelete: (id: number) => void;
   loading: boolean;
   onRefresh: () => void;
+  // Paginación por cursor: hay más anuncios en el servidor
+  hayMas?: boolean;
+  cargandoMas?: boolean;
+  onCargarMas?: () => void;
 }
 
-export function AnuncioList({ anuncios, onEdit, onView, onDelete, loading, onRefresh }: AnuncioListProps) {
+export function AnuncioList({ anuncios, onEdit, onView, onDelete, loading, onRefresh, hayMas, cargandoMas, onCargarMas }: AnuncioListProps) {
   const [searchTerm, setSearchTerm] = useState("");
 
   const filteredAnuncios = anuncios.filter((anuncio) => 
@@ -115,6 +119,13 @@ export function AnuncioList({ anuncios, onEdit, onView, onDelete, loading, onRef
             ))}
           </div>
         )}
+        {hayMas && onCargarMas && (
+          <div className="flex justify-center p-4">
+            <Button variant="outline" size="sm" onClick={onCargarMas} disabled={cargandoMas}>
+              {cargandoMas ? "Cargando..." : "Cargar más"}
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,4 +1,4 @@
-import { useEffect, useState } from "react";
+import { useEffect, useMemo, useState } from "react";
 import Navbar from "@/components/Navbar";
 import { SidebarAdmin } from "@/components/SidebarAdmin";
 import { CreateAnuncioForm } from "./CreateAnuncioForm";
@@ -8,7 +8,8 @@ import { DeleteAnuncioDialog } from "./DeleteAnuncioDialog";
 import { ErrorDialog } from "./ErrorDialog"; 
 import type { Anuncio } from "@/types/anuncio.types";
 import { anuncioService } from "@/services/anuncioService";
-import { usuarioService } from "@/services/usuarioService";
+import { usuarioService, type Usuario } from "@/services/usuarioService";
+import { useListaPaginada } from "@/hooks/useListaPaginada";
 
 // Extendemos el tipo Anuncio para incluir datos del autor
 export interface AnuncioConAutor extends Anuncio {
@@ -17,48 +18,41 @@ export interface AnuncioConAutor extends Anuncio {
 }
 
 export default function AnunciosPage() {
-  const [anuncios, setAnuncios] = useState<AnuncioConAutor[]>([]);
+  const [usuarios, setUsuarios] = useState<Usuario[]>([]);
   const [selectedAnuncio, setSelectedAnuncio] = useState<AnuncioConAutor | null>(null);
   const [mode, setMode] = useState<"edit" | "view" | null>(null);
-  const [loading, setLoading] = useState(false);
   const [errorMsg, setErrorMsg] = useState<string | null>(null);
   const [deleteId, setDeleteId] = useState<number | null>(null);
   const [isDeleting, setIsDeleting] = useState(false);
   const showError = (msg: string) => setErrorMsg(msg);
 
-  const fetchAnuncios = async () => {
-    setLoading(true);
-    try {
-      const [anunciosData, usuarios] = await Promise.all([
-        anuncioService.getAll(0, 100),
-        usuarioService.getAll()
-      ]);
-      
-      // Enriquecer anuncios con datos del autor
-      const anunciosConAutor: AnuncioConAutor[] = anunciosData.map(anuncio => {
-        const autor = usuarios.find(u => u.id === anuncio.creado_por);
-        const nombreAutor = autor ? `${autor.nombre} ${autor.apellido}` : `Usuario ${anuncio.creado_por}`;
-        
-        return {
-          ...anuncio,
-          nombreAutor,
-          avatarAutor: `https://api.dicebear.com/7.x/avataaars/svg?seed=${nombreAutor}`
-        };
-      });
-      
-      setAnuncios(anunciosConAutor);
-    } catch (error) {
-      console.error("Error al cargar:", error);
-      showError("Error al cargar los anuncios");
-    } finally {
-      setLoading(false);
-    }
-  };
+  // Anuncios más recientes primero, de a una página
+  const {
+    items: anunciosData, loading, cargandoMas, hayMas, cargarMas, error, recargar: fetchAnuncios,
+  } = useListaPaginada<Anuncio>((cursor) => anuncioService.getPagina(cursor));
 
   useEffect(() => {
-    fetchAnuncios();
+    usuarioService.getAll()
+      .then(setUsuarios)
+      .catch((err) => console.error("Error al cargar usuarios:", err));
   }, []);
 
+  useEffect(() => {
+    if (error) showError("Error al cargar los anuncios");
+  }, [error]);
+
+  // Enriquecer anuncios con datos del autor
+  const anuncios: AnuncioConAutor[] = useMemo(() => anunciosData.map(anuncio => {
+    const autor = usuarios.find(u => u.id === anuncio.creado_por);
+    const nombreAutor = autor ? `${autor.nombre} ${autor.apellido}` : `Usuario ${anuncio.creado_por}`;
+
+    return {
+      ...anuncio,
+      nombreAutor,
+      avatarAutor: `https://api.dicebear.com/7.x/avataaars/svg?seed=${nombreAutor}`
+    };
+  }), [anunciosData, usuarios]);
+
   const handleCreateSuccess = () => {
     fetchAnuncios();
   };
@@ -124,6 +118,9 @@ export default function AnunciosPage() {
                   onDelete={reqDelete}
                   loading={loading}
                   onRefresh={fetchAnuncios}
+                  hayMas={hayMas}
+                  cargandoMas={cargandoMas}
+                  onCargarMas={cargarMas}
                 />
               </div>
             </div>
@@ -86,7 +86,7 @@ export default function DashboardCondominio() {
                         </div>
                     </div>
                     <div>
-                      <p className="text-sm font-bold text-gray-500 mb-1">Ingreso Total</p>
+                      <p className="text-sm font-bold text-gray-500 mb-1">Ingreso del Año</p>
                       <div className="text-4xl font-extrabold text-gray-800 tracking-tight">
                         {formatMonto(dashboardData.ingresoTotal)}
                       </div>
@@ -71,7 +71,7 @@ export function AdjustDeudaDialog({ open, onOpenChange, usuario }: AdjustDeudaDi
       setErrorDeudas(null);
       try {
         const [m, g] = await Promise.all([
-          multaService.getAll(residenteId),
+          multaService.getByResidente(residenteId),
           gastoComunService.getByResidente(residenteId),
         ]);
         setMultas(m);
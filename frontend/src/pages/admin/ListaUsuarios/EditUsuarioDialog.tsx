@@ -54,8 +54,7 @@ export function EditUsuarioDialog({ open, onOpenChange, usuario, onSuccess }: Ed
 
   const fetchResidenteData = async (userId: number) => {
     try {
-      const residentes = await residenteService.getAll();
-      const residenteEncontrado = residentes.find(r => r.usuario_id === userId);
+      const residenteEncontrado = await residenteService.getByUsuario(userId);
 
       if (residenteEncontrado) {
         setTienePerfilResidente(true);
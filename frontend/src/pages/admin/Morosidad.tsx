@@ -62,15 +62,14 @@ export default function AdminMorosidad() {
         if (!user) throw new Error("Usuario no autenticado");
 
         const condominioId = user.condominio_id || user.condominioId;
-        const [gastos, multas, residentes] = await Promise.all([
-          gastoComunService.getAll().catch(() => [] as GastoComun[]),
-          multaService.getAll().catch(() => [] as Multa[]),
-          residenteService.getAll().catch(() => [] as Residente[]),
-        ]);
+        if (!condominioId) throw new Error("No se encontró el condominio del administrador.");
 
-        const residentesCondo = condominioId
-          ? residentes.filter((r) => r.condominio_id === condominioId)
-          : residentes;
+        // Solo la deuda del condominio: gastos impagos y multas pendientes
+        const [gastos, multas, residentesCondo] = await Promise.all([
+          gastoComunService.getImpagosByCondominio(condominioId).catch(() => [] as GastoComun[]),
+          multaService.getByCondominio(condominioId, "PENDIENTE").catch(() => [] as Multa[]),
+          residenteService.getByCondominio(condominioId).catch(() => [] as Residente[]),
+        ]);
 
         const residenteMap = new Map<number, Residente>();
         residentesCondo.forEach((r) => residenteMap.set(r.id, r));
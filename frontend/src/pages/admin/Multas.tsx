@@ -1,4 +1,5 @@
 import { useEffect, useState } from "react";
+import { useListaPaginada } from "@/hooks/useListaPaginada";
 import { multaService, type Multa } from "@/services/multaService";
 import { residenteService, type Residente } from "@/services/residenteService";
 import { Button } from "@/components/ui/button";
@@ -33,9 +34,7 @@ const CURRENT_CONDOMINIO_ID = 1;
 
 export default function AdminMultas() {
   const toInt = (val: number | undefined) => Math.round(Number(val ?? 0));
-  const [multas, setMultas] = useState<Multa[]>([]);
   const [residentes, setResidentes] = useState<Residente[]>([]);
-  const [loading, setLoading] = useState(true);
   const [isCreateOpen, setIsCreateOpen] = useState(false);
   const [processing, setProcessing] = useState(false);
 
@@ -50,26 +49,18 @@ export default function AdminMultas() {
     estado: "PENDIENTE"
   });
 
+  // Multas del condominio, más recientes primero y de a una página
+  const {
+    items: multas, loading, cargandoMas, hayMas, cargarMas, recargar: recargarMultas,
+  } = useListaPaginada<Multa>((cursor) => multaService.getPagina(CURRENT_CONDOMINIO_ID, cursor));
+
+  // Residentes del condominio (para el selector y los nombres de la tabla)
   useEffect(() => {
-    loadData();
+    residenteService.getByCondominio(CURRENT_CONDOMINIO_ID)
+      .then(setResidentes)
+      .catch((error) => console.error("Error cargando residentes", error));
   }, []);
 
-  const loadData = async () => {
-    setLoading(true);
-    try {
-      const [multasData, residentesData] = await Promise.all([
-        multaService.getAll(),
-        residenteService.getAll()
-      ]);
-      setMultas(multasData);
-      setResidentes(residentesData);
-    } catch (error) {
-      console.error("Error cargando datos", error);
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const getNombreResidente = (id: number) => {
     const res = residentes.find(r => r.id === id);
     return res ? `${res.nombre} ${res.apellido} (Casa ${res.vivienda_numero})` : `ID: ${id}`;
@@ -92,8 +83,7 @@ export default function AdminMultas() {
       );
 
       alert(`Proceso completado. Se crearon ${res.multas_creadas} multas nuevas.`);
-      const multasUpdated = await multaService.getAll();
-      setMultas(multasUpdated);
+      await recargarMultas();
     } catch (error) {
       alert("Error al procesar multas automáticas");
     } finally {
@@ -129,8 +119,7 @@ export default function AdminMultas() {
         creado_por: CURRENT_ADMIN_ID,
         estado: "PENDIENTE"
       });
-      const multasUpdated = await multaService.getAll();
-      setMultas(multasUpdated);
+      await recargarMultas();
     } catch (error) {
       console.error(error);
       alert("Error al crear multa");
@@ -306,6 +295,14 @@ export default function AdminMultas() {
                 </TableBody>
               </Table>
             </div>
+
+            {hayMas && (
+              <div className="flex justify-center">
+                <Button variant="outline" onClick={cargarMas} disabled={cargandoMas}>
+                  {cargandoMas ? "Cargando..." : "Cargar más"}
+                </Button>
+              </div>
+            )}
           </div>
         </main>
       </div>
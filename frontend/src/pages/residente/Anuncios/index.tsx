@@ -1,40 +1,24 @@
 // frontend/src/pages/residente/Anuncios/index.tsx
-import { useState, useEffect } from "react";
+import { useState } from "react";
 import { Loader2, Megaphone, Search } from "lucide-react";
 import NavbarResidente from "@/components/NavbarResidente";
 import { AnuncioCard } from "./AnuncioCard";
 import { AnuncioDetailDialog } from "./AnuncioDetailDialog";
 import { Input } from "@/components/ui/input";
+import { Button } from "@/components/ui/button";
 import { anuncioService } from "@/services/anuncioService";
+import { useListaPaginada } from "@/hooks/useListaPaginada";
 import type { Anuncio } from "@/types/anuncio.types";
 
 export default function AnunciosResidente() {
-  const [anuncios, setAnuncios] = useState<Anuncio[]>([]);
-  const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState("");
   const [selectedAnuncio, setSelectedAnuncio] = useState<Anuncio | null>(null);
   const [dialogOpen, setDialogOpen] = useState(false);
 
-  useEffect(() => {
-    loadAnuncios();
-  }, []);
-
-  const loadAnuncios = async () => {
-    try {
-      setLoading(true);
-      // Obtenemos los anuncios más recientes primero
-      const data = await anuncioService.getAll();
-      // Ordenamiento manual por si el backend no lo hace (fecha más reciente primero)
-      const sorted = data.sort((a, b) => 
-        new Date(b.fecha_publicacion).getTime() - new Date(a.fecha_publicacion).getTime()
-      );
-      setAnuncios(sorted);
-    } catch (error) {
-      console.error("Error al cargar anuncios:", error);
-    } finally {
-      setLoading(false);
-    }
-  };
+  // Los más recientes primero, de a una página ("Cargar más" trae la siguiente)
+  const { items: anuncios, loading, cargandoMas, hayMas, cargarMas } = useListaPaginada<Anuncio>(
+    (cursor) => anuncioService.getPagina(cursor)
+  );
 
   const handleCardClick = (anuncio: Anuncio) => {
     setSelectedAnuncio(anuncio);
@@ -100,6 +84,14 @@ export default function AnunciosResidente() {
             ))}
           </div>
         )}
+
+        {!loading && hayMas && (
+          <div className="flex justify-center mt-8">
+            <Button variant="outline" onClick={cargarMas} disabled={cargandoMas}>
+              {cargandoMas ? "Cargando..." : "Cargar más"}
+            </Button>
+          </div>
+        )}
       </main>
 
       {/* Modal de Detalle */}
@@ -2,6 +2,7 @@ import { Calendar } from "lucide-react";
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { authService, fetchWithAuth } from "@/services/authService";
+import { fetchTodasLasPaginas } from "@/services/paginacion";
 
 interface GastoComun {
   id: number;
@@ -28,10 +29,10 @@ export default function ResumenGastoComun() {
 
         // 1. Obtener residente
         const residentesRes = await fetchWithAuth(
-          "http://localhost:8000/api/v1/residentes"
+          `http://localhost:8000/api/v1/residentes?usuario_id=${user.id}`
         );
         const residentes = await residentesRes.json();
-        const residente = residentes.find((r: any) => r.usuario_id === user.id);
+        const residente = residentes[0];
 
         if (!residente) {
           console.error("No se encontró residente para este usuario");
@@ -39,13 +40,11 @@ export default function ResumenGastoComun() {
         }
 
         // 2. Obtener gastos
-        const gastosRes = await fetchWithAuth(
-          "http://localhost:8000/api/v1/gastos-comunes"
-        );
-        const gastos: GastoComun[] = await gastosRes.json();
-        const gastosResidente = gastos.filter(
-          (g) => g.residente_id === residente.id
+        const gastosRes = await fetchTodasLasPaginas(
+          `http://localhost:8000/api/v1/gastos-comunes?residente_id=${residente.id}`,
+          (url) => fetchWithAuth(url)
         );
+        const gastosResidente: GastoComun[] = await gastosRes.json();
 
         // 3. Obtener el más prioritario
         const pendiente = gastosResidente
@@ -19,12 +19,10 @@ export default function ResumenMultas() {
         
         if (user?.id) {
             // eslint-disable-next-line @typescript-eslint/no-explicit-any
-            const allResidentes = await residenteService.getAll();
-            // eslint-disable-next-line @typescript-eslint/no-explicit-any
-            const miResidente = allResidentes.find((r: any) => r.usuario_id === user.id);
+            const miResidente = await residenteService.getByUsuario(user.id);
 
             if (miResidente) {
-                const data = await multaService.getAll(miResidente.id);
+                const data = await multaService.getByResidente(miResidente.id);
                 // Ordenar por fecha descendente
                 const sorted = data.sort((a, b) => {
                     const dateA = a.fecha_emision ? new Date(a.fecha_emision).getTime() : 0;
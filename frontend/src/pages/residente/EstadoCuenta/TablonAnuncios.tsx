@@ -13,15 +13,9 @@ export default function TablonAnuncios() {
     const loadAnuncios = async () => {
       try {
         setLoading(true);
-        // Obtenemos los anuncios
-        const data = await anuncioService.getAll();
-        
-        // Ordenamos por fecha (más reciente primero) y tomamos solo los 3 primeros
-        const sorted = data.sort((a, b) => 
-          new Date(b.fecha_publicacion).getTime() - new Date(a.fecha_publicacion).getTime()
-        ).slice(0, 3);
-        
-        setAnuncios(sorted);
+        // Solo los 3 más recientes (la API los entrega en ese orden)
+        const { items } = await anuncioService.getPagina(null, 3);
+        setAnuncios(items);
       } catch (error) {
         console.error("Error cargando anuncios", error);
       } finally {
@@ -36,6 +36,8 @@ export function MultaCard({ multa, onClick }: MultaCardProps) {
         return <Badge className="bg-green-100 text-green-700 hover:bg-green-100 border-green-200">Pagada</Badge>;
       case "CONDONADA":
         return <Badge className="bg-blue-100 text-blue-700 hover:bg-blue-100 border-blue-200">Condonada</Badge>;
+      case "FACTURADA":
+        return <Badge className="bg-amber-100 text-amber-700 hover:bg-amber-100 border-amber-200">En gasto común</Badge>;
       default:
         return <Badge className="bg-red-100 text-red-700 hover:bg-red-100 border-red-200">Pendiente</Badge>;
     }
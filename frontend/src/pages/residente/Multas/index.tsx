@@ -40,12 +40,11 @@ export default function MultasResidente() {
       
       if (user?.id) {
         // 1. Obtener ID del residente asociado al usuario
-        const allResidentes = await residenteService.getAll();
-        const miResidente = allResidentes.find((r: any) => r.usuario_id === user.id);
+        const miResidente = await residenteService.getByUsuario(user.id);
 
         if (miResidente) {
           // 2. Cargar multas del residente
-          const data = await multaService.getAll(miResidente.id);
+          const data = await multaService.getByResidente(miResidente.id);
           // Ordenar por fecha (más recientes primero)
           const sorted = data.sort((a, b) => {
              const dateA = a.fecha_emision ? new Date(a.fecha_emision).getTime() : 0;
@@ -120,6 +119,7 @@ export default function MultasResidente() {
                 <SelectItem value="PENDIENTE">Pendientes</SelectItem>
                 <SelectItem value="PAGADA">Pagadas</SelectItem>
                 <SelectItem value="CONDONADA">Condonadas</SelectItem>
+                <SelectItem value="FACTURADA">En gasto común</SelectItem>
               </SelectContent>
             </Select>
           </div>
@@ -72,9 +72,7 @@ const SistemaPago = () => {
       // 2. Obtener el ID del residente asociado al usuario actual
       if (user?.id) {
         try {
-          const residentes = await residenteService.getAll();
-          // eslint-disable-next-line @typescript-eslint/no-explicit-any
-          const miResidente = residentes.find((r: any) => r.usuario_id === user.id);
+          const miResidente = await residenteService.getByUsuario(user.id);
 
           if (miResidente) {
             setResidenteId(miResidente.id);
@@ -75,13 +75,14 @@ export function NewReservationDialog({
     const fetchConflicts = async () => {
         setIsLoadingReservations(true);
         try {
-            const all = await reservaService.getAll();
+            // Solo las reservas de ese espacio y ese día
             const selectedDateStr = format(date, "yyyy-MM-dd");
-            const filtered = all.filter(r => 
-                r.espacio_comun_id === Number(espacioId) &&
-                r.fecha_reserva === selectedDateStr &&
-                r.estado !== "CANCELADA"
-            );
+            const delDia = await reservaService.getAll({
+                espacio_comun_id: Number(espacioId),
+                desde: selectedDateStr,
+                hasta: selectedDateStr,
+            });
+            const filtered = delDia.filter(r => r.estado !== "CANCELADA");
             setExistingReservations(filtered);
         } catch (err) {
             console.error("Error cargando disponibilidad", err);
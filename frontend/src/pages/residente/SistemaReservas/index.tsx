@@ -47,11 +47,13 @@ export default function SistemaReservasPage() {
       }
 
       // 1. Obtener Perfil Residente
-      const resResidentes = await fetchWithAuth("http://localhost:8000/api/v1/residentes");
+      const resResidentes = await fetchWithAuth(
+        `http://localhost:8000/api/v1/residentes?usuario_id=${currentUser.id}`
+      );
       if (!resResidentes.ok) throw new Error("Error al cargar perfil");
 
       const residentes = await resResidentes.json();
-      const miResidente = residentes.find((r: any) => r.usuario_id === currentUser.id);
+      const miResidente = residentes[0];
 
       if (!miResidente) {
         setError("No se encontró un perfil de residente.");
@@ -61,16 +63,14 @@ export default function SistemaReservasPage() {
       setCurrentResidenteId(miResidente.id);
 
       // 2. Fetch Paralelo
-      const [allReservas, espaciosDelCondominio] = await Promise.all([
-        reservaService.getAll(),
+      const [misReservas, espaciosDelCondominio] = await Promise.all([
+        reservaService.getAll({ residente_id: miResidente.id }),
         espaciosComunesService.getByCondominio(miResidente.condominio_id),
       ]);
 
       setEspacios(espaciosDelCondominio);
 
-      // 3. Filtrar y Mapear
-      const misReservas = allReservas.filter((r) => r.residente_id === miResidente.id);
-
+      // 3. Mapear
       const mappedReservations: ReservationView[] = misReservas.map((reserva) => {
         const espacio = espaciosDelCondominio.find((e) => e.id === reserva.espacio_comun_id);
         
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { NEXT_CURSOR_HEADER, PAGE_SIZE_DEFAULT, type Pagina } from './paginacion';
 
 const API_URL = "http://localhost:8000/api/v1/alertas"; 
 
@@ -9,15 +10,33 @@ export interface Alerta {
   tipo: "MOROSIDAD" | "MULTA" | "EDICION_GASTO" | "SISTEMA";
   estado: "PENDIENTE" | "RESUELTO";
   fecha_creacion: string;
+  // Eventos repetidos agrupados en esta alerta
+  ocurrencias: number;
+  fecha_ultima_ocurrencia?: string;
+  entidad_tipo?: string;
+  entidad_id?: number;
   comentario_resolucion?: string;
   fecha_resolucion?: string;
 }
 
 export const alertaService = {
-  getAll: async (estado?: string) => {
-    const params = estado ? { estado } : {};
+  // Una página de alertas (más recientes primero); la siguiente se pide con
+  // el cursor que trae la anterior
+  getPagina: async (
+    filtros: { estado?: string; condominio_id?: number } = {},
+    cursor?: string | null,
+  ): Promise<Pagina<Alerta>> => {
+    const params = {
+      ...(filtros.estado ? { estado: filtros.estado } : {}),
+      ...(filtros.condominio_id ? { condominio_id: filtros.condominio_id } : {}),
+      limit: PAGE_SIZE_DEFAULT,
+      ...(cursor ? { cursor } : {}),
+    };
     const response = await axios.get<Alerta[]>(API_URL, { params });
-    return response.data;
+    return {
+      items: response.data,
+      siguiente: response.headers[NEXT_CURSOR_HEADER.toLowerCase()] || null,
+    };
   },
 
   resolver: async (id: number, comentario: string) => {
@@ -1,5 +1,6 @@
 import type { Anuncio, AnuncioInput } from "../types/anuncio.types";
 import { authService } from "./authService";
+import { fetchPagina, PAGE_SIZE_DEFAULT, type Pagina } from "./paginacion";
 
 const API_URL = "http://localhost:8000/api/v1";
 
@@ -12,20 +13,26 @@ const getAuthHeaders = () => {
 };
 
 export const anuncioService = {
-  getAll: async (skip: number = 0, limit: number = 100): Promise<Anuncio[]> => {
+  // Una página de anuncios (más recientes primero) del condominio del usuario
+  getPagina: async (
+    cursor?: string | null,
+    limit: number = PAGE_SIZE_DEFAULT,
+    soloActivos: boolean = false,
+  ): Promise<Pagina<Anuncio>> => {
     try {
-      const response = await fetch(`${API_URL}/anuncios?skip=${skip}&limit=${limit}`, {
-        method: "GET",
-        headers: getAuthHeaders(),
-      });
-      
-      if (!response.ok) {
-        throw new Error(`Error al obtener anuncios: ${response.status}`);
-      }
-      
-      return response.json();
+      const user = authService.getUser();
+      const condominioId = user?.condominio_id || user?.condominioId;
+      const params = new URLSearchParams();
+      if (condominioId) params.set("condominio_id", String(condominioId));
+      if (soloActivos) params.set("activo", "true");
+      return await fetchPagina<Anuncio>(
+        `${API_URL}/anuncios?${params}`,
+        (u) => fetch(u, { method: "GET", headers: getAuthHeaders() }),
+        cursor,
+        limit,
+      );
     } catch (error) {
-      console.error("Error en getAll:", error);
+      console.error("Error en getPagina:", error);
       throw error;
     }
   },
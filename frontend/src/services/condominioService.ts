@@ -1,3 +1,6 @@
+import { fetchWithAuth } from './authService';
+import { fetchTodasLasPaginas } from './paginacion';
+
 const API_BASE_URL = 'http://localhost:8000/api/v1';
 
 export type Condominio = {
@@ -18,21 +21,49 @@ export type CondominioCreate = {
   activo?: boolean;
 }
 
+// GET /condominios/{id}/kpis (montos en pesos; mes como "YYYY-MM")
+export type KpiMes = {
+  mes: string;
+  facturado: number;
+  recaudado_gastos: number;
+  recaudado_total: number;
+  recaudado_por_tipo: Record<"GASTO_COMUN" | "MULTA" | "RESERVA", number>;
+  emitidos: number;
+  pagados: number;
+  morosos: number;
+  monto_moroso: number;
+  tasa_morosidad: number | null;
+}
+
+export type KpisCondominio = {
+  condominio_id: number;
+  desde: string;
+  hasta: string;
+  actualizado: string | null;
+  meses: KpiMes[];
+  totales: Omit<KpiMes, "mes" | "recaudado_por_tipo">;
+  multas: { tipo: string; cantidad: number; monto: number; monto_pendiente: number }[];
+  espacios: { espacio_comun_id: number; nombre: string; reservas: number; horas: number }[];
+}
+
 class CondominioService {
   
   /**
-   * Obtiene todos los condominios
+   * Obtiene todos los condominios. Es un catálogo chico: lo usan completo los
+   * selectores y la tabla del super administrador (que ordena y busca sobre todos)
    */
   async getAll(): Promise<Condominio[]> {
     try {
-      const response = await fetch(`${API_BASE_URL}/condominios`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          // TODO: Agregar token cuando se implemente autenticación
-          // 'Authorization': `Bearer ${localStorage.getItem('access_token')}`
-        },
-      });
+      const response = await fetchTodasLasPaginas(`${API_BASE_URL}/condominios`, (url) =>
+        fetch(url, {
+          method: 'GET',
+          headers: {
+            'Content-Type': 'application/json',
+            // TODO: Agregar token cuando se implemente autenticación
+            // 'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+          },
+        })
+      );
 
       if (!response.ok) {
         throw new Error(`Error al obtener condominios: ${response.status}`);
@@ -68,6 +99,25 @@ class CondominioService {
     }
   }
 
+  /**
+   * Indicadores mensuales del condominio entre desde y hasta (YYYY-MM-DD)
+   */
+  async getKpis(id: number, desde: string, hasta: string): Promise<KpisCondominio> {
+    try {
+      const params = new URLSearchParams({ desde, hasta });
+      const response = await fetchWithAuth(`${API_BASE_URL}/condominios/${id}/kpis?${params}`);
+
+      if (!response.ok) {
+        throw new Error(`Error al obtener indicadores: ${response.status}`);
+      }
+
+      return await response.json();
+    } catch (error) {
+      console.error('Error en getKpis:', error);
+      throw error;
+    }
+  }
+
   /**
    * Crea un nuevo condominio
    */
@@ -1,4 +1,5 @@
 import { fetchWithAuth } from "./authService";
+import { fetchTodasLasPaginas } from "./paginacion";
 
 const API_URL = "http://localhost:8000/api/v1";
 
@@ -18,9 +19,9 @@ export const deudaService = {
   async getPendientes(usuarioId: number): Promise<DeudaPendiente[]> {
     try {
       // 1. Primero obtener el residente asociado al usuario
-      const residentesRes = await fetchWithAuth(`${API_URL}/residentes`);
+      const residentesRes = await fetchWithAuth(`${API_URL}/residentes?usuario_id=${usuarioId}`);
       const residentes = await residentesRes.json();
-      const residente = residentes.find((r: any) => r.usuario_id === usuarioId);
+      const residente = residentes[0];
 
       if (!residente) {
         console.warn("No se encontró residente para usuario:", usuarioId);
@@ -31,13 +32,15 @@ export const deudaService = {
 
       // 2. Obtener GASTOS COMUNES pendientes
       try {
-        const gastosRes = await fetchWithAuth(`${API_URL}/gastos-comunes`);
+        const gastosRes = await fetchTodasLasPaginas(
+          `${API_URL}/gastos-comunes?residente_id=${residente.id}`,
+          (url) => fetchWithAuth(url)
+        );
         const gastos = await gastosRes.json();
         
         const gastosPendientes = gastos.filter(
           (g: any) => 
-            g.residente_id === residente.id && 
-            (g.estado === "PENDIENTE" || g.estado === "VENCIDO" || g.estado === "MOROSO")
+            g.estado === "PENDIENTE" || g.estado === "VENCIDO" || g.estado === "MOROSO"
         );
 
         gastosPendientes.forEach((gc: any) => {
@@ -56,7 +59,10 @@ export const deudaService = {
 
       // 3. Obtener MULTAS pendientes
       try {
-        const multasRes = await fetchWithAuth(`${API_URL}/multas?residente_id=${residente.id}`);
+        const multasRes = await fetchTodasLasPaginas(
+          `${API_URL}/multas?residente_id=${residente.id}&estado=PENDIENTE`,
+          (url) => fetchWithAuth(url)
+        );
         const multas = await multasRes.json();
         
         const multasPendientes = multas.filter(
@@ -1,4 +1,5 @@
 import { fetchWithAuth } from "./authService";
+import { fetchTodasLasPaginas } from "./paginacion";
 
 const API_BASE_URL = "/api/v1";
 
@@ -31,11 +32,19 @@ export interface GastoComun {
   }>;
 }
 
+// Estados de un gasto común que todavía se deben
+export const ESTADOS_GASTO_DEUDA: GastoComun["estado"][] = ["PENDIENTE", "VENCIDO", "MOROSO"];
+
 class GastoComunService {
-  async getAll(): Promise<GastoComun[]> {
-    const response = await fetchWithAuth(`${API_BASE_URL}/gastos-comunes`, {
-      method: 'GET',
-    });
+  /**
+   * Obtiene los gastos de un condominio, opcionalmente solo los de un estado
+   */
+  async getByCondominio(condominioId: number, estado?: GastoComun["estado"]): Promise<GastoComun[]> {
+    const params = new URLSearchParams({ condominio_id: String(condominioId) });
+    if (estado) params.set("estado", estado);
+    const response = await fetchTodasLasPaginas(`${API_BASE_URL}/gastos-comunes?${params}`, (url) =>
+      fetchWithAuth(url, { method: 'GET' })
+    );
 
     if (!response.ok) {
       throw new Error(`Error al obtener gastos comunes: ${response.status}`);
@@ -45,12 +54,29 @@ class GastoComunService {
   }
 
   /**
-   * Obtiene los gastos de un residente específico.
-   * Filtra en el cliente si el backend no soporta ?residente_id
+   * Gastos impagos de un condominio (pendientes, vencidos y morosos)
+   */
+  async getImpagosByCondominio(condominioId: number): Promise<GastoComun[]> {
+    const porEstado = await Promise.all(
+      ESTADOS_GASTO_DEUDA.map((estado) => this.getByCondominio(condominioId, estado))
+    );
+    return porEstado.flat();
+  }
+
+  /**
+   * Obtiene los gastos de un residente específico (filtrados en el backend)
    */
   async getByResidente(residenteId: number): Promise<GastoComun[]> {
-    const all = await this.getAll();
-    return all.filter(g => g.residente_id === residenteId);
+    const response = await fetchTodasLasPaginas(
+      `${API_BASE_URL}/gastos-comunes?residente_id=${residenteId}`,
+      (url) => fetchWithAuth(url, { method: 'GET' })
+    );
+
+    if (!response.ok) {
+      throw new Error(`Error al obtener gastos comunes: ${response.status}`);
+    }
+
+    return await response.json();
   }
 
   async ajustar(gastoId: number, payload: {
@@ -1,9 +1,11 @@
 import { fetchWithAuth } from "./authService";
+import { fetchPagina, fetchTodasLasPaginas, type Pagina } from "./paginacion";
 
 const API_URL = "http://localhost:8000/api/v1";
 
 export type TipoMulta = "RETRASO_PAGO" | "INFRAESTRUCTURA" | "RUIDO" | "MASCOTA" | "OTRO";
-export type EstadoMulta = "PENDIENTE" | "PAGADA" | "CONDONADA";
+// FACTURADA: incluida en un gasto común (se paga con el gasto)
+export type EstadoMulta = "PENDIENTE" | "PAGADA" | "CONDONADA" | "FACTURADA";
 
 export interface Multa {
   id: number;
@@ -34,15 +36,27 @@ export interface MultaCreate {
 
 export const multaService = {
   /**
-   * Obtiene todas las multas (global o por residente)
+   * Obtiene todas las multas de un residente (más recientes primero)
    */
-  async getAll(residenteId?: number): Promise<Multa[]> {
-    try {
-      const url = residenteId
-        ? `${API_URL}/multas?residente_id=${residenteId}`
-        : `${API_URL}/multas`;
+  async getByResidente(residenteId: number): Promise<Multa[]> {
+    return this.getTodas(`${API_URL}/multas?residente_id=${residenteId}`);
+  },
+
+  /**
+   * Una página de multas de un condominio (más recientes primero)
+   */
+  async getPagina(condominioId: number, cursor?: string | null): Promise<Pagina<Multa>> {
+    return fetchPagina<Multa>(
+      `${API_URL}/multas?condominio_id=${condominioId}`,
+      (u) => fetchWithAuth(u),
+      cursor,
+    );
+  },
 
-      const response = await fetchWithAuth(url);
+  // Recorre un listado acotado por filtro (un residente o un condominio)
+  async getTodas(url: string): Promise<Multa[]> {
+    try {
+      const response = await fetchTodasLasPaginas(url, (u) => fetchWithAuth(u));
 
       if (!response.ok) {
         throw new Error("Error al obtener multas");
@@ -55,7 +69,7 @@ export const multaService = {
           new Date(b.fecha_emision).getTime() - new Date(a.fecha_emision).getTime()
       );
     } catch (error) {
-      console.error("Error en multaService.getAll:", error);
+      console.error("Error en multaService.getTodas:", error);
       return [];
     }
   },
@@ -173,29 +187,19 @@ export const multaService = {
   },
 
   /**
-   * Obtiene multas por condominio
+   * Obtiene multas por condominio (opcionalmente solo las de un estado)
    */
-  async getByCondominio(condominioId: number): Promise<Multa[]> {
-    try {
-      const todas = await this.getAll();
-      return todas.filter(m => m.condominio_id === condominioId);
-    } catch (error) {
-      console.error("Error en multaService.getByCondominio:", error);
-      return [];
-    }
+  async getByCondominio(condominioId: number, estado?: EstadoMulta): Promise<Multa[]> {
+    const params = new URLSearchParams({ condominio_id: String(condominioId) });
+    if (estado) params.set("estado", estado);
+    return this.getTodas(`${API_URL}/multas?${params}`);
   },
 
   /**
    * Obtiene multas pendientes de un condominio
    */
   async getPendientesByCondominio(condominioId: number): Promise<Multa[]> {
-    try {
-      const multas = await this.getByCondominio(condominioId);
-      return multas.filter(m => m.estado === "PENDIENTE");
-    } catch (error) {
-      console.error("Error en multaService.getPendientesByCondominio:", error);
-      return [];
-    }
+    return this.getByCondominio(condominioId, "PENDIENTE");
   },
 
   async ajustar(multaId: number, payload: {
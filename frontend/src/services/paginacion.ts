@@ -0,0 +1,69 @@
+// Los listados de la API vienen paginados por cursor: el cuerpo es una página
+// (un arreglo) y el cursor de la siguiente viaja en el header X-Next-Cursor
+// (ausente en la última página).
+export const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+export const PAGE_SIZE_DEFAULT = 50;
+export const PAGE_SIZE_MAX = 500;
+
+export interface Pagina<T> {
+  items: T[];
+  // Cursor de la página siguiente (null en la última)
+  siguiente: string | null;
+}
+
+/**
+ * Agrega limit y cursor a la URL de un listado (conserva sus filtros).
+ */
+export function urlPagina(url: string, cursor?: string | null, limit: number = PAGE_SIZE_DEFAULT): string {
+  const pagina = new URL(url, window.location.origin);
+  pagina.searchParams.set("limit", String(limit));
+  if (cursor) pagina.searchParams.set("cursor", cursor);
+  return pagina.toString();
+}
+
+/**
+ * Una página de un listado. Es lo que usan las pantallas con "Cargar más".
+ * `obtener` hace el fetch (fetchWithAuth o fetch con headers).
+ */
+export async function fetchPagina<T>(
+  url: string,
+  obtener: (url: string) => Promise<Response> = (u) => fetch(u),
+  cursor?: string | null,
+  limit: number = PAGE_SIZE_DEFAULT,
+): Promise<Pagina<T>> {
+  const response = await obtener(urlPagina(url, cursor, limit));
+  if (!response.ok) {
+    throw new Error(`Error al obtener ${new URL(url, window.location.origin).pathname}: ${response.status}`);
+  }
+  return {
+    items: await response.json(),
+    siguiente: response.headers.get(NEXT_CURSOR_HEADER),
+  };
+}
+
+/**
+ * Recorre todas las páginas de un listado y retorna una Response cuyo cuerpo
+ * es el arreglo completo. Solo para conjuntos acotados por un filtro del
+ * servidor (los gastos o multas de un residente, los residentes de un
+ * condominio, las deudas pendientes); los listados generales se paginan en la
+ * pantalla con fetchPagina.
+ * Si una página falla se retorna esa respuesta tal cual.
+ */
+export async function fetchTodasLasPaginas(
+  url: string,
+  obtener: (url: string) => Promise<Response> = (u) => fetch(u),
+): Promise<Response> {
+  const items: unknown[] = [];
+  let cursor: string | null = null;
+  do {
+    const response = await obtener(urlPagina(url, cursor, PAGE_SIZE_MAX));
+    if (!response.ok) return response;
+    items.push(...(await response.json()));
+    cursor = response.headers.get(NEXT_CURSOR_HEADER);
+  } while (cursor);
+
+  return new Response(JSON.stringify(items), {
+    status: 200,
+    headers: { "Content-Type": "application/json" },
+  });
+}
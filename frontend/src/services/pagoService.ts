@@ -1,4 +1,5 @@
 import { fetchWithAuth } from "./authService";
+import { fetchPagina, fetchTodasLasPaginas } from "./paginacion";
 
 const API_URL = "http://localhost:8000/api/v1";
 
@@ -40,9 +41,9 @@ export const pagoService = {
   async getByUsuario(usuarioId: number): Promise<Pago[]> {
     try {
       // Primero obtener el residente
-      const residentesRes = await fetchWithAuth(`${API_URL}/residentes`);
+      const residentesRes = await fetchWithAuth(`${API_URL}/residentes?usuario_id=${usuarioId}`);
       const residentes = await residentesRes.json();
-      const residente = residentes.find((r: any) => r.usuario_id === usuarioId);
+      const residente = residentes[0];
 
       if (!residente) {
         console.warn("No se encontró residente para usuario:", usuarioId);
@@ -50,8 +51,9 @@ export const pagoService = {
       }
 
       // Luego obtener los pagos del residente
-      const response = await fetchWithAuth(
-        `${API_URL}/pagos?residente_id=${residente.id}`
+      const response = await fetchTodasLasPaginas(
+        `${API_URL}/pagos?residente_id=${residente.id}`,
+        (url) => fetchWithAuth(url)
       );
       
       if (!response.ok) {
@@ -109,25 +111,16 @@ export const pagoService = {
   },
 
   /**
-   * Obtiene todos los pagos (Para admin)
+   * Últimos pagos de un condominio (la API los entrega más recientes primero)
    */
-  async getAll(filters?: { condominio_id?: number; estado_pago?: EstadoPago }): Promise<Pago[]> {
-    try {
-      const params = new URLSearchParams();
-      if (filters?.condominio_id) params.append('condominio_id', filters.condominio_id.toString());
-      if (filters?.estado_pago) params.append('estado_pago', filters.estado_pago);
-
-      const response = await fetchWithAuth(`${API_URL}/pagos?${params.toString()}`);
-      
-      if (!response.ok) {
-        throw new Error('Error al obtener el listado de pagos');
-      }
-      
-      return response.json();
-    } catch (error) {
-      console.error("Error en getAll:", error);
-      throw error;
-    }
+  async getRecientes(condominioId: number, cantidad: number = 5): Promise<Pago[]> {
+    const pagina = await fetchPagina<Pago>(
+      `${API_URL}/pagos?condominio_id=${condominioId}`,
+      (url) => fetchWithAuth(url),
+      null,
+      cantidad,
+    );
+    return pagina.items;
   },
 
   /**
@@ -1,4 +1,5 @@
 import { fetchWithAuth } from "./authService";
+import { fetchTodasLasPaginas } from "./paginacion";
 
 const API_BASE_URL = "http://localhost:8000/api/v1";
 
@@ -25,9 +26,26 @@ export interface ReservaCreate {
   observaciones?: string;
 }
 
+// Filtros del listado de reservas (fechas YYYY-MM-DD, sobre fecha_reserva)
+export interface FiltrosReserva {
+  condominio_id?: number;
+  espacio_comun_id?: number;
+  residente_id?: number;
+  estado?: string;
+  desde?: string;
+  hasta?: string;
+}
+
 class ReservaService {
-  async getAll(): Promise<Reserva[]> {
-    const res = await fetchWithAuth(`${API_BASE_URL}/reservas`);
+  /**
+   * Todas las reservas que cumplen los filtros (acotados por el servidor)
+   */
+  async getAll(filtros: FiltrosReserva): Promise<Reserva[]> {
+    const params = new URLSearchParams();
+    Object.entries(filtros).forEach(([clave, valor]) => {
+      if (valor !== undefined && valor !== null && valor !== "") params.set(clave, String(valor));
+    });
+    const res = await fetchTodasLasPaginas(`${API_BASE_URL}/reservas?${params}`, (url) => fetchWithAuth(url));
     if (!res.ok) throw new Error(`Error: ${res.status}`);
     return res.json();
   }
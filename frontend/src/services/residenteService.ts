@@ -1,3 +1,5 @@
+import { fetchTodasLasPaginas } from "./paginacion";
+
 const API_BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:8000/api/v1";
 
 export interface Residente {
@@ -22,15 +24,32 @@ class ResidenteService {
      };
   }
 
-  async getAll(): Promise<Residente[]> {
-    const res = await fetch(`${API_BASE_URL}/residentes`, {
+  /**
+   * Todos los residentes de un condominio
+   */
+  async getByCondominio(condominioId: number): Promise<Residente[]> {
+    const res = await fetchTodasLasPaginas(`${API_BASE_URL}/residentes?condominio_id=${condominioId}`, (url) =>
+      fetch(url, { method: "GET", headers: this.getHeaders() })
+    );
+    if (!res.ok) {
+      throw new Error(`Error al obtener residentes: ${res.status}`);
+    }
+    return res.json();
+  }
+
+  /**
+   * Perfil de residente de un usuario (null si no tiene)
+   */
+  async getByUsuario(usuarioId: number): Promise<Residente | null> {
+    const res = await fetch(`${API_BASE_URL}/residentes?usuario_id=${usuarioId}`, {
       method: "GET",
       headers: this.getHeaders(),
     });
     if (!res.ok) {
-      throw new Error(`Error al obtener residentes: ${res.status}`);
+      throw new Error(`Error al obtener residente: ${res.status}`);
     }
-    return res.json();
+    const residentes: Residente[] = await res.json();
+    return residentes[0] ?? null;
   }
 }
 